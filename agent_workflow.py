@@ -1,22 +1,133 @@
 import argparse
+import asyncio
+import functools
+import heapq
+import itertools
+import json
+import logging
+import logging.handlers
 import os
+import queue
 import sys
-from utils.scraper import AmazonScraper
-from utils.material_analyzer import MaterialAnalyzer
-from utils.esg_analyzer import ESGAnalyzer
-from utils.review_analyzer import ReviewAnalyzer
-from utils.db_query import TextileDBQuery
-from utils.report_generator import ReportGenerator
+import time
+import types
+from statistics import fmean
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from dotenv import load_dotenv
 
-load_dotenv()
+# Parse .env only once, even if this module is re-imported or reloaded
+if not os.environ.get("_ECOAGENT_LOADED"):
+    load_dotenv()
+    os.environ["_ECOAGENT_LOADED"] = "1"
+
+# Material impact results keyed by material composition, shared across pipeline runs
+_material_impact_cache = {}
+
+# Brand assessments persisted across invocations, keyed by brand and LLM mode
+ESG_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ecoagent", "esg_cache.json")
+ESG_CACHE_TTL = 30 * 24 * 3600
+
+# In-memory view of the ESG cache file, loaded on first use
+_esg_cache = None
+
+# Order of the score components in the weighted-score dot product
+ASSESSMENT_COMPONENTS = ("material_impact", "brand_assessment", "consumer_feedback")
+
+# Component weights for each assessment depth
+ASSESSMENT_WEIGHTS = types.MappingProxyType({
+    "basic": types.MappingProxyType({
+        "material_impact": 0.8,
+        "brand_assessment": 0.15,
+        "consumer_feedback": 0.05
+    }),
+    "standard": types.MappingProxyType({
+        "material_impact": 0.5,
+        "brand_assessment": 0.3,
+        "consumer_feedback": 0.2
+    }),
+    "comprehensive": types.MappingProxyType({
+        "material_impact": 0.4,
+        "brand_assessment": 0.35,
+        "consumer_feedback": 0.25
+    })
+})
+
+# The same weights as arrays aligned with ASSESSMENT_COMPONENTS
+ASSESSMENT_WEIGHT_VECTORS = types.MappingProxyType({
+    depth: np.array([weights[component] for component in ASSESSMENT_COMPONENTS], dtype=np.float64)
+    for depth, weights in ASSESSMENT_WEIGHTS.items()
+})
+
+# Display titles for every impact area key returned by TextileDBQuery
+_AREA_TITLE = types.MappingProxyType({
+    area: area.capitalize()
+    for area in ("climate", "water", "chemistry", "land", "biodiversity", "resource",
+                 "human_rights", "animal_welfare", "integrity")
+})
+
+# Project logger shared by the workflow's progress output and the utils modules
+_logger = logging.getLogger("utils")
+
+class StepLogger:
+    """
+    Buffers a pipeline step's progress messages and emits them as one log record,
+    which also keeps the output of concurrently running steps from interleaving.
+    """
+    
+    def __init__(self):
+        self._buf = []
+    
+    def log(self, msg=""):
+        self._buf.append(str(msg))
+    
+    def flush(self):
+        if self._buf:
+            _logger.info("\n".join(self._buf))
+        self._buf = []
+    
+    def fatal(self, msg):
+        """Flush the step's progress, then write a fatal error to stderr (even with --no-progress)."""
+        self.flush()
+        sys.stderr.write(f"{msg}\n")
+        sys.stderr.flush()
+
+def _clean_url(url):
+    """Strip the query string from a product URL."""
+    return url.split('?', 1)[0] if url else url
+
+def _load_esg_cache():
+    """Load the on-disk ESG cache once per process."""
+    global _esg_cache
+    if _esg_cache is None:
+        try:
+            with open(ESG_CACHE_PATH, encoding="utf-8") as f:
+                _esg_cache = json.load(f)
+        except (OSError, ValueError):
+            _esg_cache = {}
+    return _esg_cache
+
+def _store_esg_cache(cache_key, brand_assessment):
+    """Record a brand assessment in memory and persist the cache file."""
+    cache = _load_esg_cache()
+    cache[cache_key] = {"cached_at": time.time(), "result": brand_assessment}
+    try:
+        os.makedirs(os.path.dirname(ESG_CACHE_PATH), exist_ok=True)
+        tmp_path = ESG_CACHE_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, ESG_CACHE_PATH)
+    except OSError as e:
+        _logger.warning("Could not write ESG cache: %s", e)
 
 def parse_args():
     """Parse command line arguments."""
+    log = StepLogger()
     parser = argparse.ArgumentParser(
         description='EcoAgent: Analyze sustainability impact of apparel products'
     )
     parser.add_argument('--url', type=str, help='Amazon product URL')
+    parser.add_argument('--product-id', type=str, help='Amazon product ID (ASIN), used when no URL is given')
     parser.add_argument('--depth', type=str, choices=['basic', 'standard', 'comprehensive'], 
                         default='standard', help='Depth of sustainability assessment')
     parser.add_argument('--mock-scraping', action='store_true', 
@@ -31,252 +142,332 @@ def parse_args():
                         help='Username for Oxylabs API (defaults to OXYLABS_USERNAME env var)')
     parser.add_argument('--oxylabs-password', type=str, 
                         help='Password for Oxylabs API (defaults to OXYLABS_PASSWORD env var)')
+    parser.add_argument('--no-esg-cache', action='store_true', 
+                        help='Re-run the brand ESG lookup instead of using cached results')
+    parser.add_argument('--no-progress', action='store_true', 
+                        help='Suppress step-by-step progress output')
     
     args = parser.parse_args()
+    if args.no_progress:
+        # Batch runs keep only warnings and errors
+        _logger.setLevel(logging.WARNING)
     
-    # Clean URL if provided
-    if args.url and '?' in args.url:
-        args.url = args.url.split('?')[0]
-        print(f"Cleaned URL: {args.url}")
+    # Clean URL once here; every later step receives the cleaned URL
+    cleaned_url = _clean_url(args.url)
+    if cleaned_url != args.url:
+        args.url = cleaned_url
+        log.log(f"Cleaned URL: {args.url}")
     
+    log.flush()
     return args
 
 def initialize(args):
-    print("\n=== Step 1: Initializing EcoAgent ===")
-    print(f"Assessment Depth: {args.depth}")
+    log = StepLogger()
+    env = os.environ
+    log.log("\n=== Step 1: Initializing EcoAgent ===")
+    log.log(f"Assessment Depth: {args.depth}")
     
     # Build URL from product ID if needed
     if not args.url and args.product_id:
         args.url = f"https://www.amazon.com/dp/{args.product_id}"
-        print(f"Generated URL: {args.url}")
+        log.log(f"Generated URL: {args.url}")
     
     if not args.url:
-        print("Error: Either a product URL or product ID is required")
+        log.fatal("Error: Either a product URL or product ID is required")
         sys.exit(1)
     
     # Setup scraping mode
     if args.mock_scraping:
-        print("Using mock scraping as requested")
+        log.log("Using mock scraping as requested")
     else:
-        print("Using real web scraping")
+        log.log("Using real web scraping")
 
     # Get Oxylabs credentials    
     if not args.oxylabs_username:
-        args.oxylabs_username = os.getenv("OXYLABS_USERNAME")
+        args.oxylabs_username = env.get("OXYLABS_USERNAME")
     
     if not args.oxylabs_password:
-        args.oxylabs_password = os.getenv("OXYLABS_PASSWORD")
+        args.oxylabs_password = env.get("OXYLABS_PASSWORD")
         
     # Check credential format
     if args.oxylabs_username and '_' not in args.oxylabs_username:
         if ':' in args.oxylabs_username:
-            print("Detected combined username:password format - splitting into separate credentials")
+            log.log("Detected combined username:password format - splitting into separate credentials")
             username, password = args.oxylabs_username.split(':', 1)
             args.oxylabs_username = username
             if not args.oxylabs_password:
                 args.oxylabs_password = password
         
     if args.oxylabs_username and args.oxylabs_password:
-        print("Oxylabs credentials provided - will use Oxylabs Web Scraper API")
+        log.log("Oxylabs credentials provided - will use Oxylabs Web Scraper API")
     else:
-        print("No Oxylabs credentials found - falling back to mock data for scraping")
+        log.log("No Oxylabs credentials found - falling back to mock data for scraping")
         args.mock_scraping = True
     
     # Setup Gemini API
     if not args.gemini_api_key:
-        args.gemini_api_key = os.getenv("GEMINI_API_KEY")
+        args.gemini_api_key = env.get("GEMINI_API_KEY")
     
     if args.mock_llm:
-        print("Using mock LLM implementation as requested")
+        log.log("Using mock LLM implementation as requested")
     elif args.gemini_api_key:
-        print("Using Gemini API for analysis")
+        log.log("Using Gemini API for analysis")
     else:
-        print("No Gemini API key found - falling back to mock LLM implementation")
+        log.log("No Gemini API key found - falling back to mock LLM implementation")
         args.mock_llm = True
     
     # Setup data mode
     if args.mock_data:
-        print("Using mock data for ESG reports and textile database")
+        log.log("Using mock data for ESG reports and textile database")
     else:
-        print("Using real data sources for ESG reports and textile database")
+        log.log("Using real data sources for ESG reports and textile database")
     
+    log.flush()
     return args
 
-def scrape_product(url, use_mock=False, oxylabs_username=None, oxylabs_password=None):
-    print("\n=== Step 2: Scraping Amazon Product Page ===")
-    
-    # Clean URL if needed
-    if url and '?' in url:
-        url = url.split('?')[0]
-        print(f"Using cleaned URL: {url}")
-    
+def create_scraper(use_mock=False, oxylabs_username=None, oxylabs_password=None):
+    """Create the Amazon scraper shared by the product and review scraping steps."""
+    from utils.scraper import AmazonScraper
+    return AmazonScraper(
+        use_real_scraping=not use_mock,
+        oxylabs_username=oxylabs_username,
+        oxylabs_password=oxylabs_password
+    )
+
+async def scrape_product_and_reviews(scraper, url):
+    """
+    Scrape the product page (Step 2) and its consumer reviews (Step 5) concurrently, since the
+    review scrape only needs the URL. Failing to scrape the product ends the run.
+    """
+    log = StepLogger()
+    log.log("\n=== Step 2: Scraping Amazon Product Page ===")
+    
+    # URL is pre-cleaned by parse_args
+    log.flush()
     try:
-        scraper = AmazonScraper(
-            use_real_scraping=not use_mock,
-            oxylabs_username=oxylabs_username,
-            oxylabs_password=oxylabs_password
-        )
-        product_data = scraper.scrape_product_page(url)
-        print(f"Successfully retrieved product data:")
-        print(f"  - Title: {product_data['title']}")
-        print(f"  - Brand: {product_data['brand']}")
-        print(f"  - Material: {product_data['material']}")
-        print(f"  - Category: {product_data['category']}")
-        return product_data
+        product_data, reviews = await scraper.scrape_product_and_reviews(url)
+        log.log("Successfully retrieved product data:")
+        log.log(f"  - Title: {product_data['title']}")
+        log.log(f"  - Brand: {product_data['brand']}")
+        log.log(f"  - Material: {product_data['material']}")
+        log.log(f"  - Category: {product_data['category']}")
+        log.flush()
     except Exception as e:
-        print(f"Error scraping product: {e}")
+        log.fatal(f"Error scraping product: {e}")
         sys.exit(1)
+    
+    log.log("\n=== Step 5: Scraping Consumer Reviews ===")
+    log.log(f"Successfully retrieved {len(reviews)} reviews")
+    log.flush()
+    return product_data, reviews
 
-def analyze_material(product_data, gemini_api_key=None, use_mock=False):
+async def analyze_material(product_data, gemini_api_key=None, use_mock=False):
     """Analyze material information extracted from the product."""
-    print("\n=== Analyzing Material Information ===")
+    log = StepLogger()
+    log.log("\n=== Analyzing Material Information ===")
+    from utils.material_analyzer import MaterialAnalyzer
     material_analyzer = MaterialAnalyzer(gemini_api_key=gemini_api_key, use_mock_api=use_mock)
     
     if material_analyzer.is_material_clear(product_data['material']):
-        print("Material information is clear and can be directly processed")
+        log.log("Material information is clear and can be directly processed")
         materials = material_analyzer.parse_material(product_data['material'])
     else:
-        print("Material information is unclear, using Gemini API to infer materials")
-        materials = material_analyzer.infer_material_with_gemini(product_data)
+        log.log("Material information is unclear, using Gemini API to infer materials")
+        materials = await material_analyzer.infer_material_with_gemini_async(product_data)
         
-    print(f"Identified materials: {', '.join(materials.keys())}")
+    log.log(f"Identified materials: {', '.join(materials.keys())}")
+    log.flush()
     return materials
 
-def search_esg_report(brand, gemini_api_key=None, use_mock=False, use_mock_data=False):
-    print(f"\n=== Step 4: Searching ESG Report for {brand} ===")
-    esg_analyzer = ESGAnalyzer(gemini_api_key=gemini_api_key, use_mock_api=use_mock)
+@functools.lru_cache(maxsize=None)
+def get_esg_analyzer(gemini_api_key=None, use_mock=False):
+    """Create the ESG analyzer once per configuration, so its per-brand caches outlive a single run."""
+    from utils.esg_analyzer import ESGAnalyzer
+    return ESGAnalyzer(gemini_api_key=gemini_api_key, use_mock_api=use_mock)
+
+async def search_esg_report(brand, gemini_api_key=None, use_mock=False, use_mock_data=False, use_cache=True):
+    log = StepLogger()
+    log.log(f"\n=== Step 4: Searching ESG Report for {brand} ===")
+    
+    cache_key = f"{brand.lower().strip()}|{'mock' if use_mock else 'gemini'}"
+    if use_cache:
+        cached = _load_esg_cache().get(cache_key)
+        if cached and time.time() - cached["cached_at"] < ESG_CACHE_TTL:
+            log.log(f"Using cached ESG assessment for {brand}")
+            log.flush()
+            return cached["result"]
+    
+    esg_analyzer = get_esg_analyzer(gemini_api_key, use_mock)
     
     try:
         if use_mock_data:
-            print("Using mock ESG data")
+            log.log("Using mock ESG data")
             report_info = esg_analyzer.find_esg_report(brand)
         else:
             # Real APIs not yet integrated
-            print("Note: Using mock ESG data (real APIs not yet integrated)")
+            log.log("Note: Using mock ESG data (real APIs not yet integrated)")
             report_info = esg_analyzer.find_esg_report(brand)
         
         if report_info['found']:
-            print(f"ESG report found for {brand}")
+            log.log(f"ESG report found for {brand}")
             if report_info['accessible']:
-                print(f"Report is accessible and can be analyzed")
-                report_analysis = esg_analyzer.analyze_report_with_gemini(report_info['content'])
-                return report_analysis
+                log.log("Report is accessible and can be analyzed")
+                brand_assessment = await esg_analyzer.analyze_report_with_gemini_async(report_info['content'])
             else:
-                print(f"Report found but is not accessible")
-                news_summary = esg_analyzer.search_and_summarize_sustainability_news(brand)
-                return news_summary
+                log.log("Report found but is not accessible")
+                brand_assessment = await esg_analyzer.search_and_summarize_sustainability_news_async(brand)
         else:
-            print(f"No ESG report found for {brand}")
-            news_summary = esg_analyzer.search_and_summarize_sustainability_news(brand)
-            return news_summary
+            log.log(f"No ESG report found for {brand}")
+            brand_assessment = await esg_analyzer.search_and_summarize_sustainability_news_async(brand)
     except Exception as e:
-        print(f"Error analyzing ESG data: {e}")
+        log.log(f"Error analyzing ESG data: {e}")
+        log.flush()
         return {"rating": 0, "summary": f"Error analyzing sustainability data for {brand}. {str(e)}"}
+    
+    log.flush()
+    from utils.gemini_api import FallbackResult
+    # Mock fallbacks for failed Gemini requests aren't persisted, so the next run asks again
+    if use_cache and not isinstance(brand_assessment, FallbackResult):
+        _store_esg_cache(cache_key, brand_assessment)
+    return brand_assessment
+
+@functools.lru_cache(maxsize=None)
+def get_textile_db():
+    """Load the textile database once and share it across pipeline runs."""
+    from utils.db_query import TextileDBQuery
+    return TextileDBQuery()
 
 def query_textile_db(materials, use_mock_data=False):
-    print("\n=== Step 3: Querying Textile Database for material impact. ===")
-    db_query = TextileDBQuery()
+    log = StepLogger()
+    log.log("\n=== Step 3: Querying Textile Database for material impact. ===")
+    
+    cache_key = frozenset(materials.items())
+    if cache_key in _material_impact_cache:
+        log.log("Using cached material impact data for this composition")
+        log.flush()
+        return _material_impact_cache[cache_key]
+    
+    log.flush()
+    material_impact = _lookup_material_impacts(materials)
+    _material_impact_cache[cache_key] = material_impact
+    return material_impact
+
+def _lookup_material_impacts(materials):
+    """Look up and combine the textile database impact data for each material."""
+    log = StepLogger()
+    db_query = get_textile_db()
     
-    print("Using Textile Database Scorecard PFMM data and detailed material CSV files")
+    log.log("Using Textile Database Scorecard PFMM data and detailed material CSV files")
     
     material_impacts = {}
     materials_identified = False
     
+    # Lookups only read the loaded tables, so a blend's materials can be queried in parallel
+    log.flush()
+    if len(materials) > 1:
+        with ThreadPoolExecutor(max_workers=min(8, len(materials))) as executor:
+            lookups = dict(zip(materials, executor.map(db_query.query_material, materials)))
+    else:
+        lookups = {material: db_query.query_material(material) for material in materials}
+    
     for material, percentage in materials.items():
-        print(f"Looking up material: {material} ({percentage}%)")
-        impact_data = db_query.query_material(material)
+        log.log(f"Looking up material: {material} ({percentage}%)")
+        impact_data = lookups[material]
         if impact_data:
             materials_identified = True
             material_impacts[material] = impact_data
-            print(f"Found impact data for {material}")
+            log.log(f"Found impact data for {material}")
             
             # Show category and sustainability metrics
             category = impact_data.get('category', 'Unknown')
-            print(f"  - Category: {category}")
+            log.log(f"  - Category: {category}")
             
             # Show impact scores
             if 'overall_impact' in impact_data:
                 overall = impact_data['overall_impact']
-                print(f"  - Impact areas:")
+                log.log("  - Impact areas:")
                 for area, score in overall.items():
-                    print(f"    - {area.capitalize()}: {score:.1f}/100")
+                    log.log(f"    - {_AREA_TITLE.get(area) or area.capitalize()}: {score:.1f}/100")
                 
             # Show certification info
-            cert_count = len(impact_data.get('certifications', []))
-            print(f"  - Found {cert_count} certification options")
+            certs = impact_data.get('certifications') or ()
+            cert_count = len(certs)
+            log.log(f"  - Found {cert_count} certification options")
             
-            if cert_count > 0:
-                top_cert = impact_data['certifications'][0]['certification']
-                print(f"  - Top certification: {top_cert}")
+            if cert_count:
+                top_cert = certs[0]['certification']
+                log.log(f"  - Top certification: {top_cert}")
             
             # Show detailed data if available
-            if 'detailed_data' in impact_data:
-                print(f"  - Detailed data available:")
+            detailed_data = impact_data.get('detailed_data')
+            if detailed_data is not None:
+                log.log("  - Detailed data available:")
                 
-                if 'available_certifications' in impact_data['detailed_data']:
-                    cert_count = len(impact_data['detailed_data']['available_certifications'])
-                    print(f"    - Found {cert_count} certification standards in detailed data")
+                available_certs = detailed_data.get('available_certifications')
+                if available_certs is not None:
+                    cert_count = len(available_certs)
+                    log.log(f"    - Found {cert_count} certification standards in detailed data")
                 
-                if 'performance_scores' in impact_data['detailed_data']:
-                    perf_scores = impact_data['detailed_data']['performance_scores']
-                    if perf_scores:
-                        print("    - Detailed performance scores:")
-                        for area, scores in perf_scores.items():
-                            print(f"      - {area.capitalize()}: {scores['average']:.1f}/100")
+                perf_scores = detailed_data.get('performance_scores')
+                if perf_scores:
+                    log.log("    - Detailed performance scores:")
+                    for area, scores in perf_scores.items():
+                        log.log(f"      - {_AREA_TITLE.get(area) or area.capitalize()}: {scores['average']:.1f}/100")
                 
-                if 'detailed_scores' in impact_data['detailed_data']:
-                    detailed_scores = impact_data['detailed_data']['detailed_scores']
-                    if detailed_scores:
-                        print("    - Key subcategory performance:")
-                        # Get a few key areas to display
-                        key_areas = []
-                        for area, subcats in detailed_scores.items():
-                            if subcats:
-                                # Sort subcategories by highest score
-                                sorted_subcats = sorted(subcats.items(), key=lambda x: x[1]['average'], reverse=True)
-                                if sorted_subcats:
-                                    key_areas.append((area, sorted_subcats[0]))
-                        
-                        # Display top 3 key areas
-                        for area, (subcat, data) in key_areas[:3]:
-                            print(f"      - {area.capitalize()}: {subcat} ({data['average']:.1f}/100)")
+                detailed_scores = detailed_data.get('detailed_scores')
+                if detailed_scores:
+                    log.log("    - Key subcategory performance:")
+                    # Get a few key areas to display
+                    key_areas = []
+                    for area, subcats in detailed_scores.items():
+                        if subcats:
+                            # Highest scoring subcategory of this area
+                            top = heapq.nlargest(1, subcats.items(), key=lambda x: x[1]['average'])
+                            if top:
+                                key_areas.append((area, top[0]))
+                    
+                    # Display top 3 key areas
+                    key_areas = heapq.nlargest(3, key_areas, key=lambda x: x[1][1]['average'])
+                    for area, (subcat, data) in key_areas:
+                        log.log(f"      - {_AREA_TITLE.get(area) or area.capitalize()}: {subcat} ({data['average']:.1f}/100)")
         else:
-            print(f"No impact data found for {material}")
+            log.log(f"No impact data found for {material}")
     
     if materials_identified:
         # Handle blends if multiple materials
         if len(materials) > 1:
-            print("Product contains a blend of materials")
+            log.log("Product contains a blend of materials")
             blend_data = db_query.process_blend(materials, material_impacts)
             
-            print("Blend composition:")
+            log.log("Blend composition:")
             for material, pct in materials.items():
-                print(f"  - {material}: {pct:.1f}")
+                log.log(f"  - {material}: {pct:.1f}")
             
             # Show weighted impact scores
             if 'overall_weighted_impact' in blend_data:
                 weighted = blend_data['overall_weighted_impact']
-                print("Weighted impact scores:")
+                log.log("Weighted impact scores:")
                 for area, score in weighted.items():
-                    print(f"  - {area.capitalize()}: {score:.1f}/100")
+                    log.log(f"  - {_AREA_TITLE.get(area) or area.capitalize()}: {score:.1f}/100")
             
             # Show sustainability rating
             if 'sustainability_rating' in blend_data:
                 rating = blend_data['sustainability_rating']
                 level = blend_data.get('sustainability_level', '')
-                print(f"Sustainability rating: {rating:.1f}/10 ({level})")
+                log.log(f"Sustainability rating: {rating:.1f}/10 ({level})")
             
             # Show blend detailed data if available
             if 'detailed_weighted_data' in blend_data:
-                print("Detailed weighted data available for blend")
+                log.log("Detailed weighted data available for blend")
                 detailed = blend_data['detailed_weighted_data']
                 if detailed:
                     area = next(iter(detailed))
-                    print(f"Sample data for {area}:")
-                    subcats = list(detailed[area].items())[:3]  # Show top 3 subcategories
+                    log.log(f"Sample data for {area}:")
+                    subcats = itertools.islice(detailed[area].items(), 3)  # Show top 3 subcategories
                     for subcat, score in subcats:
-                        print(f"  - {subcat}: {score:.1f}/100")
+                        log.log(f"  - {subcat}: {score:.1f}/100")
             
+            log.flush()
             return {
                 "identified": True,
                 "is_blend": True,
@@ -293,18 +484,15 @@ def query_textile_db(materials, use_mock_data=False):
             impact_data = material_impacts[material]
             
             # Calculate overall sustainability score
-            if 'overall_impact' in impact_data:
-                scores = list(impact_data['overall_impact'].values())
-                if scores:
-                    avg_score = sum(scores) / len(scores)
-                    sustainability_score = avg_score / 10.0  # Convert from 0-100 to 0-10 scale
-                else:
-                    sustainability_score = 5.0
+            overall_impact = impact_data.get('overall_impact')
+            if overall_impact:
+                sustainability_score = fmean(overall_impact.values()) / 10.0  # Convert from 0-100 to 0-10 scale
             else:
                 sustainability_score = 5.0
                 
-            print(f"Overall sustainability score: {sustainability_score:.1f}/10")
+            log.log(f"Overall sustainability score: {sustainability_score:.1f}/10")
             
+            log.flush()
             return {
                 "identified": True,
                 "is_blend": False,
@@ -315,63 +503,53 @@ def query_textile_db(materials, use_mock_data=False):
                 }
             }
     else:
-        print("Unable to identify material impacts")
+        log.log("Unable to identify material impacts")
+        log.flush()
         return {
             "identified": False,
             "error": "No material impacts found in database"
         }
 
-def scrape_reviews(url, use_mock=False, oxylabs_username=None, oxylabs_password=None):
-    print("\n=== Step 5: Scraping Consumer Reviews ===")
-    
-    try:
-        scraper = AmazonScraper(
-            use_real_scraping=not use_mock,
-            oxylabs_username=oxylabs_username,
-            oxylabs_password=oxylabs_password
-        )
-        
-        reviews = scraper.scrape_reviews(url)
-        print(f"Successfully retrieved {len(reviews)} reviews")
-        return reviews
-    except Exception as e:
-        print(f"Error scraping reviews: {e}")
-        return []
-
-def analyze_reviews(reviews, gemini_api_key=None, use_mock=False):
-    print("\n=== Step 6: Analyzing Consumer Reviews for sustainability insights. ===")
+async def analyze_reviews(reviews, gemini_api_key=None, use_mock=False):
+    log = StepLogger()
+    log.log("\n=== Step 6: Analyzing Consumer Reviews for sustainability insights. ===")
     
     if not reviews:
-        print("No reviews to analyze")
+        log.log("No reviews to analyze")
+        log.flush()
         return {
             "overall_sustainability_sentiment": 5.0,
             "insights": ["No consumer reviews available for analysis"]
         }
     
     try:
+        from utils.review_analyzer import ReviewAnalyzer
         analyzer = ReviewAnalyzer(gemini_api_key=gemini_api_key, use_mock_api=use_mock)
-        analysis = analyzer.analyze_with_gemini(reviews)
+        analysis = await analyzer.analyze_with_gemini_async(reviews)
         
-        print(f"Overall sustainability sentiment: {analysis['overall_sustainability_sentiment']}/10")
-        print("Key insights:")
+        log.log(f"Overall sustainability sentiment: {analysis['overall_sustainability_sentiment']}/10")
+        log.log("Key insights:")
         for insight in analysis["insights"]:
-            print(f"  - {insight}")
+            log.log(f"  - {insight}")
             
         if analysis.get("flags_triggered", False):
-            print("Sustainability flags triggered:")
+            log.log("Sustainability flags triggered:")
             for flag in analysis.get("sustainability_flags", []):
-                print(f"  - {flag}")
+                log.log(f"  - {flag}")
         
+        log.flush()
         return analysis
     except Exception as e:
-        print(f"Error analyzing reviews: {e}")
+        log.log(f"Error analyzing reviews: {e}")
+        log.flush()
         return {
             "overall_sustainability_sentiment": 5.0,
             "insights": [f"Error analyzing reviews: {str(e)}"]
         }
 
 def synthesize_data(material_data, brand_assessment, consumer_feedback, depth):
-    print("\n=== Step 7: Synthesizing Data ===")
+    log = StepLogger()
+    log.log("\n=== Step 7: Synthesizing Data ===")
     
     # Collect all data sources
     synthesized_data = {
@@ -384,165 +562,155 @@ def synthesize_data(material_data, brand_assessment, consumer_feedback, depth):
     # Log key information
     if material_data.get("identified", False):
         if material_data.get("is_blend", False):
-            materials_str = ", ".join([f"{int(pct*100)}% {mat}" for mat, pct in material_data.get("blend_composition", {}).items()])
-            print(f"Material: Blend of {materials_str}")
+            blend_composition = material_data.get("blend_composition")
+            materials_str = ", ".join(f"{int(pct*100)}% {mat}" for mat, pct in blend_composition.items()) if blend_composition else ""
+            log.log(f"Material: Blend of {materials_str}")
         else:
-            print(f"Material: {material_data.get('material', 'Unknown')}")
+            log.log(f"Material: {material_data.get('material', 'Unknown')}")
             
         if "impacts" in material_data and "overall" in material_data["impacts"]:
-            print(f"Material sustainability score: {material_data['impacts']['overall']:.1f}/10")
+            log.log(f"Material sustainability score: {material_data['impacts']['overall']:.1f}/10")
     else:
-        print("Material: Unable to identify material impacts")
+        log.log("Material: Unable to identify material impacts")
     
-    print(f"Brand sustainability rating: {brand_assessment.get('rating', 0.0):.1f}/10")
-    print(f"Consumer sentiment rating: {consumer_feedback.get('overall_sustainability_sentiment', 0.0):.1f}/10")
+    log.log(f"Brand sustainability rating: {brand_assessment.get('rating', 0.0):.1f}/10")
+    log.log(f"Consumer sentiment rating: {consumer_feedback.get('overall_sustainability_sentiment', 0.0):.1f}/10")
     
     # Set weights based on assessment depth
-    weights = {
-        "basic": {
-            "material_impact": 0.8,
-            "brand_assessment": 0.15,
-            "consumer_feedback": 0.05
-        },
-        "standard": {
-            "material_impact": 0.5,
-            "brand_assessment": 0.3,
-            "consumer_feedback": 0.2
-        },
-        "comprehensive": {
-            "material_impact": 0.4,
-            "brand_assessment": 0.35,
-            "consumer_feedback": 0.25
-        }
-    }
-    
-    current_weights = weights.get(depth, weights["standard"])
-    print(f"Using assessment weights for '{depth}' depth:")
+    depth_key = depth if depth in ASSESSMENT_WEIGHTS else "standard"
+    current_weights = ASSESSMENT_WEIGHTS[depth_key]
+    log.log(f"Using assessment weights for '{depth}' depth:")
     for component, weight in current_weights.items():
-        print(f"  - {component}: {weight*100:.0f}%")
+        log.log(f"  - {component}: {weight*100:.0f}%")
         
     # Calculate weighted score
     material_score = material_data["impacts"]["overall"] if material_data.get("identified", False) and "impacts" in material_data else 5.0
     brand_score = brand_assessment.get("rating", 5.0)
     consumer_score = consumer_feedback.get("overall_sustainability_sentiment", 5.0)
     
-    overall_score = (
-        material_score * current_weights["material_impact"] +
-        brand_score * current_weights["brand_assessment"] +
-        consumer_score * current_weights["consumer_feedback"]
-    )
+    scores = np.array([material_score, brand_score, consumer_score], dtype=np.float64)
+    overall_score = float(scores @ ASSESSMENT_WEIGHT_VECTORS[depth_key])
     
-    print(f"Overall weighted sustainability score: {overall_score:.1f}/10")
+    log.log(f"Overall weighted sustainability score: {overall_score:.1f}/10")
     
     synthesized_data["overall_score"] = overall_score
     
+    log.flush()
     return synthesized_data
 
 def generate_final_report(synthesized_data):
-    print("\n=== Step 8: Generating Final Report ===")
+    log = StepLogger()
+    log.log("\n=== Step 8: Generating Final Report ===")
     
+    from utils.report_generator import ReportGenerator
     report_generator = ReportGenerator()
     
     # Choose report type based on assessment depth
     assessment_depth = synthesized_data.get("assessment_depth", "standard")
     if assessment_depth == "comprehensive":
-        print("Generating comprehensive report with detailed impact breakdowns")
+        log.log("Generating comprehensive report with detailed impact breakdowns")
         report = report_generator.generate_comprehensive_report(synthesized_data)
     else:
-        print(f"Generating {assessment_depth} report")
+        log.log(f"Generating {assessment_depth} report")
         report = report_generator.interpret_and_summarize(synthesized_data)
     
     # Display report summary
-    print("\n=== Final Sustainability Assessment ===")
-    print(f"Overall Rating: {report['rating']}/10 ({report['rating_band']})")
-    print(f"Summary: {report['summary']}")
+    log.log("\n=== Final Sustainability Assessment ===")
+    log.log(f"Overall Rating: {report['rating']}/10 ({report['rating_band']})")
+    log.log(f"Summary: {report['summary']}")
     
     # Display component scores
     if "component_scores" in report:
-        print("\nComponent Scores:")
+        log.log("\nComponent Scores:")
         for component, score in report["component_scores"].items():
-            print(f"- {component.capitalize()}: {score:.1f}/10")
+            log.log(f"- {component.capitalize()}: {score:.1f}/10")
     
     # Display key insights
-    print("\nKey Material Insights:")
-    for insight in report.get("material_insights", [])[:3]:
-        print(f"- {insight}")
+    log.log("\nKey Material Insights:")
+    for insight in (report.get("material_insights") or ())[:3]:
+        log.log(f"- {insight}")
         
-    print("\nKey Brand Insights:")
-    for insight in report.get("brand_insights", [])[:2]:
-        print(f"- {insight}")
+    log.log("\nKey Brand Insights:")
+    for insight in (report.get("brand_insights") or ())[:2]:
+        log.log(f"- {insight}")
         
-    print("\nKey Consumer Insights:")
-    for insight in report.get("consumer_insights", [])[:2]:
-        print(f"- {insight}")
+    log.log("\nKey Consumer Insights:")
+    for insight in (report.get("consumer_insights") or ())[:2]:
+        log.log(f"- {insight}")
     
     # Show certification recommendations
     if "detailed_assessment" in report and "certifications" in report["detailed_assessment"]:
-        print("\nRecommended Certifications:")
+        log.log("\nRecommended Certifications:")
         for cert in report["detailed_assessment"]["certifications"][:2]:
-            print(f"- {cert['name']} (Score: {cert['average_score']}/100)")
+            log.log(f"- {cert['name']} (Score: {cert['average_score']}/100)")
     
     # Display category-specific insights for comprehensive reports
     if "category_specific_insights" in report:
-        print("\nMaterial-Specific Insights:")
+        log.log("\nMaterial-Specific Insights:")
         for insight in report["category_specific_insights"]:
-            print(f"- {insight}")
+            log.log(f"- {insight}")
     
     # Show identified conflicts
     if "conflicts" in report and report["conflicts"]:
-        print("\nSustainability Conflicts/Tradeoffs:")
+        log.log("\nSustainability Conflicts/Tradeoffs:")
         for conflict in report["conflicts"]:
-            print(f"- {conflict}")
+            log.log(f"- {conflict}")
     
+    log.flush()
     return report
 
-def main():
-    """Main workflow function."""
-    args = parse_args()
-    args = initialize(args)
-    
-    # Step 2: Product scraping
-    product_data = scrape_product(
-        args.url, 
-        use_mock=args.mock_scraping,
-        oxylabs_username=args.oxylabs_username,
-        oxylabs_password=args.oxylabs_password
-    )
-    
-    # Step 3: Material analysis
-    materials = analyze_material(
+async def analyze_product_materials(product_data, gemini_api_key=None, use_mock=False, use_mock_data=False):
+    """Identify the product's materials and look up their impact in the textile database."""
+    materials = await analyze_material(
         product_data, 
-        gemini_api_key=args.gemini_api_key,
-        use_mock=args.mock_llm
+        gemini_api_key=gemini_api_key,
+        use_mock=use_mock
     )
-    
-    # Step 4: Textile database lookup
-    material_impact = query_textile_db(
+    return await asyncio.to_thread(
+        query_textile_db,
         materials,
-        use_mock_data=args.mock_data
+        use_mock_data=use_mock_data
     )
-    
-    # Step 5: Brand ESG analysis
-    brand_assessment = search_esg_report(
-        product_data["brand"],
-        gemini_api_key=args.gemini_api_key,
-        use_mock=args.mock_llm,
-        use_mock_data=args.mock_data
-    )
-    
-    # Step 6: Review analysis
-    reviews = scrape_reviews(
-        args.url,
+
+async def run_assessment(args):
+    """
+    Run the assessment pipeline, overlapping the stages that only depend on the scraped data.
+    """
+    with create_scraper(
         use_mock=args.mock_scraping,
         oxylabs_username=args.oxylabs_username,
         oxylabs_password=args.oxylabs_password
-    )
-    
-    consumer_feedback = analyze_reviews(
-        reviews,
-        gemini_api_key=args.gemini_api_key,
-        use_mock=args.mock_llm
-    )
+    ) as scraper:
+        # Steps 2 and 5: Product and review scraping - every later stage needs the brand,
+        # material or reviews, and the two scrapes are independent Oxylabs queries
+        product_data, reviews = await scrape_product_and_reviews(scraper, args.url)
+        
+        # Steps 3, 4 and 6: Material lookup, brand ESG analysis and review analysis are
+        # independent of each other, so their Gemini calls are awaited concurrently
+        material_task = analyze_product_materials(
+            product_data,
+            gemini_api_key=args.gemini_api_key,
+            use_mock=args.mock_llm,
+            use_mock_data=args.mock_data
+        )
+        
+        brand_task = search_esg_report(
+            product_data["brand"],
+            gemini_api_key=args.gemini_api_key,
+            use_mock=args.mock_llm,
+            use_mock_data=args.mock_data,
+            use_cache=not args.no_esg_cache
+        )
+        
+        consumer_task = analyze_reviews(
+            reviews,
+            gemini_api_key=args.gemini_api_key,
+            use_mock=args.mock_llm
+        )
+        
+        material_impact, brand_assessment, consumer_feedback = await asyncio.gather(
+            material_task, brand_task, consumer_task
+        )
     
     # Step 7: Data synthesis
     synthesized_data = synthesize_data(
@@ -557,5 +725,36 @@ def main():
     
     return final_report
 
+def configure_logging():
+    """
+    Route the project's log records (step progress and the scraper's messages) through one
+    queue to stdout, so they keep their order and worker threads and the event loop never
+    wait on console writes. Returns the listener draining the queue.
+    """
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    
+    # Replace the queue of an earlier main() call instead of stacking handlers
+    for old_handler in [h for h in _logger.handlers if isinstance(h, logging.handlers.QueueHandler)]:
+        _logger.removeHandler(old_handler)
+    _logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _logger.setLevel(logging.INFO)
+    _logger.propagate = False
+    
+    listener.start()
+    return listener
+
+def main():
+    """Main workflow function."""
+    listener = configure_logging()
+    try:
+        args = parse_args()
+        args = initialize(args)
+        return asyncio.run(run_assessment(args))
+    finally:
+        listener.stop()
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
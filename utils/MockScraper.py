@@ -1,7 +1,12 @@
 import json
 import random
+import re
+import numpy as np
 from typing import Dict, List, Any
 
+# Amazon ASINs are always 10 uppercase alphanumerics after /dp/ or /gp/product/
+_ASIN_RE = re.compile(r'/(?:dp|gp/product)/([A-Z0-9]{10})')
+
 
 class AmazonScraper:
     
@@ -73,19 +78,21 @@ class AmazonScraper:
                 "price": 149.99
             }
         }
+        self._product_keys = tuple(self.mock_products)
         
-        # Mock review database
-        self.mock_reviews = self._generate_mock_reviews()
+        # Mock review database, filled per product on first request
+        self.mock_reviews = {}
+        self._rng = np.random.default_rng()
     
     def _extract_asin_from_url(self, url: str) -> str:
         """Extract ASIN from Amazon URL."""
-        # Check if a known ASIN is in the URL
-        for asin in self.mock_products.keys():
-            if asin in url:
-                return asin
+        # Check if the URL's ASIN is a known product
+        match = _ASIN_RE.search(url)
+        if match and match.group(1) in self.mock_products:
+            return match.group(1)
         
         # Return a random product if no match
-        return random.choice(list(self.mock_products.keys()))
+        return random.choice(self._product_keys)
     
     def scrape_product_page(self, url: str) -> Dict[str, Any]:
         """Scrape Amazon product page for information."""
@@ -96,13 +103,17 @@ class AmazonScraper:
             return self.mock_products[asin]
         else:
             # Return random product if ASIN not found
-            random_asin = random.choice(list(self.mock_products.keys()))
+            random_asin = random.choice(self._product_keys)
             return self.mock_products[random_asin]
     
-    def _generate_mock_reviews(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Generate mock reviews for products."""
-        reviews = {}
-        
+    def _reviews_for(self, asin: str) -> List[Dict[str, Any]]:
+        """Return the mock reviews for a product, generating them on first request."""
+        if asin not in self.mock_reviews:
+            self.mock_reviews[asin] = self._generate_mock_reviews_for_asin(asin)
+        return self.mock_reviews[asin]
+    
+    def _generate_mock_reviews_for_asin(self, asin: str) -> List[Dict[str, Any]]:
+        """Generate mock reviews for a single product."""
         # Sustainability-related phrases
         sustainability_phrases = [
             "eco-friendly",
@@ -131,49 +142,49 @@ class AmazonScraper:
             "microplastics concern"
         ]
         
-        # Generate reviews for each product
-        for asin in self.mock_products.keys():
-            product_reviews = []
-            num_reviews = random.randint(5, 15)
-            
-            for i in range(num_reviews):
-                # Determine if review mentions sustainability
-                mentions_sustainability = random.random() < 0.4
-                is_concern = random.random() < 0.3
-                
-                rating = random.randint(1, 5)
-                
-                review_text = f"Review {i+1}: "
-                if mentions_sustainability:
-                    if is_concern:
-                        phrase = random.choice(concern_phrases)
-                        review_text += f"I like the product but {phrase}. "
-                    else:
-                        phrase = random.choice(sustainability_phrases)
-                        review_text += f"Really appreciate that this is {phrase}. "
-                
-                review_text += "Overall good purchase." if rating >= 3 else "Wouldn't buy again."
-                
-                review = {
-                    "rating": rating,
-                    "text": review_text,
-                    "helpful_votes": random.randint(0, 20),
-                    "verified_purchase": random.random() < 0.8
-                }
-                
-                product_reviews.append(review)
-            
-            reviews[asin] = product_reviews
+        # Draw every random field for all of the product's reviews at once
+        rng = self._rng
+        total = int(rng.integers(5, 16))
         
-        return reviews
+        ratings = rng.integers(1, 6, total)
+        helpful_votes = rng.integers(0, 21, total)
+        verified = rng.random(total) < 0.8
+        mentions_sustainability = rng.random(total) < 0.4
+        is_concern = rng.random(total) < 0.3
+        sustainability_idx = rng.integers(0, len(sustainability_phrases), total)
+        concern_idx = rng.integers(0, len(concern_phrases), total)
+        
+        def review_text(i, rating, mentions, concern, s_idx, c_idx):
+            text = f"Review {i+1}: "
+            if mentions:
+                if concern:
+                    text += f"I like the product but {concern_phrases[c_idx]}. "
+                else:
+                    text += f"Really appreciate that this is {sustainability_phrases[s_idx]}. "
+            text += "Overall good purchase." if rating >= 3 else "Wouldn't buy again."
+            return text
+        
+        return [
+            {
+                "rating": rating,
+                "text": review_text(i, rating, mentions, concern, s_idx, c_idx),
+                "helpful_votes": votes,
+                "verified_purchase": is_verified
+            }
+            for i, (rating, votes, is_verified, mentions, concern, s_idx, c_idx) in enumerate(zip(
+                ratings.tolist(), helpful_votes.tolist(), verified.tolist(),
+                mentions_sustainability.tolist(), is_concern.tolist(),
+                sustainability_idx.tolist(), concern_idx.tolist()
+            ))
+        ]
     
     def scrape_reviews(self, url: str) -> List[Dict[str, Any]]:
         """Scrape reviews for a product."""
         # Extract ASIN and return mock reviews
         asin = self._extract_asin_from_url(url)
         
-        if asin in self.mock_reviews:
-            return self.mock_reviews[asin]
+        if asin in self.mock_products:
+            return self._reviews_for(asin)
         else:
             # Return empty list if no reviews found
             return []
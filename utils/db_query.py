@@ -3,11 +3,115 @@ Database query utilities for accessing the Textile Database Scorecard data.
 Provides methods to query material sustainability data based on the 
 Preferred Fiber and Material Matrix (PFMM).
 """
+import copy
+import functools
+import hashlib
 import os
+import numpy as np
 import pandas as pd
 import re
+import sys
+from collections import defaultdict
 from typing import Dict, List, Any, Optional
 
+# Material composition patterns used by parse_material_string
+_PCT_RE = re.compile(r'(\d+)%?\s*([a-zA-Z-]+)')
+_NAME_RE = re.compile(r'([a-zA-Z-]+)')
+
+@functools.lru_cache(maxsize=1024)
+def _parse_material_string(material_string: str) -> Dict[str, float]:
+    """
+    Parse a material composition string, memoized for TextileDBQuery.parse_material_string,
+    which copies the shared result.
+    """
+    if not material_string:
+        return {}
+        
+    # Clean up the string
+    material_string = material_string.lower().strip()
+    
+    # Try to extract percentages and materials
+    materials = {}
+    
+    # Percentage followed by material name
+    matches = _PCT_RE.findall(material_string)
+    
+    if matches:
+        for match in matches:
+            percentage = float(match[0]) / 100.0
+            material = match[1].strip()
+            
+            materials[material] = percentage
+    else:
+        # If no percentages found, try to extract just material names
+        material_names = _NAME_RE.findall(material_string)
+        if material_names:
+            # If only one material, assume 100%
+            if len(material_names) == 1:
+                materials[material_names[0].strip()] = 1.0
+            else:
+                # If multiple materials but no percentages, distribute evenly
+                equal_pct = 1.0 / len(material_names)
+                for material in material_names:
+                    materials[material.strip()] = equal_pct
+    
+    return materials
+
+# Impact areas with the positions of their level and score columns in the scorecard
+IMPACT_AREA_NAMES = ("climate", "water", "chemistry", "land", "biodiversity",
+                     "resource", "human_rights", "animal_welfare", "integrity")
+IMPACT_LEVEL_IDX = np.array([2, 4, 6, 8, 10, 12, 14, 16, 18], dtype=np.intp)
+IMPACT_SCORE_IDX = np.array([3, 5, 7, 9, 11, 13, 15, 17, 19], dtype=np.intp)
+
+# Weight of each impact area in a blend's sustainability score, aligned with IMPACT_AREA_NAMES
+# (integrity not included in sustainability score)
+SUSTAINABILITY_WEIGHTS = np.array([0.20, 0.15, 0.15, 0.10, 0.10, 0.10, 0.15, 0.05, 0.0])
+
+# Layout of the parsed-CSV cache files; bump it when _save_frame's format or the parsing changes
+CSV_CACHE_VERSION = 1
+
+
+def _save_frame(path: str, df: pd.DataFrame):
+    """
+    Store a parsed frame as plain NumPy arrays: numeric columns as they are, and any other
+    column as strings with a mask of its missing values.
+    """
+    arrays = {
+        "columns": np.array([str(col) for col in df.columns]),
+        "integer_columns": np.array(all(isinstance(col, (int, np.integer)) for col in df.columns)),
+    }
+    for i, (_, column) in enumerate(df.items()):
+        if column.dtype.kind in "biuf":
+            arrays[f"values_{i}"] = column.to_numpy()
+        else:
+            missing = column.isna().to_numpy()
+            arrays[f"missing_{i}"] = missing
+            arrays[f"values_{i}"] = np.where(missing, "", column.astype(str).to_numpy(dtype=object)).astype(str)
+    
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def _load_frame(path: str) -> pd.DataFrame:
+    """Load a frame stored by _save_frame, without unpickling anything."""
+    with np.load(path, allow_pickle=False) as arrays:
+        columns = arrays["columns"]
+        if arrays["integer_columns"]:
+            columns = columns.astype(np.int64)
+        data = {}
+        for i in range(len(columns)):
+            values = arrays[f"values_{i}"]
+            if f"missing_{i}" in arrays:
+                values = values.astype(object)
+                values[arrays[f"missing_{i}"]] = np.nan
+            data[i] = values
+    df = pd.DataFrame(data)
+    df.columns = pd.Index(columns)
+    return df
+
+
 class TextileDBQuery:
     """
     Query interface for the Textile Database Scorecard.
@@ -22,11 +126,6 @@ class TextileDBQuery:
         self.project_root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # Assumes script is nested (e.g., project/src/script.py or project/src/utils/script.py)
         self.data_dir = os.path.join(self.project_root_dir, 'data')
         self.db_path = db_path or os.path.join(self.data_dir, 'TextileDataScorecard.csv')
-        self.textile_data = self._load_textile_data()
-        
-        # Load detailed data for each textile category
-        self.detailed_data = {}
-        self._load_detailed_data()
         
         # Material mapping from common names to categories in the database
         self.material_map = {
@@ -51,19 +150,12 @@ class TextileDBQuery:
             "linen": "Flax",
             "flax": "Flax"
         }
+        self.material_map = {name: sys.intern(category) for name, category in self.material_map.items()}
+        # Longest names first, so e.g. "polyamide" is preferred over a shorter key inside it
+        self._material_regex = re.compile('|'.join(re.escape(key) for key in sorted(self.material_map, key=len, reverse=True)))
+        # Categories of the material names normalized so far (None for unknown names)
+        self._normalized_names = {}
         
-        # Impact area mapping for better readability
-        self.impact_areas = {
-            "climate": {"col_level": 2, "col_score": 3},
-            "water": {"col_level": 4, "col_score": 5},
-            "chemistry": {"col_level": 6, "col_score": 7},
-            "land": {"col_level": 8, "col_score": 9},
-            "biodiversity": {"col_level": 10, "col_score": 11},
-            "resource": {"col_level": 12, "col_score": 13},
-            "human_rights": {"col_level": 14, "col_score": 15},
-            "animal_welfare": {"col_level": 16, "col_score": 17},
-            "integrity": {"col_level": 18, "col_score": 19}
-        }
         
         # Detailed impact categories for each area
         self.detailed_impact_categories = {
@@ -96,7 +188,73 @@ class TextileDBQuery:
                          "Claims management", "Assurance oversight", "Enforcement mechanism", 
                          "Risk management", "Feedback, Complaints & Grievances", "Monitoring, Evaluation & Learning system"]
         }
+        # Interned, so the report's lookups of these names compare by identity
+        self.detailed_impact_categories = {
+            area: [sys.intern(name) for name in names] for area, names in self.detailed_impact_categories.items()
+        }
+        
+        # Load the data after the column maps above, which are used to coerce numeric columns
+        self.textile_data = self._load_textile_data()
+        
+        # Struct-of-arrays view of the scorecard: one array per field, aligned by row position
+        textile_rows = self.textile_data.to_numpy()
+        if textile_rows.size:
+            self._categories = textile_rows[:, 0]
+            self._cert_names = textile_rows[:, 1]
+            levels = textile_rows[:, IMPACT_LEVEL_IDX].astype(np.float64)
+            scores = textile_rows[:, IMPACT_SCORE_IDX].astype(np.float64)
+        else:
+            self._categories = self._cert_names = np.empty(0, dtype=object)
+            levels = scores = np.empty((0, len(IMPACT_AREA_NAMES)))
+        
+        # Areas with both a level and a score for each row
+        self._present = ~(np.isnan(levels) | np.isnan(scores))
+        # Levels are small integers and scores whole numbers up to 100, so store them
+        # narrower when that is lossless (missing levels become 0 and are masked out by _present)
+        levels = np.where(self._present, levels, 0.0)
+        self._levels = levels.astype(np.int16) if np.array_equal(levels, levels.astype(np.int16)) else levels
+        self._scores = scores.astype(np.float32) if np.array_equal(scores, scores.astype(np.float32), equal_nan=True) else scores
+        
+        # Average score of each certification over the areas it has data for (NaN when none or unnamed)
+        counts = self._present.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self._row_avg = np.where(self._present, self._scores, 0.0).sum(axis=1, dtype=np.float64) / counts
+        self._row_avg[pd.isna(self._cert_names)] = np.nan
+        
+        # Row positions of each category and of its "no standard system" baseline, found once
+        self._category_indices = {}
+        self._baseline_indices = {}
+        if not self.textile_data.empty:
+            self._category_indices = {
+                category: np.asarray(indices, dtype=np.intp)
+                for category, indices in self.textile_data.iloc[:, 0].groupby(self.textile_data.iloc[:, 0], observed=True).indices.items()
+            }
+            standard_systems = pd.Series(self._cert_names)
+            for category in set(self.material_map.values()):
+                baseline_mask = standard_systems.str.contains(f"{category} with no standard system", na=False)
+                self._baseline_indices[category] = np.flatnonzero(baseline_mask.to_numpy())
+        
+        # Load detailed data for each textile category, along with per-area column lookups
+        self.detailed_data = {}
+        self._area_subcategory_cols = {}
+        self._area_performance_col = {}
+        self._area_description_col = {}
+        self._load_detailed_data()
         
+        # query_material results of this instance, keyed by material name, and their category parts
+        self._material_results = {}
+        self._category_results = {}
+        
+    @property
+    def impact_areas(self) -> Dict[str, Dict[str, int]]:
+        """
+        Impact area mapping for better readability, built from the column index arrays.
+        """
+        return {
+            area: {"col_level": int(level), "col_score": int(score)}
+            for area, level, score in zip(IMPACT_AREA_NAMES, IMPACT_LEVEL_IDX, IMPACT_SCORE_IDX)
+        }
+    
     def _load_textile_data(self):
         """
         Load the textile database from CSV.
@@ -106,12 +264,27 @@ class TextileDBQuery:
         """
         try:
             # print(f"Loading textile database from: {self.db_path}")
-            df = pd.read_csv(self.db_path)
+            # Skip the header rows (column header plus 3 description rows) while parsing,
+            # and read the '-' placeholders as missing values
+            read_options = {"header": None, "skiprows": 4, "na_values": ["-"]}
+            
+            def read_scorecard():
+                try:
+                    return pd.read_csv(self.db_path, engine='pyarrow', **read_options)
+                except ImportError:
+                    # pyarrow is optional; fall back to the default C parser
+                    return pd.read_csv(self.db_path, **read_options)
+            
+            df = self._read_csv_cached(self.db_path, read_scorecard, read_options)
             # Clean up the dataframe
-            # Skip the header rows (first 3 rows are headers)
-            df = df.iloc[3:].reset_index(drop=True)
             # Remove any completely empty rows
             df = df.dropna(how='all')
+            # Parse the level and score columns once; any other non-numeric cells become NaN
+            numeric_cols = np.concatenate([IMPACT_LEVEL_IDX, IMPACT_SCORE_IDX]).tolist()
+            df.isetitem(numeric_cols, df.iloc[:, numeric_cols].apply(pd.to_numeric, errors='coerce').astype(float))
+            # Store the category column as codes over interned names, so category
+            # lookups against the (interned) material_map values compare by identity
+            df.isetitem(0, df.iloc[:, 0].astype('category').cat.rename_categories(sys.intern))
             print(f"Successfully loaded textile database with {len(df)} entries")
             return df
         except Exception as e:
@@ -119,6 +292,35 @@ class TextileDBQuery:
             # Return an empty DataFrame as fallback
             return pd.DataFrame()
     
+    def _read_csv_cached(self, csv_path, read_csv, options):
+        """
+        Parse a CSV with read_csv(), reusing a copy of the parsed frame from a .cache directory
+        next to it while the CSV is unchanged. The cache file is named by a digest of options
+        (whatever shapes the parsed frame) and CSV_CACHE_VERSION, so changing either re-parses.
+        """
+        tag = hashlib.blake2b(repr((CSV_CACHE_VERSION, options)).encode(), digest_size=8).hexdigest()
+        cache_path = os.path.join(os.path.dirname(csv_path), '.cache', f"{os.path.basename(csv_path)}.{tag}.npz")
+        try:
+            if os.path.getmtime(cache_path) >= os.path.getmtime(csv_path):
+                return _load_frame(cache_path)
+        except Exception:
+            # Missing, stale or unreadable cache; parse the CSV instead
+            pass
+        
+        df = read_csv()
+        try:
+            cache_dir = os.path.dirname(cache_path)
+            os.makedirs(cache_dir, exist_ok=True)
+            _save_frame(cache_path, df)
+            # Drop the copies made with other options or cache versions
+            prefix = os.path.basename(csv_path) + "."
+            for name in os.listdir(cache_dir):
+                if name.startswith(prefix) and os.path.join(cache_dir, name) != cache_path:
+                    os.remove(os.path.join(cache_dir, name))
+        except OSError as e:
+            print(f"Could not cache parsed data for {csv_path}: {e}")
+        return df
+    
     def _load_detailed_data(self):
         """
         Load detailed CSV files for each textile category
@@ -132,14 +334,42 @@ class TextileDBQuery:
             "Wool": "WoolData.csv"
         }
         
+        # Only these columns are ever read from the detailed files
+        subcategory_names = {col for subcategories in self.detailed_impact_categories.values() for col in subcategories}
+        
+        def is_used_column(col):
+            lower = col.lower()
+            return (col == "Reference" or col in subcategory_names
+                    or "impact area performance" in lower or "description" in lower)
+        
         for category, filename in file_map.items():
             file_path = os.path.join(self.data_dir, filename)
             try:
                 if os.path.exists(file_path):
                     # print(f"Loading detailed data for {category} from: {file_path}")
-                    df = pd.read_csv(file_path)
+                    df = self._read_csv_cached(file_path, lambda: pd.read_csv(file_path, usecols=is_used_column), sorted(subcategory_names))
                     # Skip the header rows (2nd and 3rd rows contain descriptions)
                     # Keep the first row since it contains column headers
+                    # Find each impact area's columns once instead of scanning df.columns per query
+                    columns = set(df.columns)
+                    area_subcategory_cols = {
+                        area: [col for col in subcategories if col in columns]
+                        for area, subcategories in self.detailed_impact_categories.items()
+                    }
+                    lower_columns = [(col, col.lower()) for col in df.columns]
+                    self._area_performance_col[category] = {
+                        area: next((col for col, lower in lower_columns if area in lower and "impact area performance" in lower), None)
+                        for area in IMPACT_AREA_NAMES
+                    }
+                    self._area_description_col[category] = {
+                        area: next((col for col, lower in lower_columns if area in lower and "description" in lower), None)
+                        for area in IMPACT_AREA_NAMES
+                    }
+                    self._area_subcategory_cols[category] = area_subcategory_cols
+                    # Parse the subcategory score columns once; description cells become NaN
+                    subcategory_cols = [col for cols in area_subcategory_cols.values() for col in cols]
+                    if subcategory_cols:
+                        df[subcategory_cols] = df[subcategory_cols].apply(pd.to_numeric, errors='coerce').astype(float)
                     self.detailed_data[category] = df
                     print(f"Successfully loaded {category} data with {len(df)} rows")
                 else:
@@ -152,62 +382,59 @@ class TextileDBQuery:
         """
         Normalize a material name to match database categories.
         """
+        if material_name in self._normalized_names:
+            return self._normalized_names[material_name]
+        
         material_lower = material_name.lower()
         
-        # First check for exact matches
-        for key, value in self.material_map.items():
-            if key == material_lower:
-                return value
-                
-        # Then check for partial matches
-        for key, value in self.material_map.items():
-            if key in material_lower:
-                return value
+        # First check for exact matches, then for partial matches
+        category = self.material_map.get(material_lower)
+        if not category:
+            match = self._material_regex.search(material_lower)
+            category = self.material_map[match.group(0)] if match else None
         
-        return None
+        self._normalized_names[material_name] = category
+        return category
     
-    def _extract_certification_data(self, row) -> Dict[str, Any]:
+    def _extract_certifications(self, row_indices) -> List[Dict[str, Any]]:
         """
-        Extract certification data from a dataframe row.
+        Extract certification data for the scorecard rows at the given positions.
         """
-        certification = row.iloc[1]
+        # Gather the rows' levels, scores and the areas that have data at once
+        levels = self._levels[row_indices]
+        scores = self._scores[row_indices]
+        present = self._present[row_indices]
         
-        # Skip rows that don't have a certification name
-        if pd.isna(certification):
-            return None
-            
-        cert_data = {
-            "certification": certification,
-            "impact_scores": {}
-        }
-        
-        # Extract impact area scores
-        for area, cols in self.impact_areas.items():
-            level = row.iloc[cols["col_level"]]
-            score = row.iloc[cols["col_score"]]
+        certifications = []
+        for certification, row_levels, row_scores, row_present in zip(
+            self._cert_names[row_indices].tolist(), levels.tolist(), scores.tolist(), present.tolist()
+        ):
+            # Skip rows that don't have a certification name
+            if pd.isna(certification):
+                continue
             
             # Only include areas that have data
-            if not pd.isna(level) and not pd.isna(score):
-                try:
-                    level_num = int(level) if not pd.isna(level) else 0
-                    score_num = float(score) if not pd.isna(score) else 0.0
-                    cert_data["impact_scores"][area] = {
-                        "level": level_num,
-                        "score": score_num
-                    }
-                except (ValueError, TypeError):
-                    # If conversion fails, use the original value
-                    cert_data["impact_scores"][area] = {
-                        "level": level if not pd.isna(level) else 0,
-                        "score": score if not pd.isna(score) else 0.0
-                    }
+            certifications.append({
+                "certification": certification,
+                "impact_scores": {
+                    area: {"level": int(level), "score": score}
+                    for area, level, score, has_data in zip(IMPACT_AREA_NAMES, row_levels, row_scores, row_present)
+                    if has_data
+                }
+            })
         
-        return cert_data
+        return certifications
     
     def query_material(self, material_name: str) -> Dict[str, Any]:
         """
         Query the textile database for a specific material.
+        Results are memoized per instance since the loaded data never changes; each caller
+        gets its own copy, so changing a result doesn't affect later queries.
         """
+        result = self._material_results.get(material_name)
+        if result is not None:
+            return copy.deepcopy(result)
+        
         if self.textile_data.empty:
             print("Textile database not loaded, returning None")
             return None
@@ -218,27 +445,38 @@ class TextileDBQuery:
         if not category:
             print(f"Material '{material_name}' does not match any known category")
             return None
-            
+        
+        category_data = self._query_category(category)
+        if category_data is None:
+            return None
+        
+        result = self._material_results[material_name] = {"material": material_name, **category_data}
+        return copy.deepcopy(result)
+    
+    def _query_category(self, category: str) -> Dict[str, Any]:
+        """
+        Build the category-level part of a query_material result.
+        Memoized per category, so material names that share a category reuse it.
+        """
+        result = self._category_results.get(category)
+        if result is not None:
+            return result
+        
         # Get rows for this material category
-        material_rows = self.textile_data[self.textile_data.iloc[:, 0] == category]
+        category_indices = self._category_indices.get(category)
         
-        if material_rows.empty:
+        if category_indices is None:
             print(f"No data found for material category '{category}'")
             return None
             
         # Get all certifications for this material
-        certifications = []
-        for _, row in material_rows.iterrows():
-            cert_data = self._extract_certification_data(row)
-            if cert_data:
-                certifications.append(cert_data)
+        certifications = self._extract_certifications(category_indices)
         
         # Build the result structure
         result = {
-            "material": material_name,
             "category": category,
             "certifications": certifications,
-            "overall_impact": self._calculate_overall_impact(material_rows)
+            "overall_impact": self._calculate_overall_impact(category_indices)
         }
         
         # Add baseline data (material with no standard system)
@@ -247,72 +485,39 @@ class TextileDBQuery:
             result["baseline"] = baseline_data
         
         # Add detailed data if available
-        detailed_data = self._get_detailed_data(category, material_name)
+        detailed_data = self._get_detailed_data(category)
         if detailed_data:
             result["detailed_data"] = detailed_data
         
+        self._category_results[category] = result
         return result
     
-    def _calculate_overall_impact(self, material_rows) -> Dict[str, float]:
+    def _calculate_overall_impact(self, row_indices) -> Dict[str, float]:
         """
         Calculate the overall impact score across all certifications for a material.
         """
-        impact_sums = {}
-        impact_counts = {}
+        # Average every impact area's scores at once, ignoring missing cells
+        scores = self._scores[row_indices]
+        present = ~np.isnan(scores)
+        sums = np.where(present, scores, 0.0).sum(axis=0, dtype=np.float64).tolist()
+        counts = present.sum(axis=0).tolist()
         
-        # Iterate through rows and collect scores
-        for _, row in material_rows.iterrows():
-            for area, cols in self.impact_areas.items():
-                score = row.iloc[cols["col_score"]]
-                
-                if not pd.isna(score):
-                    try:
-                        score_num = float(score)
-                        impact_sums[area] = impact_sums.get(area, 0) + score_num
-                        impact_counts[area] = impact_counts.get(area, 0) + 1
-                    except (ValueError, TypeError):
-                        # Skip if conversion fails
-                        continue
-        
-        # Calculate averages
-        impact_avgs = {}
-        for area in impact_sums:
-            if impact_counts[area] > 0:
-                impact_avgs[area] = impact_sums[area] / impact_counts[area]
-        
-        return impact_avgs
+        return {area: total / count for area, total, count in zip(IMPACT_AREA_NAMES, sums, counts) if count}
     
     def _get_baseline_impact(self, material_category: str) -> Dict[str, Any]:
         """
         Get baseline impact data for uncertified materials.
         """
-        # Look for rows that mention "no standard system"
-        baseline_pattern = f"{material_category} with no standard system"
-        baseline_rows = self.textile_data[self.textile_data.iloc[:, 1].str.contains(baseline_pattern, na=False)]
+        # Rows that mention "no standard system", found at load time
+        baseline_indices = self._baseline_indices.get(material_category)
         
-        if baseline_rows.empty:
+        if baseline_indices is None or not baseline_indices.size:
             return None
             
         # Extract impact scores
-        baseline_impacts = {}
-        for area, cols in self.impact_areas.items():
-            scores = []
-            
-            for _, row in baseline_rows.iterrows():
-                score = row.iloc[cols["col_score"]]
-                if not pd.isna(score):
-                    try:
-                        score_num = float(score)
-                        scores.append(score_num)
-                    except (ValueError, TypeError):
-                        continue
-            
-            if scores:
-                baseline_impacts[area] = sum(scores) / len(scores)
-        
-        return baseline_impacts
+        return self._calculate_overall_impact(baseline_indices)
     
-    def _get_detailed_data(self, category: str, material_name: str) -> Dict[str, Any]:
+    def _get_detailed_data(self, category: str) -> Dict[str, Any]:
         """
         Get detailed sustainability data for a material from the category-specific CSV files.
         """
@@ -328,26 +533,20 @@ class TextileDBQuery:
         cert_data["detailed_scores"] = {}
         
         # For each impact area, extract detailed subcategory scores
-        for area, subcategories in self.detailed_impact_categories.items():
+        for area, subcategories in self._area_subcategory_cols[category].items():
             area_data = {}
             
+            # Only the subcategories present in this category's columns
             for subcategory in subcategories:
-                # Look for subcategory in columns
-                if subcategory in material_df.columns:
-                    # Get values for this subcategory
-                    values = material_df[subcategory].dropna().tolist()
-                    if values:
-                        # Convert to float where possible
-                        values = [float(v) if isinstance(v, (int, float)) or (isinstance(v, str) and v.isdigit()) else v for v in values]
-                        # Only include numerical values
-                        numeric_values = [v for v in values if isinstance(v, (int, float))]
-                        if numeric_values:
-                            area_data[subcategory] = {
-                                "average": sum(numeric_values) / len(numeric_values),
-                                "min": min(numeric_values),
-                                "max": max(numeric_values),
-                                "values": numeric_values
-                            }
+                # Get values for this subcategory (parsed to floats at load time)
+                values = material_df[subcategory].dropna().to_numpy()
+                if values.size:
+                    area_data[subcategory] = {
+                        "average": float(values.mean()),
+                        "min": float(values.min()),
+                        "max": float(values.max()),
+                        "values": values.tolist()
+                    }
             
             if area_data:
                 cert_data["detailed_scores"][area] = area_data
@@ -357,22 +556,18 @@ class TextileDBQuery:
         cert_data["available_certifications"] = cert_names
         
         # Try to find average performance for each impact area
-        for area in self.impact_areas.keys():
-            area_column = f"Impact area performance %"
-            area_cols = [col for col in material_df.columns if area.lower() in col.lower() and "impact area performance" in col.lower()]
-            
-            if area_cols:
-                values = material_df[area_cols[0]].dropna().tolist()
-                numeric_values = [float(v) for v in values if isinstance(v, (int, float)) or (isinstance(v, str) and v.replace('.', '', 1).isdigit())]
+        for area, performance_col in self._area_performance_col[category].items():
+            if performance_col is not None:
+                values = pd.to_numeric(material_df[performance_col], errors='coerce').dropna().to_numpy(dtype=float)
                 
-                if numeric_values:
+                if values.size:
                     if "performance_scores" not in cert_data:
                         cert_data["performance_scores"] = {}
                     
                     cert_data["performance_scores"][area] = {
-                        "average": sum(numeric_values) / len(numeric_values),
-                        "min": min(numeric_values),
-                        "max": max(numeric_values)
+                        "average": float(values.mean()),
+                        "min": float(values.min()),
+                        "max": float(values.max())
                     }
         
         return cert_data
@@ -388,48 +583,30 @@ class TextileDBQuery:
             
         normalized_pcts = {mat: pct / total_pct for mat, pct in materials_dict.items()}
         
-        # Calculate weighted impact scores
-        weighted_impacts = {}
-        for area in self.impact_areas.keys():
-            area_sum = 0.0
-            area_count = 0
-            
-            for material, pct in normalized_pcts.items():
-                if material in material_impacts:
-                    impact_data = material_impacts[material]
-                    if "overall_impact" in impact_data and area in impact_data["overall_impact"]:
-                        area_sum += impact_data["overall_impact"][area] * pct
-                        area_count += 1
-            
-            if area_count > 0:
-                weighted_impacts[area] = area_sum
+        # Stack each material's impact scores (NaN where missing) with its share of the blend
+        impact_rows = []
+        pct_values = []
+        for material, pct in normalized_pcts.items():
+            overall_impact = material_impacts.get(material, {}).get("overall_impact")
+            if overall_impact is not None:
+                impact_rows.append([overall_impact.get(area, np.nan) for area in IMPACT_AREA_NAMES])
+                pct_values.append(pct)
+        impacts = np.array(impact_rows, dtype=np.float64).reshape(-1, len(IMPACT_AREA_NAMES))
         
-        # Calculate overall sustainability score (0-10 scale)
-        sustainability_score = 0.0
-        score_count = 0
-        
-        # Weights for different impact areas
-        area_weights = {
-            "climate": 0.20,
-            "water": 0.15,
-            "chemistry": 0.15,
-            "land": 0.10,
-            "biodiversity": 0.10,
-            "resource": 0.10,
-            "human_rights": 0.15,
-            "animal_welfare": 0.05
-            # integrity not included in sustainability score
+        # Calculate weighted impact scores
+        has_area = ~np.isnan(impacts).all(axis=0)
+        weighted = np.nansum(impacts * np.array(pct_values)[:, None], axis=0)
+        weighted_impacts = {
+            area: score for area, score, present in zip(IMPACT_AREA_NAMES, weighted.tolist(), has_area.tolist()) if present
         }
         
-        for area, weight in area_weights.items():
-            if area in weighted_impacts:
-                # Convert percentage scores (0-100) to 0-10 scale
-                area_score = weighted_impacts[area] / 10.0
-                sustainability_score += area_score * weight
-                score_count += 1
-        
-        # If we have no scores, default to 5.0 (medium)
-        if score_count == 0:
+        # Calculate overall sustainability score (0-10 scale)
+        scored = has_area & (SUSTAINABILITY_WEIGHTS > 0)
+        if scored.any():
+            # Convert percentage scores (0-100) to 0-10 scale
+            sustainability_score = float(np.dot(weighted[scored] / 10.0, SUSTAINABILITY_WEIGHTS[scored]))
+        else:
+            # If we have no scores, default to 5.0 (medium)
             sustainability_score = 5.0
             
         # Calculate detailed weighted scores if available
@@ -458,39 +635,28 @@ class TextileDBQuery:
             
         normalized_pcts = {mat: pct / total_pct for mat, pct in materials_dict.items()}
         
-        # Collect detailed data from each material
-        detailed_data = {}
+        # Collect detailed data from each material as [weighted_sum, count] pairs
+        detailed_data = defaultdict(lambda: defaultdict(lambda: [0.0, 0]))
         
         for material, pct in normalized_pcts.items():
             if material in material_impacts:
                 impact_data = material_impacts[material]
                 if "detailed_data" in impact_data and "detailed_scores" in impact_data["detailed_data"]:
                     for area, subcategories in impact_data["detailed_data"]["detailed_scores"].items():
-                        if area not in detailed_data:
-                            detailed_data[area] = {}
-                            
+                        area_data = detailed_data[area]
+                        
                         for subcategory, values in subcategories.items():
-                            if subcategory not in detailed_data[area]:
-                                detailed_data[area][subcategory] = {
-                                    "weighted_sum": 0.0,
-                                    "count": 0
-                                }
-                            
-                            if "average" in values:
-                                detailed_data[area][subcategory]["weighted_sum"] += values["average"] * pct
-                                detailed_data[area][subcategory]["count"] += 1
+                            entry = area_data[subcategory]
+                            average = values.get("average")
+                            if average is not None:
+                                entry[0] += average * pct
+                                entry[1] += 1
         
         # Calculate weighted averages
-        weighted_results = {}
-        
-        for area, subcategories in detailed_data.items():
-            weighted_results[area] = {}
-            
-            for subcategory, data in subcategories.items():
-                if data["count"] > 0:
-                    weighted_results[area][subcategory] = data["weighted_sum"]
-        
-        return weighted_results
+        return {
+            area: {subcategory: weighted_sum for subcategory, (weighted_sum, count) in subcategories.items() if count}
+            for area, subcategories in detailed_data.items()
+        }
     
     def _get_sustainability_level(self, score: float) -> str:
         """
@@ -516,40 +682,9 @@ class TextileDBQuery:
     def parse_material_string(self, material_string: str) -> Dict[str, float]:
         """
         Parse a material composition string into a dictionary of materials and percentages.
+        Memoized since the same composition labels recur across products; each call returns a new dict.
         """
-        if not material_string:
-            return {}
-            
-        # Clean up the string
-        material_string = material_string.lower().strip()
-        
-        # Try to extract percentages and materials
-        materials = {}
-        
-        # Pattern: percentage followed by material name
-        pattern = r'(\d+)%?\s*([a-zA-Z-]+)'
-        matches = re.findall(pattern, material_string)
-        
-        if matches:
-            for match in matches:
-                percentage = float(match[0]) / 100.0
-                material = match[1].strip()
-                
-                materials[material] = percentage
-        else:
-            # If no percentages found, try to extract just material names
-            material_names = re.findall(r'([a-zA-Z-]+)', material_string)
-            if material_names:
-                # If only one material, assume 100%
-                if len(material_names) == 1:
-                    materials[material_names[0].strip()] = 1.0
-                else:
-                    # If multiple materials but no percentages, distribute evenly
-                    equal_pct = 1.0 / len(material_names)
-                    for material in material_names:
-                        materials[material.strip()] = equal_pct
-        
-        return materials
+        return dict(_parse_material_string(material_string))
     
     def get_recommended_alternatives(self, material: str) -> List[Dict[str, Any]]:
         """
@@ -560,37 +695,25 @@ class TextileDBQuery:
             return []
             
         # Get rows for this material category
-        material_rows = self.textile_data[self.textile_data.iloc[:, 0] == category]
+        category_indices = self._category_indices.get(category)
         
-        if material_rows.empty:
+        if category_indices is None:
             return []
             
-        # Get all certifications for this material
-        certifications = []
-        for _, row in material_rows.iterrows():
-            cert_data = self._extract_certification_data(row)
-            if cert_data:
-                # Calculate average impact score
-                scores = []
-                for area_data in cert_data["impact_scores"].values():
-                    if "score" in area_data:
-                        scores.append(area_data["score"])
-                
-                if scores:
-                    avg_score = sum(scores) / len(scores)
-                    cert_data["average_score"] = avg_score
-                    certifications.append(cert_data)
-        
-        # Sort by average score, highest first
-        certifications.sort(key=lambda x: x.get("average_score", 0), reverse=True)
-        
-        # Return top 3 recommendations
+        # Rank the category's certifications by their precomputed average score, highest first
+        # (a stable sort, so ties keep the scorecard order)
+        category_avg = self._row_avg[category_indices]
+        scored = ~np.isnan(category_avg)
+        candidates = category_indices[scored]
+        top_indices = candidates[np.argsort(-category_avg[scored], kind='stable')[:3]]
+        
+        # Return top 3 recommendations, extracting only those rows
         recommendations = []
-        for cert in certifications[:3]:
+        for cert, avg_score in zip(self._extract_certifications(top_indices), self._row_avg[top_indices].tolist()):
             recommendations.append({
                 "name": cert["certification"],
                 "category": category,
-                "average_score": cert.get("average_score", 0),
+                "average_score": avg_score,
                 "impact_scores": cert["impact_scores"]
             })
             
@@ -601,25 +724,25 @@ class TextileDBQuery:
         Get a detailed explanation of a specific impact area for a material.
         """
         category = self._normalize_material_name(material)
-        if not category or impact_area not in self.impact_areas:
+        if not category or impact_area not in IMPACT_AREA_NAMES:
             return f"No detailed explanation available for {material} in area: {impact_area}"
         
         # Check if we have detailed data
         if category in self.detailed_data:
             df = self.detailed_data[category]
             
-            # Find columns for this impact area
-            area_cols = [col for col in df.columns if impact_area.lower() in col.lower() and "description" in col.lower()]
+            # Description column for this impact area, found at load time
+            description_col = self._area_description_col[category][impact_area]
             
-            if area_cols:
-                descriptions = df[area_cols[0]].dropna().tolist()
-                if descriptions:
-                    return descriptions[0]
+            if description_col is not None:
+                # First non-empty description, read as a single cell
+                first_row = df[description_col].first_valid_index()
+                if first_row is not None:
+                    return df.at[first_row, description_col]
             
             # If we don't have a specific description column, return subcategory data
             if impact_area in self.detailed_impact_categories:
-                subcats = self.detailed_impact_categories[impact_area]
-                available_subcats = [s for s in subcats if s in df.columns]
+                available_subcats = self._area_subcategory_cols[category][impact_area]
                 
                 if available_subcats:
                     return f"Key factors for {impact_area} in {material}: {', '.join(available_subcats)}"
@@ -1,9 +1,97 @@
 """
 ESG analyzer for finding, retrieving, and analyzing sustainability reports and news.
 """
+import asyncio
+import functools
+import json
+import os
 import random
-from typing import Dict, Any, List
-from utils.gemini_api import GeminiAPI
+import sys
+import types
+import numpy as np
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+
+# Most brands whose news is analyzed in a single Gemini request
+NEWS_BATCH_SIZE = 16
+
+# Errors malformed news articles cause while their analysis is prepared or run
+# (Gemini API failures are handled by the client itself)
+_NEWS_ERRORS = (KeyError, TypeError, AttributeError, ValueError)
+
+
+def _brand_key(brand: str) -> str:
+    """
+    Normalize a brand name to the key used by the databases and caches (lowercase, no spaces).
+    The key is interned, so repeated lookups of the same brand hit the identity fast path.
+    """
+    return sys.intern(brand.lower().replace(' ', ''))
+
+
+# Mock ESG report and news databases, stored as JSON under data/ and loaded on first use
+MOCK_ESG_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'mock_esg_data.json')
+MOCK_NEWS_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'mock_news_data.json')
+
+
+@functools.lru_cache(maxsize=None)
+def _load_mock_esg_data() -> Mapping[str, Mapping[str, Any]]:
+    """
+    Load the mock ESG report database, shared read-only by all analyzers.
+    Each report is exposed as a read-only view, so the shared entries can be returned as is.
+    """
+    with open(MOCK_ESG_DATA_PATH, encoding='utf-8') as f:
+        reports = json.load(f)
+    return types.MappingProxyType({brand_key: types.MappingProxyType(report) for brand_key, report in reports.items()})
+
+
+@functools.lru_cache(maxsize=None)
+def _load_mock_news_data() -> Mapping[str, List[Dict[str, Any]]]:
+    """
+    Load the mock sustainability news database, shared read-only by all analyzers.
+    """
+    with open(MOCK_NEWS_DATA_PATH, encoding='utf-8') as f:
+        news = json.load(f)
+    return types.MappingProxyType(news)
+
+# Brand-specific part of the news analysis prompt, which follows Gemini's static instructions
+_NEWS_PROMPT_TEMPLATE = """
+        Brand: {brand}
+        
+        {articles}
+        """
+
+# How each news article is laid out in the analysis prompt
+_ARTICLE_FORMAT = "Article: {}\nSource: {}\nDate: {}\nSummary: {}".format
+
+
+class _ESGStore:
+    """
+    Columnar view of the ESG report database: brand keys sorted into a NumPy array,
+    with the report entries in the same order, for looking up many brands at once.
+    """
+    
+    def __init__(self, reports):
+        brand_keys = sorted(reports)
+        self.keys = np.array(brand_keys, dtype=str)
+        self.entries = [reports[brand_key] for brand_key in brand_keys]
+    
+    def find_many(self, brand_keys: List[str]) -> List[Optional[Mapping[str, Any]]]:
+        """
+        Look up several brand keys with one binary search, giving None for unknown brands.
+        """
+        if not brand_keys or not len(self.keys):
+            return [None] * len(brand_keys)
+        queries = np.array(brand_keys, dtype=str)
+        positions = np.minimum(np.searchsorted(self.keys, queries), len(self.keys) - 1)
+        hits = self.keys[positions] == queries
+        return [self.entries[position] if hit else None for position, hit in zip(positions.tolist(), hits.tolist())]
+
+
+@functools.lru_cache(maxsize=None)
+def _mock_esg_store() -> _ESGStore:
+    """
+    Columnar store over the mock ESG report database, built on first use.
+    """
+    return _ESGStore(_load_mock_esg_data())
 
 
 class ESGAnalyzer:
@@ -12,251 +100,128 @@ class ESGAnalyzer:
     Includes methods to find and access reports and to summarize news articles.
     """
     
-    def __init__(self, gemini_api_key=None, use_mock_api=True):
+    def __init__(self, gemini_api_key=None, use_mock_api=True, seed=None):
         """
         Initialize the ESG analyzer with mock data and Gemini API.
+        
+        Args:
+            gemini_api_key: Google API key for Gemini
+            use_mock_api: Whether to use the mock Gemini implementation
+            seed: Optional seed mixed into the random draws for unknown brands
         """
-        # Initialize Gemini API client
-        self.gemini_api = GeminiAPI(api_key=gemini_api_key, use_mock=use_mock_api)
+        # Gemini API client, created on first use since report lookups don't need it
+        self._gemini_api_key = gemini_api_key
+        self._use_mock_api = use_mock_api
+        self._gemini_api = None
         
-        # Mock ESG report database
-        self.mock_esg_data = {
-            "ecowear": {
-                "found": True,
-                "accessible": True,
-                "url": "https://example.com/ecowear-sustainability-report-2023.pdf",
-                "year": 2023,
-                "content": """
-                EcoWear Sustainability Report 2023
-                
-                Our Commitments:
-                - 100% organic cotton by 2025
-                - Carbon neutral operations by 2030
-                - Zero waste to landfill by 2024
-                - Fair labor practices across all manufacturing facilities
-                
-                Material Sourcing:
-                We have increased our use of organic cotton to 78% this year,
-                up from 65% last year. Our goal is to reach 100% by 2025.
-                
-                Supply Chain:
-                We audit 100% of our tier 1 suppliers annually for compliance with 
-                our fair labor and environmental standards.
-                
-                Carbon Footprint:
-                We have reduced our carbon emissions by 15% since our 2019 baseline,
-                through renewable energy adoption and efficiency improvements.
-                
-                Water Usage:
-                Water consumption in our manufacturing process has decreased by 22%
-                through closed-loop water systems and efficiency improvements.
-                """
-            },
-            "greendenim": {
-                "found": True,
-                "accessible": True,
-                "url": "https://example.com/greendenim-esg-report-2023.pdf",
-                "year": 2023,
-                "content": """
-                GreenDenim Sustainability Report 2023
-                
-                Our Vision:
-                To be the world's most environmentally responsible denim brand.
-                
-                Achievements:
-                - 85% reduction in water usage per pair of jeans since 2018
-                - 50% of cotton sourced is organic or recycled
-                - 100% of factories audited for social compliance
-                
-                Materials:
-                Our denim now uses 35% recycled cotton and 15% hemp on average,
-                reducing our reliance on virgin materials.
-                
-                Chemical Management:
-                We have eliminated hazardous chemicals from our production process,
-                exceeding ZDHC (Zero Discharge of Hazardous Chemicals) requirements.
-                
-                Worker Welfare:
-                All workers in our supply chain earn at least a living wage as
-                defined by regional benchmarks.
-                
-                Circular Economy:
-                We have implemented a takeback program that has collected and
-                recycled over 50,000 pairs of jeans in the past year.
-                """
-            },
-            "basicthreads": {
-                "found": True,
-                "accessible": False,
-                "url": "https://example.com/basicthreads-sustainability.pdf",
-                "year": 2022
-            },
-            "denimco": {
-                "found": False
-            },
-            "ecooutdoor": {
-                "found": True,
-                "accessible": True,
-                "url": "https://example.com/ecooutdoor-impact-report-2023.pdf",
-                "year": 2023,
-                "content": """
-                EcoOutdoor Impact Report 2023
-                
-                Environmental Impact:
-                - 100% of our polyester is now recycled from post-consumer plastic bottles
-                - PFC-free DWR treatments across all water-resistant products
-                - Renewable energy powers 75% of our operations
-                
-                Product Longevity:
-                We design products for durability and repairability, backed by our
-                lifetime repair guarantee.
-                
-                Packaging:
-                All packaging is plastic-free and made from recycled or FSC-certified materials.
-                
-                Climate Action:
-                We are certified carbon neutral across our entire value chain through
-                reduction initiatives and verified carbon offset projects.
-                
-                Community:
-                We donate 1% of annual sales to environmental conservation initiatives
-                through our partnership with 1% for the Planet.
-                """
-            },
-            "northstyle": {
-                "found": True,
-                "accessible": False,
-                "url": "https://example.com/northstyle-csr-report.pdf",
-                "year": 2022
-            },
-            "athletegear": {
-                "found": False
-            },
-            "cashmereelite": {
-                "found": True,
-                "accessible": True,
-                "url": "https://example.com/cashmereelite-responsibility-report.pdf",
-                "year": 2023,
-                "content": """
-                CashmereElite Responsibility Report 2023
-                
-                Material Traceability:
-                100% of our cashmere is fully traceable to the source herding communities
-                in Mongolia and China.
-                
-                Animal Welfare:
-                We adhere to the Responsible Wool Standard (RWS) and Good Cashmere Standard
-                for all wool and cashmere sourcing.
-                
-                Grassland Management:
-                Working with herding communities to implement sustainable grazing practices
-                to prevent overgrazing and desertification.
-                
-                Economic Impact:
-                Direct trade relationships with herding communities ensure fair prices
-                and community development initiatives.
-                
-                Product End-of-Life:
-                Our new recycling program accepts used cashmere items for fiber
-                recycling into new products.
-                """
-            }
-        }
+        self._seed = seed
         
-        # Mock sustainability news database
-        self.mock_news_data = {
-            "denimco": [
-                {
-                    "title": "DenimCo Launches New 'Low Impact' Denim Collection",
-                    "source": "Fashion Daily",
-                    "date": "2023-09-15",
-                    "summary": "DenimCo has announced a new collection using 30% less water and energy in production. The 'Low Impact' line features organic cotton and natural indigo dyes, marking the company's first major sustainability initiative."
-                },
-                {
-                    "title": "Industry Analysis: Mid-Size Denim Brands Sustainability Rankings",
-                    "source": "Apparel Insight",
-                    "date": "2023-07-22",
-                    "summary": "DenimCo ranked in the middle tier of denim brands for sustainability practices. The report noted a lack of transparency in supply chain and no published sustainability goals."
-                }
-            ],
-            "basicthreads": [
-                {
-                    "title": "BasicThreads Commits to Better Cotton Initiative",
-                    "source": "Textile Update",
-                    "date": "2023-08-10",
-                    "summary": "BasicThreads announced it will source 50% of its cotton through the Better Cotton Initiative by 2025, addressing concerns from environmental groups about its sourcing practices."
-                },
-                {
-                    "title": "Labor Rights Groups Flag Issues at BasicThreads Suppliers",
-                    "source": "Supply Chain Monitor",
-                    "date": "2023-04-18",
-                    "summary": "A coalition of labor rights organizations has identified concerns regarding working conditions and wage levels at several factories supplying BasicThreads in Southeast Asia."
-                }
-            ],
-            "northstyle": [
-                {
-                    "title": "NorthStyle Eliminates PFAS from Product Line",
-                    "source": "Outdoor Industry News",
-                    "date": "2023-11-05",
-                    "summary": "NorthStyle announced the complete elimination of PFAS (per- and polyfluoroalkyl substances) from its outdoor apparel, ahead of upcoming regulations on these 'forever chemicals'."
-                },
-                {
-                    "title": "NorthStyle Partners with Textile Recycling Firm",
-                    "source": "Circular Economy Weekly",
-                    "date": "2023-10-12",
-                    "summary": "NorthStyle has partnered with RecycleWear to implement a take-back program for used garments, with the goal of recycling 100 tons of textiles in the first year."
-                }
-            ],
-            "athletegear": [
-                {
-                    "title": "AthleteGear Faces Greenwashing Accusations",
-                    "source": "Consumer Watch",
-                    "date": "2023-09-30",
-                    "summary": "Consumer advocacy groups have challenged AthleteGear's 'eco-friendly' claims, citing a lack of verifiable data and third-party certification for their supposedly sustainable product lines."
-                },
-                {
-                    "title": "Sports Apparel Industry Sustainability Report",
-                    "source": "Retail Analysis",
-                    "date": "2023-06-15",
-                    "summary": "AthleteGear scored below industry average on sustainability metrics in a new report, particularly in areas of supply chain transparency and chemical management in manufacturing."
-                }
-            ]
-        }
+        # Results of brands already looked up, keyed by normalized brand name
+        self._report_cache = {}
+        self._news_cache = {}
+    
+    @property
+    def mock_esg_data(self) -> Mapping[str, Mapping[str, Any]]:
+        """
+        Mock ESG report database, loaded on first access.
+        """
+        return _load_mock_esg_data()
+    
+    @property
+    def mock_news_data(self) -> Mapping[str, List[Dict[str, Any]]]:
+        """
+        Mock sustainability news database, loaded on first access.
+        """
+        return _load_mock_news_data()
+    
+    @property
+    def gemini_api(self):
+        """
+        Shared Gemini API client, imported and initialized on first access.
+        """
+        if self._gemini_api is None:
+            from utils.gemini_api import get_gemini_api
+            self._gemini_api = get_gemini_api(self._gemini_api_key, self._use_mock_api)
+        return self._gemini_api
+    
+    def clear_cache(self):
+        """
+        Forget the ESG reports and news analyses looked up so far.
+        """
+        self._report_cache.clear()
+        self._news_cache.clear()
+    
+    def _brand_rng(self, brand_key: str) -> random.Random:
+        """
+        Random generator for a brand's mock data, seeded by the brand (and the analyzer's seed).
+        Each lookup gets its own generator, so concurrent lookups share no random state.
+        """
+        return random.Random(brand_key if self._seed is None else f"{self._seed}:{brand_key}")
     
-    def find_esg_report(self, brand: str) -> Dict[str, Any]:
+    def find_esg_report(self, brand: str) -> Mapping[str, Any]:
         """
         Search for ESG or sustainability reports for a given brand.
+        The returned report is a read-only mapping shared with later lookups.
+        """
+        brand_key = _brand_key(brand)
+        
+        # Reuse the result for a brand that was already looked up this session
+        if brand_key not in self._report_cache:
+            self._report_cache[brand_key] = self._lookup_esg_report(brand, brand_key)
+        return self._report_cache[brand_key]
+    
+    def find_esg_reports(self, brands: List[str]) -> List[Mapping[str, Any]]:
+        """
+        Search for the ESG reports of several brands, looking the known brands up in one batch.
+        """
+        brand_keys = [_brand_key(brand) for brand in brands]
+        uncached = [(brand, brand_key) for brand, brand_key in zip(brands, brand_keys) if brand_key not in self._report_cache]
+        
+        if uncached:
+            entries = _mock_esg_store().find_many([brand_key for _, brand_key in uncached])
+            for (brand, brand_key), entry in zip(uncached, entries):
+                # Brands missing from the database get the same simulated lookup as find_esg_report
+                self._report_cache[brand_key] = entry if entry is not None else self._lookup_esg_report(brand, brand_key)
+        
+        return [self._report_cache[brand_key] for brand_key in brand_keys]
+    
+    def _lookup_esg_report(self, brand: str, brand_key: str) -> Mapping[str, Any]:
+        """
+        Look up the ESG report for a brand, without caching.
         """
         # In real implementation, this would use web search APIs or databases
         # For mock purposes, check our predefined data
-        brand_key = brand.lower().replace(' ', '')
-        
         if brand_key in self.mock_esg_data:
             return self.mock_esg_data[brand_key]
         
         # If not in database, randomly decide if report exists (30% chance)
-        # This simulates the incomplete nature of real-world data
-        found = random.random() < 0.3
+        # This simulates the incomplete nature of real-world data; the draws are
+        # seeded by the brand so the outcome is reproducible across runs
+        rng = self._brand_rng(brand_key)
+        found = rng.random() < 0.3
         
         if found:
-            accessible = random.random() < 0.6  # 60% chance it's accessible
+            accessible = rng.random() < 0.6  # 60% chance it's accessible
             if accessible:
-                return {
+                report = {
                     "found": True,
                     "accessible": True,
                     "url": f"https://example.com/{brand_key}-sustainability-report.pdf",
-                    "year": random.choice([2021, 2022, 2023]),
+                    "year": rng.choice((2021, 2022, 2023)),
                     "content": f"Generic sustainability report for {brand}."
                 }
             else:
-                return {
+                report = {
                     "found": True,
                     "accessible": False,
                     "url": f"https://example.com/{brand_key}-sustainability-report.pdf",
-                    "year": random.choice([2021, 2022, 2023])
+                    "year": rng.choice((2021, 2022, 2023))
                 }
         else:
-            return {"found": False}
+            report = {"found": False}
+        
+        # Read-only like the database entries, since the result is cached and shared
+        return types.MappingProxyType(report)
     
     def analyze_report_with_gemini(self, report_content: str) -> Dict[str, Any]:
         """
@@ -265,164 +230,205 @@ class ESGAnalyzer:
         # Use the GeminiAPI client to analyze ESG report
         return self.gemini_api.analyze_esg_report(report_content)
     
+    async def analyze_report_with_gemini_async(self, report_content: str) -> Dict[str, Any]:
+        """
+        Async variant of analyze_report_with_gemini.
+        """
+        return await self.gemini_api.analyze_esg_report_async(report_content)
+    
     def search_and_summarize_sustainability_news(self, brand: str) -> Dict[str, Any]:
         """
         Search for and summarize recent sustainability news about a brand.
         """
-        try:
-            # In real implementation, this would use web search APIs to find news
-            # For mock purposes, check our predefined news data
-            brand_key = brand.lower().replace(' ', '')
-            
-            # Initialize news_items as an empty list to avoid 'bool' object is not iterable error
-            news_items = []
-            
-            # Check if we have mock news for this brand
-            if brand_key in self.mock_news_data:
-                news_items = self.mock_news_data[brand_key]
-            else:
-                # If not in database, we'll have a 40% chance of finding generic news
-                if random.random() < 0.4:
-                    # Generate generic news items
-                    news_items = [
-                        {
-                            "title": f"{brand} Mentioned in Industry Sustainability Report",
-                            "source": "Industry Today",
-                            "date": "2023-08-20",
-                            "summary": f"{brand} was mentioned in an industry report on sustainability practices, though specific details about their initiatives were limited."
-                        }
-                    ]
-                    
-                    # 50% chance of a second generic item
-                    if random.random() < 0.5:
-                        news_items.append({
-                            "title": f"Market Analysis: {brand}'s Position on Sustainability",
-                            "source": "Market Insider",
-                            "date": "2023-06-05",
-                            "summary": f"Analysts note that {brand} has room for improvement in sustainability practices compared to industry leaders, but is making incremental progress."
-                        })
-            
-            # Ensure news_items is a list
-            if not isinstance(news_items, list):
-                print(f"Warning: news_items is not a list: {type(news_items)}. Converting to empty list.")
-                news_items = []
-            
-            # If we have news, use Gemini API to analyze it
-            if news_items:
-                # In a real implementation, we would use the Gemini API here
-                # For now, we'll continue with the mock implementation
-                
-                # Format articles for analysis
-                articles_text = "\n\n".join([
-                    f"Article: {item['title']}\nSource: {item['source']}\nDate: {item['date']}\nSummary: {item['summary']}"
-                    for item in news_items if isinstance(item, dict) and "summary" in item
-                ])
-                
-                prompt = f"""
-                Analyze the following news articles about {brand}'s sustainability practices:
-                
-                {articles_text}
-                
-                Based on these articles:
-                1) Rate the company's sustainability efforts on a scale of 0-10
-                2) Summarize the key sustainability initiatives or concerns
-                3) Identify whether there are any greenwashing allegations
-                4) Note any significant environmental or social impact mentioned
-                """
-                
-                # Use the Gemini API to analyze the news articles
-                return self.gemini_api.analyze_sustainability_news(
+        brand_key, analysis, news_items = self._lookup_news(brand)
+        if analysis is None:
+            try:
+                analysis = self.gemini_api.analyze_sustainability_news(
                     brand=brand,
                     news_items=news_items,
-                    prompt=prompt
+                    prompt=self._news_prompt(brand, news_items)
                 )
-            
-            # Mock Gemini analysis of news articles
-            sentiment_score = 0
-            
-            for item in news_items:
-                # Check if item is a dictionary with required keys
-                if not isinstance(item, dict) or "summary" not in item:
-                    print(f"Warning: Invalid news item format: {item}. Skipping.")
-                    continue
-                    
-                text = item["summary"].lower()
-                
-                # Simple sentiment analysis
-                positive_words = ["improve", "reduce", "achieve", "increase", "goal", "initiative", "success"]
-                negative_words = ["concern", "issue", "problem", "fail", "accus", "question", "greenwash"]
-                
-                pos_count = sum(1 for word in positive_words if word in text)
-                neg_count = sum(1 for word in negative_words if word in text)
-                
-                # Adjust sentiment score based on this article
-                sentiment_score += (pos_count - neg_count) / max(1, len(news_items))
-            
-            # Scale sentiment to 0-10
-            scaled_sentiment = max(0, min(10, (sentiment_score + 2) * 2.5))
-            
-            # Generate summary based on news items
+            except _NEWS_ERRORS as e:
+                return self._news_error(brand, e)
+            self._remember_news(brand_key, analysis)
+        return analysis
+    
+    async def search_and_summarize_sustainability_news_async(self, brand: str) -> Dict[str, Any]:
+        """
+        Async variant of search_and_summarize_sustainability_news, so several brands' Gemini calls can overlap.
+        """
+        brand_key, analysis, news_items = self._lookup_news(brand)
+        if analysis is None:
+            try:
+                analysis = await self.gemini_api.analyze_sustainability_news_async(
+                    brand=brand,
+                    news_items=news_items,
+                    prompt=self._news_prompt(brand, news_items)
+                )
+            except _NEWS_ERRORS as e:
+                return self._news_error(brand, e)
+            self._remember_news(brand_key, analysis)
+        return analysis
+    
+    def _lookup_news(self, brand: str) -> Tuple[Optional[str], Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Shared start of the news summarization: validate the brand, reuse an analysis from this
+        session and find the brand's news. Returns (brand_key, analysis, news_items), where the
+        analysis is None when Gemini has to analyze the news items.
+        """
+        # Validate the brand up front rather than catching the errors it would cause
+        if not isinstance(brand, str) or not brand.strip():
+            print(f"Error in news summarization: invalid brand {brand!r}")
+            return None, self._news_fallback(brand), []
+        brand_key = _brand_key(brand)
+        
+        # Reuse the analysis of a brand that was already looked up this session
+        if brand_key in self._news_cache:
+            return brand_key, self._news_cache[brand_key], []
+        
+        news_items = self._find_news_items(brand, brand_key)
+        if not news_items:
+            self._news_cache[brand_key] = self._no_news_analysis(brand)
+            return brand_key, self._news_cache[brand_key], []
+        return brand_key, None, news_items
+    
+    def _remember_news(self, brand_key: str, analysis: Dict[str, Any]):
+        """
+        Keep a brand's news analysis for this session, unless it is the mock fallback
+        for a failed Gemini request, which is asked for again on the next lookup.
+        """
+        from utils.gemini_api import FallbackResult
+        
+        if not isinstance(analysis, FallbackResult):
+            self._news_cache[brand_key] = analysis
+    
+    def _news_error(self, brand: str, error: Exception) -> Dict[str, Any]:
+        """
+        Report a news analysis that failed on malformed articles and return the fallback response.
+        """
+        print(f"Error in news summarization: {error}")
+        return self._news_fallback(brand)
+    
+    async def analyze_brands(self, brands: List[str]) -> List[Dict[str, Any]]:
+        """
+        Summarize the sustainability news of several brands, sending the brands that
+        have news to Gemini in batches of NEWS_BATCH_SIZE, with the batches running concurrently.
+        """
+        # Find every uncached brand's news, summarizing brands without news locally
+        pending = {}
+        for brand in brands:
+            if not isinstance(brand, str) or not brand.strip():
+                continue
+            brand_key = _brand_key(brand)
+            if brand_key in self._news_cache or brand_key in pending:
+                continue
+            news_items = self._find_news_items(brand, brand_key)
             if not news_items:
-                summary = f"No significant sustainability news found for {brand}."
-            else:
-                topics = []
-                for item in news_items:
-                    if not isinstance(item, dict) or "summary" not in item:
-                        continue
-                        
-                    item_summary = item["summary"].lower()
-                    if "water" in item_summary:
-                        topics.append("water usage")
-                    if "energy" in item_summary:
-                        topics.append("energy consumption")
-                    if "labor" in item_summary or "worker" in item_summary:
-                        topics.append("labor practices")
-                    if "material" in item_summary or "sourc" in item_summary:
-                        topics.append("material sourcing")
+                self._news_cache[brand_key] = self._no_news_analysis(brand)
+                continue
+            try:
+                pending[brand_key] = (brand, news_items, self._news_prompt(brand, news_items))
+            except _NEWS_ERRORS:
+                # Left to the per-brand path below, which reports the error and falls back
+                continue
+        
+        requests = list(pending.values())
+        batches = [requests[start:start + NEWS_BATCH_SIZE] for start in range(0, len(requests), NEWS_BATCH_SIZE)]
+        batch_analyses = await asyncio.gather(*(self.gemini_api.analyze_sustainability_news_batch_async(batch) for batch in batches))
+        analyzed = dict(zip(pending, (analysis for analyses in batch_analyses for analysis in analyses)))
+        for brand_key, analysis in analyzed.items():
+            self._remember_news(brand_key, analysis)
+        
+        # Everything is analyzed or cached now, apart from brands that fail and get the fallback response
+        results = []
+        for brand in brands:
+            analysis = analyzed.get(_brand_key(brand)) if isinstance(brand, str) else None
+            results.append(analysis if analysis is not None else await self.search_and_summarize_sustainability_news_async(brand))
+        return results
+    
+    def _news_fallback(self, brand: str) -> Dict[str, Any]:
+        """
+        Fallback response when news summarization fails, which callers must not cache.
+        """
+        from utils.gemini_api import FallbackResult
+        
+        return FallbackResult({
+            "rating": 5.0,
+            "news_items": [],
+            "summary": f"Unable to retrieve sustainability news for {brand}.",
+            "has_recent_initiatives": False,
+            "has_criticism": False
+        })
+    
+    def _find_news_items(self, brand: str, brand_key: str) -> List[Dict[str, Any]]:
+        """
+        Find recent sustainability news articles about a brand.
+        """
+        # In real implementation, this would use web search APIs to find news
+        # For mock purposes, check our predefined news data
+        
+        # Initialize news_items as an empty list to avoid 'bool' object is not iterable error
+        news_items = []
+        
+        # Check if we have mock news for this brand
+        if brand_key in self.mock_news_data:
+            news_items = self.mock_news_data[brand_key]
+        else:
+            # If not in database, we'll have a 40% chance of finding generic news,
+            # drawn from a generator seeded by the brand so the outcome is reproducible
+            rng = self._brand_rng(brand_key)
+            if rng.random() < 0.4:
+                # Generate generic news items
+                news_items = [
+                    {
+                        "title": f"{brand} Mentioned in Industry Sustainability Report",
+                        "source": "Industry Today",
+                        "date": "2023-08-20",
+                        "summary": f"{brand} was mentioned in an industry report on sustainability practices, though specific details about their initiatives were limited."
+                    }
+                ]
                 
-                if topics:
-                    topics = list(set(topics))  # Remove duplicates
-                    topics_str = ", ".join(topics)
-                    summary = f"Recent news about {brand} focuses on {topics_str}. "
-                else:
-                    summary = f"Recent news mentions {brand}'s sustainability efforts. "
-                    
-                if scaled_sentiment > 7:
-                    summary += "Coverage is generally positive, highlighting progress and commitments."
-                elif scaled_sentiment > 4:
-                    summary += "Coverage is mixed, noting both achievements and areas for improvement."
-                else:
-                    summary += "Coverage raises concerns about the effectiveness or authenticity of initiatives."
-            
-            # Check for initiatives and criticisms safely
-            has_initiatives = False
-            has_criticism = False
-            
-            for item in news_items:
-                if not isinstance(item, dict) or "summary" not in item:
-                    continue
-                item_summary = item["summary"].lower()
-                if "announce" in item_summary:
-                    has_initiatives = True
-                if "concern" in item_summary or "accus" in item_summary:
-                    has_criticism = True
-            
-            # Create and return the analysis result
-            return {
-                "rating": round(scaled_sentiment, 1),
-                "news_items": news_items,
-                "summary": summary,
-                "has_recent_initiatives": has_initiatives,
-                "has_criticism": has_criticism
-            }
-            
-        except Exception as e:
-            print(f"Error in news summarization: {e}")
-            # Return a fallback response
-            return {
-                "rating": 5.0,
-                "news_items": [],
-                "summary": f"Unable to retrieve sustainability news for {brand}.",
-                "has_recent_initiatives": False,
-                "has_criticism": False
-            }
+                # 50% chance of a second generic item
+                if rng.random() < 0.5:
+                    news_items.append({
+                        "title": f"Market Analysis: {brand}'s Position on Sustainability",
+                        "source": "Market Insider",
+                        "date": "2023-06-05",
+                        "summary": f"Analysts note that {brand} has room for improvement in sustainability practices compared to industry leaders, but is making incremental progress."
+                    })
+        
+        # Ensure news_items is a list
+        if not isinstance(news_items, list):
+            print(f"Warning: news_items is not a list: {type(news_items)}. Converting to empty list.")
+            news_items = []
+        
+        return news_items
+    
+    def _news_prompt(self, brand: str, news_items: List[Dict[str, Any]]) -> str:
+        """
+        Build the Gemini prompt for analyzing a brand's news articles.
+        """
+        # Format articles for analysis, joining them straight from a generator
+        articles_text = "\n\n".join(
+            _ARTICLE_FORMAT(item['title'], item['source'], item['date'], item['summary'])
+            for item in news_items if isinstance(item, dict) and "summary" in item
+        )
+        
+        from utils.gemini_api import NEWS_ANALYSIS_INSTRUCTIONS
+        
+        # Static instructions first and the brand-specific articles last
+        return NEWS_ANALYSIS_INSTRUCTIONS + _NEWS_PROMPT_TEMPLATE.format(brand=brand, articles=articles_text)
+    
+    def _no_news_analysis(self, brand: str) -> Dict[str, Any]:
+        """
+        News analysis of a brand without any sustainability news: a neutral rating and no flags.
+        Brands with news are always analyzed by Gemini (or its mock).
+        """
+        return {
+            "rating": 5.0,
+            "news_items": [],
+            "summary": f"No significant sustainability news found for {brand}.",
+            "has_recent_initiatives": False,
+            "has_criticism": False
+        }
+        
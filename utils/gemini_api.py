@@ -1,15 +1,228 @@
+import asyncio
 import os
 import random
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import re 
 import json
-import datetime
+import functools
+import hashlib
+import time
+from collections import Counter
 
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
+@functools.lru_cache(maxsize=None)
+def _load_genai():
+    """Import google.generativeai on first real-API use, or return None if it is not installed."""
+    try:
+        import google.generativeai as genai
+        return genai
+    except ImportError:
+        return None
+
+@functools.lru_cache(maxsize=None)
+def _gemini_errors() -> Tuple[tuple, tuple]:
+    """
+    The API errors signalling a rate limit, and all errors worth retrying (rate limits and
+    temporary server failures), or empty tuples if google.api_core is not installed.
+    """
+    try:
+        from google.api_core import exceptions
+    except ImportError:
+        return (), ()
+    rate_limited = (exceptions.ResourceExhausted, exceptions.TooManyRequests)
+    return rate_limited, rate_limited + (
+        exceptions.InternalServerError, exceptions.ServiceUnavailable, exceptions.DeadlineExceeded
+    )
+
+# Static instruction blocks that lead their prompts, with the per-request content after them
+ESG_REPORT_INSTRUCTIONS = """
+        Analyze this ESG/sustainability report for a clothing/apparel company and provide ratings (0-10 scale) 
+        for the following aspects, where higher scores are better:
+        
+        Provide ONLY a JSON response with:
+        - rating: overall score (0-10)
+        - water_impact: score for water usage and conservation (0-10)
+        - carbon_impact: score for carbon emissions and climate (0-10)
+        - waste_management: score for waste reduction and circular economy (0-10)
+        - labor_practices: score for worker welfare and ethical production (0-10)
+        - chemical_usage: score for chemical management and toxicity (0-10)
+        - summary: brief 1-2 sentence summary of key findings
+        - has_specific_targets: boolean for whether they have numerical targets with deadlines
+        - has_certifications: boolean for whether they mention recognized certifications
+        """
+
+NEWS_ANALYSIS_INSTRUCTIONS = """
+        Analyze the news articles below about a brand's sustainability practices.
+        
+        Based on these articles:
+        1) Rate the company's sustainability efforts on a scale of 0-10
+        2) Summarize the key sustainability initiatives or concerns
+        3) Identify whether there are any greenwashing allegations
+        4) Note any significant environmental or social impact mentioned
+        """
+
+# Added after NEWS_ANALYSIS_INSTRUCTIONS when several brands are analyzed in one request
+NEWS_BATCH_INSTRUCTIONS = """
+        The articles below cover several brands. Analyze each brand separately and respond with
+        ONLY a JSON array holding one analysis object per brand, in the order the brands are listed.
+        
+        """
+
+# Leads a prompt that packs several requests into one Gemini call
+BATCH_INSTRUCTIONS = """
+        Answer each of the {count} numbered requests below separately. Respond with ONLY a JSON array
+        holding one answer per request, in the same order, where each answer is the JSON its request asks for.
+        
+        """
+
+# Gemini model to use; models newer than gemini-1.0 are put in JSON response mode
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-1.0-pro")
+
+# Context window of each model family, in tokens, for packing several prompts into one request
+MODEL_CONTEXT_TOKENS = {
+    "gemini-1.0-pro": 30720,
+    "gemini-1.5-flash": 1048576,
+    "gemini-1.5-pro": 2097152,
+}
+DEFAULT_CONTEXT_TOKENS = 30720
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a prompt, at Gemini's average of about four characters per token."""
+    return len(text) // 4 + 1
+
+# Smaller model for review analysis, a categorical extraction task that doesn't need a pro-tier model
+REVIEW_GEMINI_MODEL = os.environ.get("REVIEW_GEMINI_MODEL", "gemini-1.5-flash")
+
+# JSON extraction from free-text responses, for models without JSON response mode
+_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+_JSON_ARRAY_RE = re.compile(r'\[.*\]', re.DOTALL)
+
+# Keywords for scoring each aspect of an ESG report in the mock analysis
+ESG_ASPECT_KEYWORDS = {
+    "water": ("water", "h2o", "hydro", "aqua", "moisture"),
+    "carbon": ("carbon", "co2", "greenhouse", "climate", "emission"),
+    "waste": ("waste", "recycl", "circular", "landfill", "dispos"),
+    "labor": ("labor", "worker", "wage", "social", "ethic", "fair"),
+    "chemical": ("chemical", "toxin", "dye", "pfas", "solvent"),
+}
+_ESG_TARGET_KEYWORDS = ("goal", "target", "by 20")
+_ESG_CERTIFICATION_KEYWORDS = ("certif", "standard")
+
+# Every ESG keyword in one case-insensitive pattern; the lookahead finds overlapping keywords too
+_ESG_KEYWORD_RE = re.compile(
+    "(?=({}))".format("|".join(map(re.escape, {
+        *(word for keywords in ESG_ASPECT_KEYWORDS.values() for word in keywords),
+        *_ESG_TARGET_KEYWORDS, *_ESG_CERTIFICATION_KEYWORDS
+    }))),
+    re.IGNORECASE
+)
+
+# Longest report excerpt sent to Gemini, to avoid token issues
+ESG_REPORT_MAX_CHARS = 8000
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _condense_report(report_content: str) -> str:
+    """
+    Shorten an ESG report for the analysis prompt: collapse whitespace and keep each distinct
+    sentence that mentions an ESG keyword once, dropping boilerplate such as contents pages
+    and legal notices. Reports with no keyword sentences are only whitespace-collapsed.
+    """
+    text = _WHITESPACE_RE.sub(" ", report_content).strip()
+    sentences = [
+        sentence for sentence in dict.fromkeys(_SENTENCE_END_RE.split(text))
+        if _ESG_KEYWORD_RE.search(sentence)
+    ]
+    if sentences:
+        text = " ".join(sentences)
+    return text[:ESG_REPORT_MAX_CHARS]
+
+# Case-insensitive keyword patterns for the news analysis, matched against the original
+# text so no lowercased copy of each summary or insight is needed
+# The summary keywords are stems ("accus", "greenwash"), so they are matched as substrings in one
+# pattern whose group names what a match implies: initiatives are positive, criticism is negative
+_NEWS_KEYWORD_RE = re.compile(
+    "(?P<initiative>announce)|(?P<positive>commit|launch|improve|success)"
+    "|(?P<criticism>concern|accus)|(?P<negative>criticism|fail|greenwash)",
+    re.IGNORECASE
+)
+_NEWS_INITIATIVE_INSIGHT_RE = re.compile("initiative", re.IGNORECASE)
+_NEWS_CRITICISM_INSIGHT_RE = re.compile("criticism|concern", re.IGNORECASE)
+
+# Most reviews included in one review analysis prompt, to avoid token issues
+REVIEWS_PER_PROMPT = 50
+
+# Sustainability keywords looked for in reviews by the mock analysis, by category
+REVIEW_KEYWORDS = {
+    "materials": ("organic", "recycled", "sustainable", "synthetic", "plastic"),
+    "production": ("ethical", "factory", "working conditions", "labor"),
+    "packaging": ("packaging", "plastic", "excessive", "waste"),
+    "durability": ("quality", "durable", "lasted", "falling apart"),
+    "environmental_impact": ("carbon", "footprint", "climate", "environmental"),
+}
+_REVIEW_KEYWORD_CATEGORIES = {}
+for _category, _keywords in REVIEW_KEYWORDS.items():
+    for _keyword in _keywords:
+        _REVIEW_KEYWORD_CATEGORIES[_keyword] = _REVIEW_KEYWORD_CATEGORIES.get(_keyword, ()) + (_category,)
+del _category, _keywords, _keyword
+# Matched against lowercased text, which scans faster than an IGNORECASE pattern
+_REVIEW_KEYWORD_RE = re.compile("|".join(map(re.escape, _REVIEW_KEYWORD_CATEGORIES)))
+
+# Sustainability concerns a review analysis may flag
+REVIEW_FLAGS = (
+    "greenwashing", "quality_concerns", "ethical_production", "chemical_concerns",
+    "excessive_packaging", "microplastics", "false_claims", "certifications"
+)
+
+# Static review analysis instructions, with the flag and keyword tables, formatted once at import
+REVIEW_ANALYSIS_INSTRUCTIONS = """
+        Analyze the product reviews below to extract sustainability-related insights.
+        
+        Sustainability topics and the keywords that signal them:
+        {keywords}
+        
+        Provide ONLY a JSON response with:
+        - overall_sustainability_sentiment: score from 0-10 representing how positively consumers view the product's sustainability
+        - insights: list of 3-5 key insights about sustainability perceptions
+        - flags_triggered: boolean indicating if any sustainability concerns were raised
+        - sustainability_flags: list of concerns from these options: {flags}
+        - total_reviews_analyzed: the number of reviews that were analyzed
+        """.format(
+    keywords="\n        ".join(f"- {category}: {', '.join(keywords)}" for category, keywords in REVIEW_KEYWORDS.items()),
+    flags=", ".join(REVIEW_FLAGS)
+)
+
+# Structured-output schema for a review analysis, so models in JSON response mode answer with
+# exactly these fields (and only listed flags) instead of free-form JSON
+REVIEW_ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "overall_sustainability_sentiment": {"type": "NUMBER"},
+        "insights": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "flags_triggered": {"type": "BOOLEAN"},
+        "sustainability_flags": {"type": "ARRAY", "items": {"type": "STRING", "enum": list(REVIEW_FLAGS)}},
+        "total_reviews_analyzed": {"type": "INTEGER"}
+    },
+    "required": [
+        "overall_sustainability_sentiment", "insights", "flags_triggered",
+        "sustainability_flags", "total_reviews_analyzed"
+    ]
+}
+
+# Attempts per Gemini request on rate limits and temporary server errors, and the cap on the
+# randomized exponential backoff between them (seconds)
+GEMINI_MAX_ATTEMPTS = 5
+GEMINI_MAX_BACKOFF = 30.0
+
+# Number of material inference and ESG report results remembered per GeminiAPI instance
+RESULT_CACHE_SIZE = 4096
+
+class FallbackResult(dict):
+    """
+    Mock result standing in for a Gemini request that gave no usable answer.
+    Callers return it like any other result but must not cache it.
+    """
 
 class GeminiAPI:
     """
@@ -17,41 +230,261 @@ class GeminiAPI:
     Includes mock implementation for testing.
     """
     
-    def __init__(self, api_key=None, use_mock=True):
+    def __init__(self, api_key=None, use_mock=True, model_name=None):
         """
         Initialize the Gemini API wrapper.
         
         Args:
             api_key: Google API key for Gemini
             use_mock: Whether to use mock implementation (True) or real API (False)
+            model_name: Gemini model to use (defaults to GEMINI_MODEL)
         """
         self.use_mock = use_mock
+        self.model_name = model_name or GEMINI_MODEL
         self.api_initialized = False
+        # Private generator for the mock analyses, instead of the shared module-level one
+        self._rng = random.Random()
+        # time.monotonic() before which no request is sent, after Gemini reported a rate limit
+        self._rate_limited_until = 0.0
+        # Results of earlier analyses, keyed by their input (oldest first)
+        self._material_cache = {}
+        self._esg_report_cache = {}
         
         # Try to initialize the real API if needed
-        if not use_mock and GEMINI_AVAILABLE:
+        genai = None if use_mock else _load_genai()
+        if genai is not None:
             # Use API key from parameters or environment variable
             api_key = api_key or os.environ.get("GEMINI_API_KEY")
             
             if api_key:
                 try:
                     genai.configure(api_key=api_key)
-                    self.model = genai.GenerativeModel('gemini-1.0-pro')
+                    self.model = genai.GenerativeModel(self.model_name, generation_config=self._generation_config())
                     self.api_initialized = True
                 except Exception as e:
                     self.use_mock = True
     
+    @property
+    def context_tokens(self) -> int:
+        """Context window of the model in use, in tokens."""
+        return next(
+            (tokens for name, tokens in MODEL_CONTEXT_TOKENS.items() if self.model_name.startswith(name)),
+            DEFAULT_CONTEXT_TOKENS
+        )
+    
+    def _generation_config(self) -> Optional[Dict[str, Any]]:
+        """Ask for JSON responses on models that support it (gemini-1.0 models don't)."""
+        if self.model_name.startswith("gemini-1.0"):
+            return None
+        return {"response_mime_type": "application/json"}
+    
+    def _parse_json_response(self, response_text: str, expect_list: bool = False) -> Any:
+        """Extract the JSON object (or array, if expect_list) from a Gemini response, or None if there is none."""
+        # In JSON mode the whole response is the JSON document
+        try:
+            parsed = json.loads(response_text)
+            if isinstance(parsed, list if expect_list else dict):
+                return parsed
+        except ValueError:
+            pass
+        
+        # Otherwise pick the JSON out of the surrounding text
+        json_match = (_JSON_ARRAY_RE if expect_list else _JSON_OBJECT_RE).search(response_text)
+        if json_match:
+            return json.loads(json_match.group(0))
+        return None
+    
+    def _request_config(self, schema: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Per-request generation config constraining the response to a schema, where JSON mode is available."""
+        config = self._generation_config()
+        if schema is None or config is None:
+            return None
+        return {**config, "response_schema": schema}
+    
+    def _complete_json(self, parts: List[str], expect_list: bool) -> Any:
+        """
+        Parse the streamed response so far if it already ends a whole JSON document (as responses
+        in JSON mode do once the last chunk arrives), or return None to keep reading.
+        """
+        if not parts[-1].rstrip().endswith("]" if expect_list else "}"):
+            return None
+        try:
+            parsed = json.loads("".join(parts))
+        except ValueError:
+            return None
+        return parsed if isinstance(parsed, list if expect_list else dict) else None
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Seconds to wait before retrying a failed request, or None if it shouldn't be retried.
+        Rate limits use the delay Gemini asks for, if any, and hold back every request until then.
+        """
+        rate_limited, retryable = _gemini_errors()
+        if attempt >= GEMINI_MAX_ATTEMPTS or not isinstance(error, retryable):
+            return None
+        
+        # Exponential backoff with full jitter
+        delay = self._rng.uniform(0, min(GEMINI_MAX_BACKOFF, 2.0 ** attempt))
+        if isinstance(error, rate_limited):
+            for detail in getattr(error, "details", None) or ():
+                retry_delay = getattr(detail, "retry_delay", None)
+                if retry_delay is not None:
+                    delay = retry_delay.seconds + retry_delay.nanos / 1e9
+                    break
+            self._rate_limited_until = max(self._rate_limited_until, time.monotonic() + delay)
+        return delay
+    
+    def _rate_limit_wait(self) -> float:
+        """Seconds left until requests may be sent again after a rate limit."""
+        return max(0.0, self._rate_limited_until - time.monotonic())
+    
+    def _generate_json(self, prompt: str, task: str, expect_list: bool = False, schema: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Send a prompt to Gemini and parse the JSON in its response, constrained to schema if given.
+        Rate limits and temporary server errors are retried with backoff.
+        """
+        for attempt in range(1, GEMINI_MAX_ATTEMPTS + 1):
+            time.sleep(self._rate_limit_wait())
+            try:
+                # Stream the response, so the JSON is parsed as soon as it is complete
+                parts = []
+                for chunk in self.model.generate_content(prompt, stream=True, generation_config=self._request_config(schema)):
+                    parts.append(chunk.text)
+                    parsed = self._complete_json(parts, expect_list)
+                    if parsed is not None:
+                        return parsed
+                return self._parse_json_response("".join(parts), expect_list)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    print(f"Error using Gemini API for {task}: {e}")
+                    return None
+                print(f"Gemini API unavailable for {task}, retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+        return None
+    
+    async def _generate_json_async(self, prompt: str, task: str, expect_list: bool = False, schema: Optional[Dict[str, Any]] = None) -> Any:
+        """Async variant of _generate_json using Gemini's async client."""
+        for attempt in range(1, GEMINI_MAX_ATTEMPTS + 1):
+            await asyncio.sleep(self._rate_limit_wait())
+            try:
+                parts = []
+                async for chunk in await self.model.generate_content_async(prompt, stream=True, generation_config=self._request_config(schema)):
+                    parts.append(chunk.text)
+                    parsed = self._complete_json(parts, expect_list)
+                    if parsed is not None:
+                        return parsed
+                return self._parse_json_response("".join(parts), expect_list)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    print(f"Error using Gemini API for {task}: {e}")
+                    return None
+                print(f"Gemini API unavailable for {task}, retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+        return None
+    
+    def _generate_json_batch(self, prompts: List[str], task: str, schema: Optional[Dict[str, Any]] = None) -> Optional[List[Any]]:
+        """
+        Send several prompts to Gemini as one request and return the JSON answer to each (each
+        matching schema, if given), or None if the response isn't an array with one answer per prompt.
+        """
+        sections = "\n\n".join(f"--- Request {number} ---\n{prompt.strip()}" for number, prompt in enumerate(prompts, 1))
+        answers = self._generate_json(
+            BATCH_INSTRUCTIONS.format(count=len(prompts)) + sections, task, expect_list=True,
+            schema=None if schema is None else {"type": "ARRAY", "items": schema}
+        )
+        if isinstance(answers, list) and len(answers) == len(prompts):
+            return answers
+        return None
+    
+    def _run_batch(self, items: List[Any], build_prompt, is_valid, single, mock, task: str, schema: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """
+        Answer a batch of items with one Gemini request, using single() for any item whose
+        answer is missing or malformed, and mock() for every item when the API isn't in use.
+        """
+        if self.use_mock or not self.api_initialized:
+            return [mock(item) for item in items]
+        
+        answers = self._generate_json_batch([build_prompt(item) for item in items], task, schema) if len(items) > 1 else None
+        if answers is None:
+            return [single(item) for item in items]
+        return [answer if is_valid(answer) else single(item) for item, answer in zip(items, answers)]
+    
+    def _cached_result(self, cache: Dict[Any, Dict[str, Any]], key: Any) -> Optional[Dict[str, Any]]:
+        """Return a copy of a remembered result, or None if there is none."""
+        result = cache.get(key)
+        return None if result is None else dict(result)
+    
+    def _remember_result(self, cache: Dict[Any, Dict[str, Any]], key: Any, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Remember a result, dropping the oldest once the cache is full, and return a copy of it.
+        Fallback results are returned without being remembered, so the next call asks Gemini again.
+        """
+        if isinstance(result, FallbackResult):
+            return result
+        cache[key] = result
+        if len(cache) > RESULT_CACHE_SIZE:
+            del cache[next(iter(cache))]
+        return dict(result)
+    
+    def _cached_batch(self, cache: Dict[Any, Dict[str, Any]], items: List[Any], key, analyze_batch) -> List[Dict[str, Any]]:
+        """Answer the items that aren't cached yet with one analyze_batch() call, and the rest from the cache."""
+        keys = [key(item) for item in items]
+        results = [self._cached_result(cache, item_key) for item_key in keys]
+        missing = [index for index, result in enumerate(results) if result is None]
+        if missing:
+            for index, result in zip(missing, analyze_batch([items[index] for index in missing])):
+                results[index] = self._remember_result(cache, keys[index], result)
+        return results
+    
+    def _material_cache_key(self, product_data: Dict[str, Any]) -> Tuple[Any, Any, Any]:
+        """The fields of the product data that material inference depends on."""
+        return product_data.get('title'), product_data.get('description'), product_data.get('category')
+    
     def infer_material(self, product_data: Dict[str, Any]) -> Dict[str, float]:
         """
         Infer materials from product data using Gemini and mapping material names to their percentage (0-1.0)
         """
+        key = self._material_cache_key(product_data)
+        materials = self._cached_result(self._material_cache, key)
+        if materials is not None:
+            return materials
+        
         if not self.use_mock and self.api_initialized:
-            start_time = datetime.datetime.now()
-            result = self._real_infer_material(product_data)
-            end_time = datetime.datetime.now()
-            return result
+            materials = self._real_infer_material(product_data)
+        else:
+            materials = self._mock_infer_material(product_data)
+        return self._remember_result(self._material_cache, key, materials)
+    
+    async def infer_material_async(self, product_data: Dict[str, Any]) -> Dict[str, float]:
+        """
+        Async variant of infer_material, awaited alongside the other stages' Gemini calls.
+        """
+        key = self._material_cache_key(product_data)
+        materials = self._cached_result(self._material_cache, key)
+        if materials is not None:
+            return materials
         
-        # Mock implementation
+        if not self.use_mock and self.api_initialized:
+            materials = await self._generate_json_async(self._infer_material_prompt(product_data), "material inference")
+            if materials is None:
+                materials = FallbackResult(self._mock_infer_material(product_data))
+        else:
+            materials = self._mock_infer_material(product_data)
+        return self._remember_result(self._material_cache, key, materials)
+    
+    def infer_materials_batch(self, products: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+        """
+        Infer the materials of several products with a single Gemini request.
+        """
+        return self._cached_batch(self._material_cache, products, self._material_cache_key, lambda uncached: self._run_batch(
+            uncached, self._infer_material_prompt, lambda answer: isinstance(answer, dict),
+            self._real_infer_material, self._mock_infer_material, "batched material inference"
+        ))
+    
+    def _mock_infer_material(self, product_data: Dict[str, Any]) -> Dict[str, float]:
+        """Mock implementation based on product category and title."""
         title = product_data.get('title', '').lower()
         category = product_data.get('category', '').lower()
         
@@ -79,10 +512,9 @@ class GeminiAPI:
         # Default fallback
         return {"cotton": 0.5, "polyester": 0.5}
     
-    def _real_infer_material(self, product_data: Dict[str, Any]) -> Dict[str, float]:
-        """Real implementation using Gemini API."""
-        # Construct prompt
-        prompt = f"""
+    def _infer_material_prompt(self, product_data: Dict[str, Any]) -> str:
+        """Build the material inference prompt."""
+        return f"""
         Analyze this product information and infer its material composition with percentages:
         
         Title: {product_data.get('title')}
@@ -92,57 +524,77 @@ class GeminiAPI:
         Provide ONLY a JSON response with materials as keys and percentages as decimal values (0.0-1.0).
         For example: {{"cotton": 0.95, "elastane": 0.05}}
         """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            # Extract JSON response
-            response_text = response.text
-            # Find and extract JSON object
-
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                materials = json.loads(json_str)
-                return materials
-        except Exception as e:
-            print(f"Error using Gemini API for material inference: {e}")
+    
+    def _real_infer_material(self, product_data: Dict[str, Any]) -> Dict[str, float]:
+        """Real implementation using Gemini API."""
+        materials = self._generate_json(self._infer_material_prompt(product_data), "material inference")
+        if materials is not None:
+            return materials
         
         # Fallback to mock implementation
-        return self.infer_material(product_data)
+        return FallbackResult(self._mock_infer_material(product_data))
+    
+    def _esg_report_cache_key(self, report_content: str) -> str:
+        """A short digest of the report, so cached reports don't keep their full text alive as keys."""
+        return hashlib.blake2b(report_content.encode(), digest_size=16).hexdigest()
     
     def analyze_esg_report(self, report_content: str) -> Dict[str, Any]:
         """
         Analyze ESG report content using Gemini API.
         """
-        if not self.use_mock and self.api_initialized:
-            start_time = datetime.datetime.now()
-            result = self._real_analyze_esg_report(report_content)
-            end_time = datetime.datetime.now()
-            return result
+        key = self._esg_report_cache_key(report_content)
+        analysis = self._cached_result(self._esg_report_cache, key)
+        if analysis is not None:
+            return analysis
         
-        # Mock implementation - simplified from esg_analyzer.py
-        # Identify keywords for scoring different aspects
-        water_keywords = ["water", "h2o", "hydro", "aqua", "moisture"]
-        carbon_keywords = ["carbon", "co2", "greenhouse", "climate", "emission"]
-        waste_keywords = ["waste", "recycl", "circular", "landfill", "dispos"]
-        labor_keywords = ["labor", "worker", "wage", "social", "ethic", "fair"]
-        chemical_keywords = ["chemical", "toxin", "dye", "pfas", "solvent"]
+        if not self.use_mock and self.api_initialized:
+            analysis = self._real_analyze_esg_report(report_content)
+        else:
+            analysis = self._mock_analyze_esg_report(report_content)
+        return self._remember_result(self._esg_report_cache, key, analysis)
+    
+    async def analyze_esg_report_async(self, report_content: str) -> Dict[str, Any]:
+        """
+        Async variant of analyze_esg_report, awaited alongside the other stages' Gemini calls.
+        """
+        key = self._esg_report_cache_key(report_content)
+        analysis = self._cached_result(self._esg_report_cache, key)
+        if analysis is not None:
+            return analysis
         
-        report_lower = report_content.lower()
+        if not self.use_mock and self.api_initialized:
+            analysis = await self._generate_json_async(self._esg_report_prompt(report_content), "ESG analysis")
+            if analysis is None:
+                analysis = FallbackResult(self._mock_analyze_esg_report(report_content))
+        else:
+            analysis = self._mock_analyze_esg_report(report_content)
+        return self._remember_result(self._esg_report_cache, key, analysis)
+    
+    def analyze_esg_reports_batch(self, reports: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze several ESG reports with a single Gemini request.
+        """
+        return self._cached_batch(self._esg_report_cache, reports, self._esg_report_cache_key, lambda uncached: self._run_batch(
+            uncached, self._esg_report_prompt, lambda answer: isinstance(answer, dict),
+            self._real_analyze_esg_report, self._mock_analyze_esg_report, "batched ESG analysis"
+        ))
+    
+    def _mock_analyze_esg_report(self, report_content: str) -> Dict[str, Any]:
+        """Mock implementation based on keyword presence in the report."""
+        # Find every keyword present in the report in a single pass
+        found = {match.group(1).lower() for match in _ESG_KEYWORD_RE.finditer(report_content)}
         
         # Simple scoring based on keyword presence and context
-        water_score = sum(1 for word in water_keywords if word in report_lower) / len(water_keywords)
-        carbon_score = sum(1 for word in carbon_keywords if word in report_lower) / len(carbon_keywords)
-        waste_score = sum(1 for word in waste_keywords if word in report_lower) / len(waste_keywords)
-        labor_score = sum(1 for word in labor_keywords if word in report_lower) / len(labor_keywords)
-        chemical_score = sum(1 for word in chemical_keywords if word in report_lower) / len(chemical_keywords)
+        water_score, carbon_score, waste_score, labor_score, chemical_score = (
+            len(found.intersection(keywords)) / len(keywords) for keywords in ESG_ASPECT_KEYWORDS.values()
+        )
         
         # Add randomness to simulate more nuanced analysis
-        water_score = min(1.0, water_score + random.uniform(-0.2, 0.2))
-        carbon_score = min(1.0, carbon_score + random.uniform(-0.2, 0.2))
-        waste_score = min(1.0, waste_score + random.uniform(-0.2, 0.2))
-        labor_score = min(1.0, labor_score + random.uniform(-0.2, 0.2))
-        chemical_score = min(1.0, chemical_score + random.uniform(-0.2, 0.2))
+        water_score = min(1.0, water_score + self._rng.uniform(-0.2, 0.2))
+        carbon_score = min(1.0, carbon_score + self._rng.uniform(-0.2, 0.2))
+        waste_score = min(1.0, waste_score + self._rng.uniform(-0.2, 0.2))
+        labor_score = min(1.0, labor_score + self._rng.uniform(-0.2, 0.2))
+        chemical_score = min(1.0, chemical_score + self._rng.uniform(-0.2, 0.2))
         
         # Calculate overall score (scale 0-10)
         overall_score = (water_score + carbon_score + waste_score + labor_score + chemical_score) * 2
@@ -155,163 +607,209 @@ class GeminiAPI:
             "labor_practices": round(labor_score * 10, 1),
             "chemical_usage": round(chemical_score * 10, 1),
             "summary": "The report details several sustainability initiatives.",
-            "has_specific_targets": "goal" in report_lower or "target" in report_lower or "by 20" in report_lower,
-            "has_certifications": "certif" in report_lower or "standard" in report_lower
+            "has_specific_targets": not found.isdisjoint(_ESG_TARGET_KEYWORDS),
+            "has_certifications": not found.isdisjoint(_ESG_CERTIFICATION_KEYWORDS)
         }
         
         return result
     
-    def _real_analyze_esg_report(self, report_content: str) -> Dict[str, Any]:
-        """Real implementation using Gemini API."""
-        # Construct prompt
-        prompt = f"""
-        Analyze this ESG/sustainability report for a clothing/apparel company and provide ratings (0-10 scale) 
-        for the following aspects, where higher scores are better:
-        
+    def _esg_report_prompt(self, report_content: str) -> str:
+        """Build the ESG report analysis prompt."""
+        return f"""{ESG_REPORT_INSTRUCTIONS}
         Report Content:
-        {report_content[:8000]}  # Limit to avoid token issues
-        
-        Provide ONLY a JSON response with:
-        - rating: overall score (0-10)
-        - water_impact: score for water usage and conservation (0-10)
-        - carbon_impact: score for carbon emissions and climate (0-10)
-        - waste_management: score for waste reduction and circular economy (0-10)
-        - labor_practices: score for worker welfare and ethical production (0-10)
-        - chemical_usage: score for chemical management and toxicity (0-10)
-        - summary: brief 1-2 sentence summary of key findings
-        - has_specific_targets: boolean for whether they have numerical targets with deadlines
-        - has_certifications: boolean for whether they mention recognized certifications
+        {_condense_report(report_content)}
         """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            # Extract JSON response
-            response_text = response.text
-            # Find and extract JSON object
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                analysis = json.loads(json_str)
-                return analysis
-        except Exception as e:
-            print(f"Error using Gemini API for ESG analysis: {e}")
+    
+    def _real_analyze_esg_report(self, report_content: str) -> Dict[str, Any]:
+        """Real implementation using Gemini API."""
+        analysis = self._generate_json(self._esg_report_prompt(report_content), "ESG analysis")
+        if analysis is not None:
+            return analysis
         
         # Fallback to mock implementation
-        return self.analyze_esg_report(report_content)
+        return FallbackResult(self._mock_analyze_esg_report(report_content))
     
     def analyze_reviews(self, reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Analyze reviews using Gemini API to extract sustainability insights.
         """
         if not self.use_mock and self.api_initialized:
-            start_time = datetime.datetime.now()
-            result = self._real_analyze_reviews(reviews)
-            end_time = datetime.datetime.now()
-            return result
+            return self._real_analyze_reviews(reviews)
         
-        # Mock implementation - simplified from review_analyzer.py
-        # Sustainability keywords by category
-        sustainability_keywords = {
-            "materials": ["organic", "recycled", "sustainable", "synthetic", "plastic"],
-            "production": ["ethical", "factory", "working conditions", "labor"],
-            "packaging": ["packaging", "plastic", "excessive", "waste"],
-            "durability": ["quality", "durable", "lasted", "falling apart"],
-            "environmental_impact": ["carbon", "footprint", "climate", "environmental"]
-        }
+        return self._mock_analyze_reviews(reviews)
+    
+    async def analyze_reviews_async(self, reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Async variant of analyze_reviews, awaited alongside the other stages' Gemini calls.
+        """
+        if not self.use_mock and self.api_initialized:
+            analysis = await self._generate_json_async(self._reviews_prompt(reviews), "reviews analysis", schema=REVIEW_ANALYSIS_SCHEMA)
+            if analysis is not None:
+                return analysis
+            return FallbackResult(self._mock_analyze_reviews(reviews))
         
-        # Flags to identify in reviews
-        sustainability_flags = [
-            "greenwashing", "quality_concerns", "ethical_production", "chemical_concerns",
-            "excessive_packaging", "microplastics", "false_claims", "certifications"
-        ]
+        return self._mock_analyze_reviews(reviews)
+    
+    def analyze_reviews_batch(self, review_sets: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Analyze the reviews of several products with a single Gemini request.
+        """
+        return self._run_batch(
+            review_sets, self._reviews_prompt, lambda answer: isinstance(answer, dict),
+            self._real_analyze_reviews, self._mock_analyze_reviews, "batched review analysis", REVIEW_ANALYSIS_SCHEMA
+        )
+    
+    def _mock_analyze_reviews(self, reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Mock implementation producing randomized sustainability insights."""
+        # Count keyword mentions per category in one pass over all the review text
+        reviews_text = "\n".join(review.get("text") or "" for review in reviews).lower()
+        mentions = Counter(
+            category
+            for match in _REVIEW_KEYWORD_RE.finditer(reviews_text)
+            for category in _REVIEW_KEYWORD_CATEGORIES[match.group(0)]
+        )
+        most_mentioned = mentions.most_common(1)[0][0] if mentions else "materials"
         
         # Mock analysis results
-        flags_triggered = random.random() < 0.4
-        selected_flags = random.sample(sustainability_flags, k=min(3, len(sustainability_flags))) if flags_triggered else []
-        sentiment = random.uniform(4.0, 7.0)
+        flags_triggered = self._rng.random() < 0.4
+        selected_flags = self._rng.sample(REVIEW_FLAGS, k=min(3, len(REVIEW_FLAGS))) if flags_triggered else []
+        sentiment = self._rng.uniform(4.0, 7.0)
         
         result = {
             "total_reviews_analyzed": len(reviews),
             "flags_triggered": flags_triggered,
             "sustainability_flags": selected_flags,
-            "insights": ["Consumers frequently mention materials in their reviews."],
+            "insights": [f"Consumers frequently mention {most_mentioned.replace('_', ' ')} in their reviews."],
             "overall_sustainability_sentiment": sentiment
         }
         
         return result
     
-    def _real_analyze_reviews(self, reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Real implementation using Gemini API."""
-        # Format reviews for analysis
-        reviews_text = []
-        for i, review in enumerate(reviews[:50]):  # Limit to 50 reviews to avoid token issues
-            text = review.get("text", "").strip()
-            if text:
-                rating = review.get("rating", "unknown")
-                reviews_text.append(f"Review {i+1} (Rating: {rating}/5): {text[:200]}...")
-        
-        reviews_formatted = "\n\n".join(reviews_text)
-        
-        # Construct prompt
-        prompt = f"""
-        Analyze these product reviews to extract sustainability-related insights:
-        
+    def _reviews_prompt(self, reviews: List[Dict[str, Any]]) -> str:
+        """Build the review analysis prompt."""
+        # Format reviews for analysis, limited to avoid token issues
+        reviews_formatted = "\n\n".join(
+            f"Review {i+1} (Rating: {review.get('rating', 'unknown')}/5): {text[:200]}..."
+            for i, review in enumerate(reviews[:REVIEWS_PER_PROMPT])
+            if (text := review.get("text", "").strip())
+        )
+        
+        return f"""{REVIEW_ANALYSIS_INSTRUCTIONS}
+        Reviews:
         {reviews_formatted}
-        
-        Provide ONLY a JSON response with:
-        - overall_sustainability_sentiment: score from 0-10 representing how positively consumers view the product's sustainability
-        - insights: list of 3-5 key insights about sustainability perceptions
-        - flags_triggered: boolean indicating if any sustainability concerns were raised
-        - sustainability_flags: list of concerns from these options: greenwashing, quality_concerns, ethical_production, chemical_concerns, excessive_packaging, microplastics, false_claims, certifications
-        - total_reviews_analyzed: the number of reviews that were analyzed
         """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            # Extract JSON response
-            response_text = response.text
-            # Find and extract JSON object
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                analysis = json.loads(json_str)
-                return analysis
-        except Exception as e:
-            print(f"Error using Gemini API for reviews analysis: {e}")
+    
+    def reviews_prompt_tokens(self, reviews: List[Dict[str, Any]]) -> int:
+        """Estimated tokens of the review analysis prompt for these reviews."""
+        return estimate_tokens(self._reviews_prompt(reviews))
+    
+    def _real_analyze_reviews(self, reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Real implementation using Gemini API."""
+        analysis = self._generate_json(self._reviews_prompt(reviews), "reviews analysis", schema=REVIEW_ANALYSIS_SCHEMA)
+        if analysis is not None:
+            return analysis
         
         # Fallback to mock implementation
-        return self.analyze_reviews(reviews)
+        return FallbackResult(self._mock_analyze_reviews(reviews))
     
     def analyze_sustainability_news(self, brand: str, news_items: List[Dict[str, Any]], prompt: str) -> Dict[str, Any]:
         """
         Analyze sustainability news about a brand.
         """
         if not self.use_mock and self.api_initialized:
-            start_time = datetime.datetime.now()
-            result = self._real_analyze_sustainability_news(brand, news_items, prompt)
-            end_time = datetime.datetime.now()
-            return result
+            return self._real_analyze_sustainability_news(brand, news_items, prompt)
         
-        # Mock implementation (simplified version)
+        return self._mock_analyze_sustainability_news(brand, news_items)
+    
+    async def analyze_sustainability_news_async(self, brand: str, news_items: List[Dict[str, Any]], prompt: str) -> Dict[str, Any]:
+        """
+        Async variant of analyze_sustainability_news, so several brands' analyses can overlap.
+        """
+        if not self.use_mock and self.api_initialized:
+            analysis = await self._generate_json_async(prompt, "sustainability news analysis")
+            if analysis is not None:
+                return self._complete_news_analysis(analysis, brand, news_items)
+            return FallbackResult(self._mock_analyze_sustainability_news(brand, news_items))
+        
+        return self._mock_analyze_sustainability_news(brand, news_items)
+    
+    async def analyze_sustainability_news_batch_async(self, requests: List[Tuple[str, List[Dict[str, Any]], str]]) -> List[Dict[str, Any]]:
+        """
+        Analyze several brands' news, given as (brand, news_items, prompt) tuples, in one Gemini request.
+        Falls back to separate concurrent analyses if the combined response can't be matched to the brands.
+        """
+        if not self.use_mock and self.api_initialized and len(requests) > 1:
+            analyses = await self._generate_json_async(self._news_batch_prompt(requests), "batched sustainability news analysis", expect_list=True)
+            if isinstance(analyses, list) and len(analyses) == len(requests) and all(isinstance(analysis, dict) for analysis in analyses):
+                return [
+                    self._complete_news_analysis(analysis, brand, news_items)
+                    for analysis, (brand, news_items, _) in zip(analyses, requests)
+                ]
+        
+        return list(await asyncio.gather(*(
+            self.analyze_sustainability_news_async(brand, news_items, prompt)
+            for brand, news_items, prompt in requests
+        )))
+    
+    async def analyze_all(self, product_data: Dict[str, Any], report_content: Optional[str], reviews: List[Dict[str, Any]],
+                          brand: str, news_items: List[Dict[str, Any]], news_prompt: str) -> Dict[str, Any]:
+        """
+        Run the material, ESG report, review and news analyses for one product concurrently,
+        so the wall-clock time is that of the slowest request rather than their sum.
+        Skips the ESG report analysis (returning None for it) when there is no report content.
+        """
+        async def no_report():
+            return None
+        
+        materials, esg_report, review_analysis, news = await asyncio.gather(
+            self.infer_material_async(product_data),
+            self.analyze_esg_report_async(report_content) if report_content else no_report(),
+            self.analyze_reviews_async(reviews),
+            self.analyze_sustainability_news_async(brand, news_items, news_prompt)
+        )
+        return {
+            "materials": materials,
+            "esg_report": esg_report,
+            "reviews": review_analysis,
+            "news": news
+        }
+    
+    def _news_batch_prompt(self, requests: List[Tuple[str, List[Dict[str, Any]], str]]) -> str:
+        """Combine several brands' news prompts into one, keeping the shared instructions in front."""
+        sections = []
+        for number, (_, _, prompt) in enumerate(requests, 1):
+            if prompt.startswith(NEWS_ANALYSIS_INSTRUCTIONS):
+                prompt = prompt[len(NEWS_ANALYSIS_INSTRUCTIONS):]
+            sections.append(f"--- Brand {number} ---\n{prompt.strip()}")
+        return NEWS_ANALYSIS_INSTRUCTIONS + NEWS_BATCH_INSTRUCTIONS + "\n\n".join(sections)
+    
+    def _mock_analyze_sustainability_news(self, brand: str, news_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Mock implementation (simplified version) based on keywords in the article summaries."""
         sentiment_score = 0
+        num_articles = 0
+        has_initiatives = False
+        has_criticism = False
         
-        # Set default values
+        # Tally sentiment, initiatives and criticism in a single pass over the summaries
         for item in news_items:
             if not isinstance(item, dict) or "summary" not in item:
                 continue
-                
-            summary = item["summary"].lower()
             
-            # Check for positive keywords
-            if any(word in summary for word in ["announce", "commit", "launch", "improve", "success"]):
-                sentiment_score += 1
+            num_articles += 1
+            kinds = {match.lastgroup for match in _NEWS_KEYWORD_RE.finditer(item["summary"])}
+            initiative = "initiative" in kinds
+            criticism = "criticism" in kinds
             
-            # Check for negative keywords
-            if any(word in summary for word in ["criticism", "concern", "fail", "greenwash", "accus"]):
+            # Check for positive and negative keywords
+            if initiative or "positive" in kinds:
+                sentiment_score += 1
+            if criticism or "negative" in kinds:
                 sentiment_score -= 1
+            
+            has_initiatives = has_initiatives or initiative
+            has_criticism = has_criticism or criticism
         
         # Normalize sentiment score to 0-10 scale
-        num_articles = len([item for item in news_items if isinstance(item, dict) and "summary" in item])
         if num_articles > 0:
             scaled_sentiment = 5 + (sentiment_score / num_articles) * 2.5
             scaled_sentiment = max(1, min(10, scaled_sentiment))  # Ensure it's between 1-10
@@ -320,9 +818,6 @@ class GeminiAPI:
         
         # Generate a summary based on the news items
         if num_articles > 0:
-            has_initiatives = any("announce" in item["summary"].lower() for item in news_items if isinstance(item, dict) and "summary" in item)
-            has_criticism = any("concern" in item["summary"].lower() or "accus" in item["summary"].lower() for item in news_items if isinstance(item, dict) and "summary" in item)
-            
             if has_initiatives and has_criticism:
                 summary = f"{brand} has some sustainability initiatives but also faces criticism."
             elif has_initiatives:
@@ -333,8 +828,6 @@ class GeminiAPI:
                 summary = f"Limited sustainability information is available for {brand}."
         else:
             summary = f"No recent sustainability news found for {brand}."
-            has_initiatives = False
-            has_criticism = False
         
         result = {
             "rating": round(scaled_sentiment, 1),
@@ -346,51 +839,51 @@ class GeminiAPI:
         
         return result
     
+    def _complete_news_analysis(self, analysis: Dict[str, Any], brand: str, news_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Fill in the fields of a Gemini news analysis that callers rely on."""
+        # Ensure expected fields are present
+        if "rating" not in analysis:
+            analysis["rating"] = 5.0
+        if "summary" not in analysis:
+            analysis["summary"] = f"Analysis of sustainability news for {brand}."
+            
+        # Add news items to the response
+        analysis["news_items"] = news_items
+        
+        # Analyze if there are initiatives or criticism
+        has_initiatives = False
+        has_criticism = False
+        
+        if "initiatives" in analysis:
+            has_initiatives = len(analysis["initiatives"]) > 0
+        elif "insights" in analysis and any(_NEWS_INITIATIVE_INSIGHT_RE.search(insight) for insight in analysis["insights"]):
+            has_initiatives = True
+        
+        if "criticism" in analysis:
+            has_criticism = len(analysis["criticism"]) > 0
+        elif "concerns" in analysis and len(analysis["concerns"]) > 0:
+            has_criticism = True
+        elif "insights" in analysis and any(_NEWS_CRITICISM_INSIGHT_RE.search(insight) for insight in analysis["insights"]):
+            has_criticism = True
+        
+        analysis["has_recent_initiatives"] = has_initiatives
+        analysis["has_criticism"] = has_criticism
+        
+        return analysis
+    
     def _real_analyze_sustainability_news(self, brand: str, news_items: List[Dict[str, Any]], prompt: str) -> Dict[str, Any]:
         """Real implementation using Gemini API."""
-        try:
-            response = self.model.generate_content(prompt)
-            # Extract JSON response
-            response_text = response.text
-            # Find and extract JSON object
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            
-            if json_match:
-                json_str = json_match.group(0)
-                analysis = json.loads(json_str)
-                
-                # Ensure expected fields are present
-                if "rating" not in analysis:
-                    analysis["rating"] = 5.0
-                if "summary" not in analysis:
-                    analysis["summary"] = f"Analysis of sustainability news for {brand}."
-                    
-                # Add news items to the response
-                analysis["news_items"] = news_items
-                
-                # Analyze if there are initiatives or criticism
-                has_initiatives = False
-                has_criticism = False
-                
-                if "initiatives" in analysis:
-                    has_initiatives = len(analysis["initiatives"]) > 0
-                elif "insights" in analysis and any("initiative" in insight.lower() for insight in analysis["insights"]):
-                    has_initiatives = True
-                
-                if "criticism" in analysis:
-                    has_criticism = len(analysis["criticism"]) > 0
-                elif "concerns" in analysis and len(analysis["concerns"]) > 0:
-                    has_criticism = True
-                elif "insights" in analysis and any("criticism" in insight.lower() or "concern" in insight.lower() for insight in analysis["insights"]):
-                    has_criticism = True
-                
-                analysis["has_recent_initiatives"] = has_initiatives
-                analysis["has_criticism"] = has_criticism
-                
-                return analysis
-                
-        except Exception as e:
-            print(f"Error using Gemini API for sustainability news analysis: {e}")
+        analysis = self._generate_json(prompt, "sustainability news analysis")
+        if analysis is not None:
+            return self._complete_news_analysis(analysis, brand, news_items)
         
         # Fallback to mock implementation
-        return self.analyze_sustainability_news(brand, news_items, prompt) 
\ No newline at end of file
+        return FallbackResult(self._mock_analyze_sustainability_news(brand, news_items))
+
+@functools.lru_cache(maxsize=8)
+def get_gemini_api(api_key=None, use_mock=True, model_name=None) -> GeminiAPI:
+    """
+    Shared GeminiAPI client per configuration, so analyzers built for each product reuse one
+    client and its connection, result caches and rate-limit state instead of creating their own.
+    """
+    return GeminiAPI(api_key=api_key, use_mock=use_mock, model_name=model_name)
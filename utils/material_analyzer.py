@@ -1,6 +1,13 @@
 import re
+import types
 from typing import Dict, Any, List
-from utils.gemini_api import GeminiAPI
+from utils.gemini_api import get_gemini_api
+
+# Material composition patterns, compiled once
+_PERCENT_RE = re.compile(r'\d+%')
+_PERCENT_MATERIAL_RE = re.compile(r'(\d+)%\s+([A-Za-z]+)')  # e.g., "95% Cotton"
+_MATERIAL_PERCENT_RE = re.compile(r'([A-Za-z]+)\s+(\d+)%')  # e.g., "Cotton 95%"
+_FULL_MATERIAL_RE = re.compile(r'100%\s+([A-Za-z]+)')       # e.g., "100% Cotton"
 
 
 class MaterialAnalyzer:
@@ -10,8 +17,8 @@ class MaterialAnalyzer:
     
     def __init__(self, gemini_api_key=None, use_mock_api=True):
         """Initialize with known material types."""
-        # Initialize API client
-        self.gemini_api = GeminiAPI(api_key=gemini_api_key, use_mock=use_mock_api)
+        # Shared API client
+        self.gemini_api = get_gemini_api(gemini_api_key, use_mock_api)
         
         # Common material types
         self.known_materials = {
@@ -39,6 +46,19 @@ class MaterialAnalyzer:
             "lyocell": {"type": "mmcf", "renewable": True, "synonyms": ["tencel"]},
             "tencel": {"type": "mmcf", "renewable": True, "synonyms": ["lyocell"]}
         }
+        # Read-only, so the alias table and patterns built from it below stay in step
+        self.known_materials = types.MappingProxyType(self.known_materials)
+        self._known_keys = tuple(self.known_materials)
+        
+        # Canonical name for each parsed material word: the known materials' names and synonyms,
+        # extended by parse_material with the result of matching every new word it sees
+        self._canonical_materials = {material: material for material in self.known_materials}
+        for material, info in self.known_materials.items():
+            for synonym in info.get("synonyms", ()):
+                self._canonical_materials.setdefault(synonym, material)
+        
+        # Any known material as a whole word, in a single pattern
+        self._known_material_re = re.compile(r'\b(?:' + '|'.join(map(re.escape, self.known_materials)) + r')\b')
         
         # Patterns for extraction
         self.material_patterns = [
@@ -53,17 +73,12 @@ class MaterialAnalyzer:
         if not material_text or material_text.lower() == 'unknown':
             return False
         
-        # Check for percentages
-        if re.search(r'\d+%', material_text):
+        # Check for percentages (this also covers the "100% Cotton" pattern)
+        if _PERCENT_RE.search(material_text):
             return True
         
         # Check for known materials
-        for material in self.known_materials:
-            if re.search(rf'\b{material}\b', material_text.lower()):
-                return True
-        
-        # Check for "100%" pattern
-        if re.search(r'100%\s+[A-Za-z]+', material_text):
+        if self._known_material_re.search(material_text.lower()):
             return True
             
         return False
@@ -74,8 +89,8 @@ class MaterialAnalyzer:
         material_text = material_text.lower()
         
         # Match percentage patterns
-        percentage_matches = re.findall(r'(\d+)%\s+([A-Za-z]+)', material_text)
-        percentage_matches.extend(re.findall(r'([A-Za-z]+)\s+(\d+)%', material_text))
+        percentage_matches = _PERCENT_MATERIAL_RE.findall(material_text)
+        percentage_matches.extend(_MATERIAL_PERCENT_RE.findall(material_text))
         
         if percentage_matches:
             for match in percentage_matches:
@@ -90,27 +105,26 @@ class MaterialAnalyzer:
                     material = material.lower()
                     
                     # Find material matches
-                    for known_material in self.known_materials:
-                        if known_material in material or material in known_material:
-                            result[known_material] = percentage
-                            break
-                    else:
-                        # Use original if no match
-                        result[material] = percentage
+                    canonical = self._canonical_materials.get(material)
+                    if canonical is None:
+                        canonical = self._canonical_materials[material] = self._match_known_material(material)
+                    result[canonical] = percentage
         
         # Handle "100%" pattern
         elif "100%" in material_text:
-            match = re.search(r'100%\s+([A-Za-z]+)', material_text)
+            match = _FULL_MATERIAL_RE.search(material_text)
             if match:
                 material = match.group(1).lower()
                 result[material] = 1.0
         
         # Estimate from material words if no percentages
         if not result:
-            for material in self.known_materials:
-                if material in material_text:
-                    # Equal percentages for multiple materials
-                    result[material] = 1.0 / len([m for m in self.known_materials if m in material_text])
+            found = [material for material in self._known_keys if material in material_text]
+            if found:
+                # Equal percentages for multiple materials
+                share = 1.0 / len(found)
+                for material in found:
+                    result[material] = share
         
         # Default to unknown
         if not result and material_text:
@@ -118,6 +132,22 @@ class MaterialAnalyzer:
         
         return result
     
+    def _match_known_material(self, material: str) -> str:
+        """Return the first known material overlapping the word, or the word itself if none does."""
+        return next(
+            (known_material for known_material in self._known_keys
+             if known_material in material or material in known_material),
+            material
+        )
+    
     def infer_material_with_gemini(self, product_data: Dict[str, Any]) -> Dict[str, float]:
         """Use Gemini API to infer materials when description is unclear."""
         return self.gemini_api.infer_material(product_data)
+    
+    def infer_materials_with_gemini(self, products: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+        """Infer the materials of several unclear products with one batched Gemini request."""
+        return self.gemini_api.infer_materials_batch(products)
+    
+    async def infer_material_with_gemini_async(self, product_data: Dict[str, Any]) -> Dict[str, float]:
+        """Async variant of infer_material_with_gemini."""
+        return await self.gemini_api.infer_material_async(product_data)
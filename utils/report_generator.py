@@ -1,5 +1,26 @@
+import functools
 import random
-from typing import Dict, Any, List
+import sys
+import numpy as np
+from bisect import bisect_right
+from operator import itemgetter
+from typing import Dict, Any, List, Optional, Tuple
+
+# Fields of the brand assessment and consumer feedback that produce insights
+_BRAND_INSIGHT_FIELDS = frozenset(("summary", "has_specific_targets", "has_certifications", "has_criticism"))
+_CONSUMER_INSIGHT_FIELDS = frozenset(("insights", "flags_triggered"))
+
+
+@functools.lru_cache(maxsize=128)
+def _display_name(name: str) -> str:
+    """Readable form of an impact area, category or flag key, e.g. "animal welfare"."""
+    return name.replace('_', ' ')
+
+
+@functools.lru_cache(maxsize=128)
+def _display_title(name: str) -> str:
+    """Capitalized readable form of a key, e.g. "Animal welfare"."""
+    return _display_name(name).capitalize()
 
 
 class ReportGenerator:
@@ -33,6 +54,12 @@ class ReportGenerator:
             }
         }
         
+        # The same weights as (material, brand, consumer) triples, for unpacking per report
+        self._depth_weight_triples = {
+            depth: (weights["material_impact"], weights["brand_assessment"], weights["consumer_feedback"])
+            for depth, weights in self.depth_weights.items()
+        }
+        
         # Thresholds for rating bands
         self.rating_thresholds = {
             9.0: "Excellent",
@@ -44,6 +71,10 @@ class ReportGenerator:
             3.0: "Poor",
             0.0: "Very Poor"
         }
+        # Ascending thresholds and their labels, for finding a score's band by bisection
+        self._band_thresholds = tuple(sorted(self.rating_thresholds))
+        self._band_labels = tuple(self.rating_thresholds[threshold] for threshold in self._band_thresholds)
+        self._band_threshold_array = np.array(self._band_thresholds)
         
         # Common sustainability trade-offs and conflicts
         self.common_conflicts = {
@@ -54,6 +85,7 @@ class ReportGenerator:
             "brand_vs_material": "A brand may have strong sustainability commitments but use less sustainable materials",
             "consumer_vs_metrics": "Consumer perceptions may conflict with technical sustainability metrics"
         }
+        self._common_conflict_values = list(self.common_conflicts.values())
         
         # Impact area priorities for different material categories
         self.material_priorities = {
@@ -63,26 +95,164 @@ class ReportGenerator:
             "MMCF": ["land", "climate", "water", "chemistry"],
             "Flax": ["land", "biodiversity", "climate", "water"]
         }
+        # Priority rank (1 = highest) of each impact area, by material category
+        self._material_priority_ranks = {
+            category: {area: rank for rank, area in enumerate(areas, 1)}
+            for category, areas in self.material_priorities.items()
+        }
+        
+        # Category-specific insights: a general note, plus a low/high score insight on one key practice
+        self.category_insight_rules = {
+            "Cotton": {
+                "general": "Cotton is a water-intensive crop; certified organic and recycled options reduce impact",
+                "area": "water",
+                "subcategory": "Water Risk Management",
+                "low": (40, "Water management practices for this cotton product show significant room for improvement"),
+                "high": (60, "This cotton product demonstrates strong water management practices")
+            },
+            "Synthetic": {
+                "general": "Synthetic fibers are derived from fossil fuels; recycled alternatives reduce carbon impact",
+                "area": "resource",
+                "subcategory": "Consumption Through Feedstock Selection",
+                "low": (30, "This product uses virgin synthetic materials with high environmental impact"),
+                "high": (60, "This product uses recycled synthetic materials, significantly reducing impact")
+            },
+            "Wool": {
+                "general": "Wool production impacts include animal welfare, land use, and methane emissions",
+                "area": "animal_welfare",
+                "subcategory": "Animal Welfare Management",
+                "low": (40, "Animal welfare practices for this wool product show significant room for improvement"),
+                "high": (60, "This wool product demonstrates strong animal welfare practices")
+            },
+            "MMCF": {
+                "general": "Man-made cellulosic fibers (like viscose) carry deforestation risks if not properly sourced",
+                "area": "land",
+                "subcategory": "Deforestation",
+                "low": (40, "This MMCF product shows significant deforestation risk"),
+                "high": (60, "This MMCF product demonstrates strong forest protection practices")
+            },
+            "Flax": {
+                "general": "Flax (linen) typically requires fewer pesticides and less water than cotton",
+                "area": "chemistry",
+                "subcategory": "Chemical Management Practices",
+                "low": (30, "Chemical management for this flax product shows room for improvement"),
+                "high": (60, "This flax product demonstrates strong chemical management practices")
+            }
+        }
+        
+        # Key environmental indicators (impact area subcategories) by material category
+        self.key_environmental_indicators = {
+            "Cotton": {
+                "water": ["Water Risk Management", "Water Monitoring (Withdrawal and Consumption)"],
+                "chemistry": ["Chemical Management Practices"],
+                "land": ["Soil Health Management"]
+            },
+            "Synthetic": {
+                "climate": ["Emission Management", "Climate Mitigation"],
+                "resource": ["Consumption Through Feedstock Selection"],
+                "chemistry": ["Chemical Management Practices"]
+            },
+            "Wool": {
+                "animal_welfare": ["Animal Welfare Management", "Living Environment"],
+                "land": ["Soil Health Management", "Rangeland Management for animal fibers"],
+                "climate": ["Emission Management"]
+            },
+            "MMCF": {
+                "land": ["Deforestation", "Land Management Planning"],
+                "water": ["Water Risk Management"],
+                "chemistry": ["Chemical Management Procedures"]
+            },
+            "Flax": {
+                "land": ["Soil Health Management"],
+                "biodiversity": ["Biodiversity Management Planning"],
+                "chemistry": ["Chemical Management Practices"]
+            }
+        }
+        
+        # Intern the subcategory names, as the database does, so their lookups compare by identity
+        for rule in self.category_insight_rules.values():
+            rule["subcategory"] = sys.intern(rule["subcategory"])
+        self.key_environmental_indicators = {
+            category: {area: [sys.intern(name) for name in names] for area, names in indicators.items()}
+            for category, indicators in self.key_environmental_indicators.items()
+        }
     
-    def interpret_and_summarize(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def interpret_and_summarize(self, data: Dict[str, Any], minimal: bool = False) -> Dict[str, Any]:
         """
         Interpret synthesized data and generate a final sustainability assessment.
+        With minimal=True only the rating, rating band, summary and depth are returned,
+        skipping the insights that don't make it into the summary.
+        """
+        return self._interpret_and_summarize(data, minimal)
+    
+    def interpret_and_summarize_batch(self, data_list: List[Dict[str, Any]], minimal: bool = False) -> List[Dict[str, Any]]:
+        """
+        Interpret the synthesized data of many products at once. The weighted scores and rating
+        bands of all products are computed together with NumPy; the insights and summaries
+        are then built per product as in interpret_and_summarize.
+        """
+        if not data_list:
+            return []
+        
+        # Weighted overall scores and rating bands of every product
+        scores = np.array([self._component_scores(data) for data in data_list], dtype=np.float64)
+        weights = np.array([
+            self._depth_weight_triples.get(data.get("assessment_depth", "standard"), self._depth_weight_triples["standard"])
+            for data in data_list
+        ])
+        weighted = scores[:, 0] * weights[:, 0] + scores[:, 1] * weights[:, 1] + scores[:, 2] * weights[:, 2]
+        # Python's round, so the ratings match interpret_and_summarize exactly
+        overall_scores = [round(score, 1) for score in weighted.tolist()]
+        bands = (np.searchsorted(self._band_threshold_array, overall_scores, side="right") - 1).tolist()
+        
+        return [
+            self._interpret_and_summarize(
+                data, minimal, (overall_score, self._band_labels[band] if band >= 0 else "Not Rated")
+            )
+            for data, overall_score, band in zip(data_list, overall_scores, bands)
+        ]
+    
+    def _identified_material_data(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The material impacts of the synthesized data, or None if the materials weren't identified."""
+        material_impact = data.get("material_impact", {})
+        if material_impact.get("identified", False):
+            return material_impact.get("impacts", {})
+        return None
+    
+    def _component_scores(self, data: Dict[str, Any]) -> Tuple[float, float, float]:
+        """The material, brand and consumer scores that interpret_and_summarize weights."""
+        material_data = self._identified_material_data(data)
+        if material_data is None:
+            material_score = 5.0
+        else:
+            material_score = material_data["overall"] if isinstance(material_data, dict) and material_data.get("overall") else 0.0
+        return (
+            material_score,
+            data.get("brand_assessment", {}).get("rating", 5.0),
+            data.get("consumer_feedback", {}).get("overall_sustainability_sentiment", 5.0)
+        )
+    
+    def _interpret_and_summarize(self, data: Dict[str, Any], minimal: bool,
+                                 scored: Optional[Tuple[float, str]] = None) -> Dict[str, Any]:
         """
-        # Get assessment depth and corresponding weights
+        Build the assessment for interpret_and_summarize, using the (overall score, rating band)
+        pair already computed by interpret_and_summarize_batch if given.
+        """
+        # Get assessment depth
         depth = data.get("assessment_depth", "standard")
-        weights = self.depth_weights.get(depth, self.depth_weights["standard"])
         
         # Extract component data
         material_impact = data.get("material_impact", {})
+        material_data = self._identified_material_data(data)
         brand_assessment = data.get("brand_assessment", {})
         consumer_feedback = data.get("consumer_feedback", {})
         
         # Calculate material impact score
         material_score = 0.0
         material_insights = []
+        impact_areas = None
         
-        if material_impact.get("identified", False):
-            material_data = material_impact.get("impacts", {})
+        if material_data is not None:
             if isinstance(material_data, dict) and material_data.get("overall"):
                 material_score = material_data.get("overall", 5.0)
                 
@@ -93,31 +263,34 @@ class ReportGenerator:
                         categories.append((cat, score))
                 
                 if categories:
-                    # Now sort only numeric category scores
-                    categories.sort(key=lambda x: x[1], reverse=True)
-                    
-                    top_category = categories[0]
-                    bottom_category = categories[-1]
+                    # Highest and lowest numeric category scores (the last of any tied lowest)
+                    top_category = max(categories, key=itemgetter(1))
+                    bottom_category = min(reversed(categories), key=itemgetter(1))
                     
                     material_insights.append(
-                        f"Material strength: {top_category[0].replace('_', ' ')} ({top_category[1]}/10)"
+                        f"Material strength: {_display_name(top_category[0])} ({top_category[1]}/10)"
                     )
                     material_insights.append(
-                        f"Material concern: {bottom_category[0].replace('_', ' ')} ({bottom_category[1]}/10)"
+                        f"Material concern: {_display_name(bottom_category[0])} ({bottom_category[1]}/10)"
                     )
                     
-                    if "blend_composition" in material_impact:
+                    if "blend_composition" in material_impact and not minimal:
                         blend = material_impact["blend_composition"]
                         materials_list = ", ".join(f"{int(pct*100)}% {mat}" for mat, pct in blend.items())
                         material_insights.append(f"Material composition: {materials_list}")
                         
-                # Add detailed insights from the detailed data if available
-                if "detailed_data" in material_data:
-                    detailed_insights = self._generate_detailed_material_insights(material_data["detailed_data"])
+                # Add detailed insights from the detailed data if available, building the
+                # comprehensive assessment's impact areas in the same pass (only the
+                # first material insight is needed for a minimal assessment's summary)
+                if "detailed_data" in material_data and not (minimal and material_insights):
+                    detailed_insights, impact_areas = self._walk_detailed_data(
+                        material_data["detailed_data"],
+                        material_data.get("category", "Unknown") if depth == "comprehensive" else None
+                    )
                     material_insights.extend(detailed_insights)
                 
                 # Add certification recommendations if available
-                if "certifications" in material_data:
+                if "certifications" in material_data and not (minimal and material_insights):
                     top_cert = material_data["certifications"][0]["certification"] if material_data["certifications"] else None
                     if top_cert:
                         material_insights.append(f"Recommended certification: {top_cert}")
@@ -129,67 +302,73 @@ class ReportGenerator:
         brand_score = brand_assessment.get("rating", 5.0)
         brand_insights = []
         
-        if "summary" in brand_assessment:
-            brand_insights.append(brand_assessment["summary"])
-        
-        if brand_assessment.get("has_specific_targets", False):
-            brand_insights.append("Brand has published specific sustainability targets")
-        
-        if brand_assessment.get("has_certifications", False):
-            brand_insights.append("Brand uses recognized sustainability certifications")
-        
-        if brand_assessment.get("has_criticism", False):
-            brand_insights.append("Brand has faced criticism about sustainability claims")
+        # Only look for brand insights if the assessment has any of their fields
+        if not _BRAND_INSIGHT_FIELDS.isdisjoint(brand_assessment):
+            if "summary" in brand_assessment:
+                brand_insights.append(brand_assessment["summary"])
+            
+            if brand_assessment.get("has_specific_targets", False):
+                brand_insights.append("Brand has published specific sustainability targets")
+            
+            if brand_assessment.get("has_certifications", False):
+                brand_insights.append("Brand uses recognized sustainability certifications")
+            
+            if brand_assessment.get("has_criticism", False):
+                brand_insights.append("Brand has faced criticism about sustainability claims")
         
         # Calculate consumer feedback score
         consumer_score = consumer_feedback.get("overall_sustainability_sentiment", 5.0)
         consumer_insights = []
         
-        if consumer_feedback.get("insights"):
-            consumer_insights.extend(consumer_feedback["insights"])
-        
-        if consumer_feedback.get("flags_triggered", False):
-            flags = consumer_feedback.get("sustainability_flags", [])
-            formatted_flags = [flag.replace("_", " ").capitalize() for flag in flags]
-            consumer_insights.append(f"Consumer concerns: {', '.join(formatted_flags)}")
-        
-        # Calculate weighted overall score
-        overall_score = (
-            material_score * weights["material_impact"] +
-            brand_score * weights["brand_assessment"] +
-            consumer_score * weights["consumer_feedback"]
-        )
-        
-        # Round to one decimal place
-        overall_score = round(overall_score, 1)
-        
-        # Determine rating band
-        rating_band = next((label for threshold, label in sorted(
-            self.rating_thresholds.items(), 
-            key=lambda x: x[0], 
-            reverse=True
-        ) if overall_score >= threshold), "Not Rated")
+        if not _CONSUMER_INSIGHT_FIELDS.isdisjoint(consumer_feedback):
+            if consumer_feedback.get("insights"):
+                consumer_insights.extend(consumer_feedback["insights"])
+            
+            if consumer_feedback.get("flags_triggered", False):
+                flags = consumer_feedback.get("sustainability_flags", [])
+                formatted_flags = [_display_title(flag) for flag in flags]
+                consumer_insights.append(f"Consumer concerns: {', '.join(formatted_flags)}")
+        
+        if scored is None:
+            # Calculate weighted overall score with the depth's weights
+            material_weight, brand_weight, consumer_weight = self._depth_weight_triples.get(depth, self._depth_weight_triples["standard"])
+            overall_score = (
+                material_score * material_weight +
+                brand_score * brand_weight +
+                consumer_score * consumer_weight
+            )
+            
+            # Round to one decimal place
+            overall_score = round(overall_score, 1)
+            
+            # Determine rating band
+            band = bisect_right(self._band_thresholds, overall_score) - 1
+            rating_band = self._band_labels[band] if band >= 0 else "Not Rated"
+        else:
+            overall_score, rating_band = scored
         
-        # Identify potential conflicts
+        # Identify potential conflicts; neither check can fire unless the scores span more than 3 points
         conflicts = []
         
-        # Check for material vs brand conflicts
-        if abs(material_score - brand_score) > 3:
-            if material_score > brand_score:
-                conflicts.append("Material sustainability appears stronger than brand's overall practices")
-            else:
-                conflicts.append("Brand's sustainability initiatives outpace the specific materials used")
-        
-        # Check for perception vs reality conflicts
-        if abs(consumer_score - ((material_score + brand_score) / 2)) > 3:
-            if consumer_score > ((material_score + brand_score) / 2):
-                conflicts.append("Consumer perception is more positive than technical assessment")
-            else:
-                conflicts.append("Technical assessment is more positive than consumer perception")
+        if max(material_score, brand_score, consumer_score) - min(material_score, brand_score, consumer_score) > 3:
+            # Check for material vs brand conflicts
+            if abs(material_score - brand_score) > 3:
+                if material_score > brand_score:
+                    conflicts.append("Material sustainability appears stronger than brand's overall practices")
+                else:
+                    conflicts.append("Brand's sustainability initiatives outpace the specific materials used")
+            
+            # Check for perception vs reality conflicts
+            technical_score = (material_score + brand_score) / 2
+            if abs(consumer_score - technical_score) > 3:
+                if consumer_score > technical_score:
+                    conflicts.append("Consumer perception is more positive than technical assessment")
+                else:
+                    conflicts.append("Technical assessment is more positive than consumer perception")
         
         # Add a relevant common conflict if appropriate
-        if conflicts and random.random() < 0.7:
-            conflicts.append(random.choice(list(self.common_conflicts.values())))
+        if conflicts and not minimal and random.random() < 0.7:
+            conflicts.append(random.choice(self._common_conflict_values))
         
         # Generate overall summary based on score and insights
         summary_components = []
@@ -224,6 +403,14 @@ class ReportGenerator:
         # Join summary components
         summary = " ".join(summary_components)
         
+        if minimal:
+            return {
+                "rating": overall_score,
+                "rating_band": rating_band,
+                "summary": summary,
+                "assessment_depth": depth
+            }
+        
         result = {
             "rating": overall_score,
             "rating_band": rating_band,
@@ -241,10 +428,9 @@ class ReportGenerator:
         }
         
         # Add detailed sections if assessment depth is comprehensive
-        if depth == "comprehensive" and material_impact.get("identified", False):
-            material_data = material_impact.get("impacts", {})
+        if depth == "comprehensive" and material_data is not None:
             if "detailed_data" in material_data:
-                result["detailed_assessment"] = self._generate_detailed_assessment(material_data)
+                result["detailed_assessment"] = self._generate_detailed_assessment(material_data, impact_areas)
         
         return result
     
@@ -252,7 +438,16 @@ class ReportGenerator:
         """
         Generate insights from detailed material data.
         """
+        return self._walk_detailed_data(detailed_data)[0]
+    
+    def _walk_detailed_data(self, detailed_data: Dict[str, Any], material_category: Optional[str] = None) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+        """
+        Generate the insights from detailed material data and, if a material category is given,
+        the detailed assessment's impact areas, in a single pass over the performance and detailed
+        scores. The impact areas are None without a category or performance scores.
+        """
         insights = []
+        impact_areas = None
         
         # Extract top certifications
         if "available_certifications" in detailed_data:
@@ -261,84 +456,83 @@ class ReportGenerator:
                 top_cert = certs[0]
                 insights.append(f"Top certification standard: {top_cert}")
         
-        # Extract performance highlights
+        # Extract performance highlights, and each area's scores for the impact areas
         if "performance_scores" in detailed_data:
             perf_scores = detailed_data["performance_scores"]
-            # Sort by highest score
-            sorted_areas = sorted(perf_scores.items(), key=lambda x: x[1]["average"], reverse=True)
-            if sorted_areas:
-                top_area = sorted_areas[0]
-                area_name = top_area[0].replace('_', ' ').capitalize()
+            if material_category is not None:
+                # Get priority ranks for this material type; other areas rank after them
+                priority_ranks = self._material_priority_ranks.get(material_category, {})
+                unranked = len(priority_ranks) + 1
+                impact_areas = {}
+            
+            top_area = None
+            for area, scores in perf_scores.items():
+                # Find the highest score
+                if top_area is None or scores["average"] > top_area[1]["average"]:
+                    top_area = (area, scores)
+                
+                if impact_areas is not None:
+                    impact_areas[area] = {
+                        "name": _display_title(area),
+                        "average_score": round(scores["average"], 1),
+                        "min_score": round(scores["min"], 1),
+                        "max_score": round(scores["max"], 1),
+                        "priority_for_material": priority_ranks.get(area, unranked)
+                    }
+            
+            if top_area is not None:
+                area_name = _display_title(top_area[0])
                 score = round(top_area[1]["average"], 1)
                 insights.append(f"Best performing impact area: {area_name} ({score}/100)")
         
-        # Extract highlight from detailed scores
+        # Extract highlight from detailed scores, and the impact areas' subcategories
         if "detailed_scores" in detailed_data:
-            detail_scores = detailed_data["detailed_scores"]
-            for area, subcategories in detail_scores.items():
-                area_name = area.replace('_', ' ').capitalize()
-                # Find highest scoring subcategory
-                if subcategories:
-                    sorted_subcats = sorted(subcategories.items(), key=lambda x: x[1]["average"], reverse=True)
-                    if sorted_subcats:
-                        top_subcat = sorted_subcats[0]
-                        subcat_name = top_subcat[0]
-                        score = round(top_subcat[1]["average"], 1)
-                        if score > 50:  # Only include high scores
-                            insights.append(f"Strong {area_name} performance in: {subcat_name} ({score}/100)")
-                        break  # Only include one detailed insight to avoid overwhelming
-        
-        return insights[:3]  # Limit the number of insights
+            highlighted = False
+            for area, subcategories in detailed_data["detailed_scores"].items():
+                # Find highest scoring subcategory, for the first area that has any
+                if subcategories and not highlighted:
+                    top_subcat = max(subcategories.items(), key=lambda x: x[1]["average"])
+                    subcat_name = top_subcat[0]
+                    score = round(top_subcat[1]["average"], 1)
+                    if score > 50:  # Only include high scores
+                        insights.append(f"Strong {_display_title(area)} performance in: {subcat_name} ({score}/100)")
+                    highlighted = True  # Only include one detailed insight to avoid overwhelming
+                
+                if impact_areas is None:
+                    if highlighted:
+                        break
+                elif area in impact_areas:
+                    # Add detailed subcategory data, sorted by score
+                    impact_areas[area]["subcategories"] = sorted(
+                        ({"name": subcat_name, "score": round(subcat_data["average"], 1)}
+                         for subcat_name, subcat_data in subcategories.items()),
+                        key=lambda x: x["score"], reverse=True
+                    )
+        
+        return insights[:3], impact_areas  # Limit the number of insights
     
-    def _generate_detailed_assessment(self, material_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_detailed_assessment(self, material_data: Dict[str, Any], impact_areas: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
-        Generate a detailed assessment section for comprehensive reports.   
+        Generate a detailed assessment section for comprehensive reports.
+        Reuses impact areas already built by _walk_detailed_data if given.
         """
+        material_category = material_data.get("category", "Unknown")
         assessment = {
-            "material_category": material_data.get("category", "Unknown"),
+            "material_category": material_category,
             "impact_areas": {},
             "certifications": [],
             "recommendations": []
         }
         
         # Process impact areas
-        if "detailed_data" in material_data and "performance_scores" in material_data["detailed_data"]:
-            performance = material_data["detailed_data"]["performance_scores"]
-            material_category = material_data.get("category", "Unknown")
-            
-            # Get priority areas for this material type
-            priority_areas = self.material_priorities.get(material_category, [])
-            
-            # Process each area
-            for area, scores in performance.items():
-                priority = priority_areas.index(area) + 1 if area in priority_areas else len(priority_areas) + 1
-                area_data = {
-                    "name": area.replace('_', ' ').capitalize(),
-                    "average_score": round(scores["average"], 1),
-                    "min_score": round(scores["min"], 1),
-                    "max_score": round(scores["max"], 1),
-                    "priority_for_material": priority
-                }
-                
-                # Add detailed subcategory data if available
-                if "detailed_scores" in material_data["detailed_data"] and area in material_data["detailed_data"]["detailed_scores"]:
-                    area_data["subcategories"] = []
-                    subcats = material_data["detailed_data"]["detailed_scores"][area]
-                    
-                    for subcat_name, subcat_data in subcats.items():
-                        area_data["subcategories"].append({
-                            "name": subcat_name,
-                            "score": round(subcat_data["average"], 1)
-                        })
-                    
-                    # Sort subcategories by score
-                    area_data["subcategories"].sort(key=lambda x: x["score"], reverse=True)
-                
-                assessment["impact_areas"][area] = area_data
+        if impact_areas is None:
+            impact_areas = self._walk_detailed_data(material_data.get("detailed_data", {}), material_category)[1]
+        if impact_areas is not None:
+            assessment["impact_areas"] = impact_areas
             
             # Sort impact areas by priority for material type
             assessment["sorted_impact_areas"] = sorted(
-                assessment["impact_areas"].items(),
+                impact_areas.items(),
                 key=lambda x: x[1]["priority_for_material"]
             )
         
@@ -347,8 +541,11 @@ class ReportGenerator:
             for cert in material_data["certifications"]:
                 cert_name = cert["certification"]
                 # Calculate average score across impact areas
-                scores = [score["score"] for score in cert["impact_scores"].values()]
-                avg_score = sum(scores) / len(scores) if scores else 0
+                total, count = 0.0, 0
+                for score in cert["impact_scores"].values():
+                    total += score["score"]
+                    count += 1
+                avg_score = total / count if count else 0
                 
                 assessment["certifications"].append({
                     "name": cert_name,
@@ -370,7 +567,7 @@ class ReportGenerator:
                     cert_area_score = cert_score["score"]
                     
                     if cert_area_score > baseline_score + 20:  # Significant improvement
-                        area_name = area.replace('_', ' ').capitalize()
+                        area_name = _display_title(area)
                         improvement = round(cert_area_score - baseline_score, 1)
                         assessment["recommendations"].append({
                             "area": area_name,
@@ -392,10 +589,8 @@ class ReportGenerator:
         assessment = self.interpret_and_summarize(data)
         
         # Add material type-specific insights
-        material_impact = data.get("material_impact", {})
-        if material_impact.get("identified", False):
-            material_data = material_impact.get("impacts", {})
-            
+        material_data = self._identified_material_data(data)
+        if material_data is not None:
             if "category" in material_data:
                 material_category = material_data["category"]
                 material_priorities = self.material_priorities.get(material_category, [])
@@ -406,7 +601,7 @@ class ReportGenerator:
                 
                 # Add priority impact areas
                 if material_priorities:
-                    assessment["priority_impact_areas"] = [area.replace('_', ' ').capitalize() for area in material_priorities[:3]]
+                    assessment["priority_impact_areas"] = [_display_title(area) for area in material_priorities[:3]]
                 
                 # Add key environmental indicators
                 if "detailed_data" in material_data:
@@ -415,8 +610,7 @@ class ReportGenerator:
                         assessment["key_environmental_indicators"] = indicators
         
         # Add detailed certification analysis if available
-        if material_impact.get("identified", False) and "certifications" in material_impact.get("impacts", {}):
-            material_data = material_impact["impacts"]
+        if material_data is not None and "certifications" in material_data:
             cert_analysis = self._analyze_certifications(material_data)
             if cert_analysis:
                 assessment["certification_analysis"] = cert_analysis
@@ -427,77 +621,23 @@ class ReportGenerator:
         """
         Get insights specific to a material category.
         """
-        insights = []
-        
-        if category == "Cotton":
-            insights.append("Cotton is a water-intensive crop; certified organic and recycled options reduce impact")
-            
-            # Add water use insights if available
-            if "detailed_data" in material_data and "detailed_scores" in material_data["detailed_data"]:
-                if "water" in material_data["detailed_data"]["detailed_scores"]:
-                    water_data = material_data["detailed_data"]["detailed_scores"]["water"]
-                    if "Water Risk Management" in water_data:
-                        score = water_data["Water Risk Management"]["average"]
-                        if score < 40:
-                            insights.append("Water management practices for this cotton product show significant room for improvement")
-                        elif score > 60:
-                            insights.append("This cotton product demonstrates strong water management practices")
-        
-        elif category == "Synthetic":
-            insights.append("Synthetic fibers are derived from fossil fuels; recycled alternatives reduce carbon impact")
-            
-            # Add resource use insights if available
-            if "detailed_data" in material_data and "detailed_scores" in material_data["detailed_data"]:
-                if "resource" in material_data["detailed_data"]["detailed_scores"]:
-                    resource_data = material_data["detailed_data"]["detailed_scores"]["resource"]
-                    if "Consumption Through Feedstock Selection" in resource_data:
-                        score = resource_data["Consumption Through Feedstock Selection"]["average"]
-                        if score < 30:
-                            insights.append("This product uses virgin synthetic materials with high environmental impact")
-                        elif score > 60:
-                            insights.append("This product uses recycled synthetic materials, significantly reducing impact")
-        
-        elif category == "Wool":
-            insights.append("Wool production impacts include animal welfare, land use, and methane emissions")
-            
-            # Add animal welfare insights if available
-            if "detailed_data" in material_data and "detailed_scores" in material_data["detailed_data"]:
-                if "animal_welfare" in material_data["detailed_data"]["detailed_scores"]:
-                    welfare_data = material_data["detailed_data"]["detailed_scores"]["animal_welfare"]
-                    if "Animal Welfare Management" in welfare_data:
-                        score = welfare_data["Animal Welfare Management"]["average"]
-                        if score < 40:
-                            insights.append("Animal welfare practices for this wool product show significant room for improvement")
-                        elif score > 60:
-                            insights.append("This wool product demonstrates strong animal welfare practices")
-        
-        elif category == "MMCF":
-            insights.append("Man-made cellulosic fibers (like viscose) carry deforestation risks if not properly sourced")
-            
-            # Add land use insights if available
-            if "detailed_data" in material_data and "detailed_scores" in material_data["detailed_data"]:
-                if "land" in material_data["detailed_data"]["detailed_scores"]:
-                    land_data = material_data["detailed_data"]["detailed_scores"]["land"]
-                    if "Deforestation" in land_data:
-                        score = land_data["Deforestation"]["average"]
-                        if score < 40:
-                            insights.append("This MMCF product shows significant deforestation risk")
-                        elif score > 60:
-                            insights.append("This MMCF product demonstrates strong forest protection practices")
-        
-        elif category == "Flax":
-            insights.append("Flax (linen) typically requires fewer pesticides and less water than cotton")
-            
-            # Add chemistry insights if available
-            if "detailed_data" in material_data and "detailed_scores" in material_data["detailed_data"]:
-                if "chemistry" in material_data["detailed_data"]["detailed_scores"]:
-                    chem_data = material_data["detailed_data"]["detailed_scores"]["chemistry"]
-                    if "Chemical Management Practices" in chem_data:
-                        score = chem_data["Chemical Management Practices"]["average"]
-                        if score < 30:
-                            insights.append("Chemical management for this flax product shows room for improvement")
-                        elif score > 60:
-                            insights.append("This flax product demonstrates strong chemical management practices")
+        rule = self.category_insight_rules.get(category)
+        if rule is None:
+            return []
+        
+        insights = [rule["general"]]
+        detailed_scores = material_data.get("detailed_data", {}).get("detailed_scores", {})
+        
+        # Add an insight on the category's key practice if its score is available
+        practice = detailed_scores.get(rule["area"], {}).get(rule["subcategory"])
+        if practice is not None:
+            score = practice["average"]
+            low_threshold, low_insight = rule["low"]
+            high_threshold, high_insight = rule["high"]
+            if score < low_threshold:
+                insights.append(low_insight)
+            elif score > high_threshold:
+                insights.append(high_insight)
         
         return insights
     
@@ -507,56 +647,27 @@ class ReportGenerator:
         """
         indicators = {}
         
-        # Define key indicators by material category
-        key_indicator_map = {
-            "Cotton": {
-                "water": ["Water Risk Management", "Water Monitoring (Withdrawal and Consumption)"],
-                "chemistry": ["Chemical Management Practices"],
-                "land": ["Soil Health Management"]
-            },
-            "Synthetic": {
-                "climate": ["Emission Management", "Climate Mitigation"],
-                "resource": ["Consumption Through Feedstock Selection"],
-                "chemistry": ["Chemical Management Practices"]
-            },
-            "Wool": {
-                "animal_welfare": ["Animal Welfare Management", "Living Environment"],
-                "land": ["Soil Health Management", "Rangeland Management for animal fibers"],
-                "climate": ["Emission Management"]
-            },
-            "MMCF": {
-                "land": ["Deforestation", "Land Management Planning"],
-                "water": ["Water Risk Management"],
-                "chemistry": ["Chemical Management Procedures"]
-            },
-            "Flax": {
-                "land": ["Soil Health Management"],
-                "biodiversity": ["Biodiversity Management Planning"],
-                "chemistry": ["Chemical Management Practices"]
-            }
-        }
-        
         # Get indicators for this category
-        category_indicators = key_indicator_map.get(category, {})
+        category_indicators = self.key_environmental_indicators.get(category, {})
         
-        if "detailed_scores" in detailed_data:
-            scores = detailed_data["detailed_scores"]
+        scores = detailed_data.get("detailed_scores", {})
+        for area, subcategories in category_indicators.items():
+            area_data = scores.get(area)
+            if area_data is None:
+                continue
             
-            for area, subcategories in category_indicators.items():
-                if area in scores:
-                    area_data = scores[area]
-                    area_indicators = {}
-                    
-                    for subcat in subcategories:
-                        if subcat in area_data:
-                            area_indicators[subcat] = {
-                                "score": round(area_data[subcat]["average"], 1),
-                                "min": round(area_data[subcat]["min"], 1),
-                                "max": round(area_data[subcat]["max"], 1)
-                            }
-                    
-                    if area_indicators:
-                        indicators[area] = area_indicators
+            area_indicators = {}
+            for subcat in subcategories:
+                subcat_data = area_data.get(subcat)
+                if subcat_data is not None:
+                    area_indicators[subcat] = {
+                        "score": round(subcat_data["average"], 1),
+                        "min": round(subcat_data["min"], 1),
+                        "max": round(subcat_data["max"], 1)
+                    }
+            
+            if area_indicators:
+                indicators[area] = area_indicators
         
         return indicators
     
@@ -1,5 +1,93 @@
-from typing import Dict, Any, List
-from utils.gemini_api import GeminiAPI
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from utils.gemini_api import REVIEW_GEMINI_MODEL, REVIEWS_PER_PROMPT, FallbackResult, get_gemini_api
+
+# Gemini review analyses persisted across runs, keyed by a hash of the reviewed batch
+REVIEW_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ecoagent", "review_cache.json")
+REVIEW_CACHE_TTL = 30 * 24 * 3600
+
+# In-memory view of the review cache file, loaded on first use
+_review_cache = None
+
+def _load_review_cache():
+    """Load the on-disk review cache once per process."""
+    global _review_cache
+    if _review_cache is None:
+        try:
+            with open(REVIEW_CACHE_PATH, encoding="utf-8") as f:
+                _review_cache = json.load(f)
+        except (OSError, ValueError):
+            _review_cache = {}
+    return _review_cache
+
+def _save_review_cache():
+    """Persist the review cache file."""
+    try:
+        os.makedirs(os.path.dirname(REVIEW_CACHE_PATH), exist_ok=True)
+        tmp_path = REVIEW_CACHE_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_load_review_cache(), f)
+        os.replace(tmp_path, REVIEW_CACHE_PATH)
+    except OSError as e:
+        print(f"Could not write review cache: {e}")
+
+# Sustainability keywords by category
+SUSTAINABILITY_KEYWORDS = {
+    category: frozenset(keywords) for category, keywords in {
+        "materials": [
+            "organic", "recycled", "sustainable", "synthetic", "plastic", 
+            "biodegradable", "eco-friendly", "natural", "chemical", "toxic"
+        ],
+        "production": [
+            "ethical", "factory", "working conditions", "made in", "labor", 
+            "sweatshop", "fair trade", "child labor", "workers"
+        ],
+        "packaging": [
+            "packaging", "plastic", "excessive", "waste", "recyclable", 
+            "minimal", "unnecessary", "eco-packaging", "paper"
+        ],
+        "durability": [
+            "quality", "durable", "lasted", "falling apart", "wear out", 
+            "tear", "long-lasting", "disposable", "fast fashion", "lifetime"
+        ],
+        "environmental_impact": [
+            "carbon", "footprint", "climate", "environmental", "green", 
+            "eco", "planet", "earth", "pollution", "sustainable"
+        ]
+    }.items()
+}
+
+# Sustainability flags
+SUSTAINABILITY_FLAGS = (
+    "greenwashing",           # Claims vs. reality
+    "quality_concerns",       # Durability issues
+    "ethical_production",     # Labor and production concerns
+    "chemical_concerns",      # Harmful chemicals
+    "excessive_packaging",    # Packaging waste
+    "microplastics",          # Synthetic fiber shedding
+    "false_claims",           # Misleading marketing
+    "certifications"          # Mentions of standards/certifications
+)
+
+# Categories of each keyword (e.g. "plastic" is both a materials and a packaging keyword)
+_KEYWORD_CATEGORIES = {}
+for _category, _keywords in SUSTAINABILITY_KEYWORDS.items():
+    for _keyword in _keywords:
+        _KEYWORD_CATEGORIES[_keyword] = _KEYWORD_CATEGORIES.get(_keyword, ()) + (_category,)
+del _category, _keywords, _keyword
+_ALL_KEYWORDS = frozenset(_KEYWORD_CATEGORIES)
+
+# Any sustainability keyword starting a word, in a single pattern, to find the reviews worth analyzing.
+# Matched against lowercased text: a case-sensitive scan of the literal alternation runs several
+# times faster than an IGNORECASE one
+_KEYWORD_RE = re.compile(
+    r'\b(?:' + '|'.join(map(re.escape, sorted(_ALL_KEYWORDS, key=lambda keyword: (-len(keyword), keyword)))) + ')'
+)
 
 
 class ReviewAnalyzer:
@@ -7,47 +95,269 @@ class ReviewAnalyzer:
     Analyzes customer reviews for sustainability-related mentions and sentiments.
     """
     
-    def __init__(self, gemini_api_key=None, use_mock_api=True):
+    # Fixed attribute set, so instances carry no per-instance __dict__
+    __slots__ = (
+        "gemini_api", "batch_size", "target_context_fraction", "cache_ttl", "sustainability_keywords", "sustainability_flags",
+        "_keyword_categories", "_all_keywords", "_keyword_re"
+    )
+    
+    # Concurrent Gemini requests allowed when analyzing review batches asynchronously
+    MAX_CONCURRENT_REQUESTS = 5
+    
+    # Gemini requests started per minute at most, to stay within the API quota
+    REQUESTS_PER_MINUTE = 60
+    
+    def __init__(self, gemini_api_key=None, use_mock_api=True, batch_size=REVIEWS_PER_PROMPT, cache_ttl=REVIEW_CACHE_TTL,
+                 model=REVIEW_GEMINI_MODEL, target_context_fraction=0.8):
         """Initialize with sustainability keywords and API."""
-        # API client
-        self.gemini_api = GeminiAPI(api_key=gemini_api_key, use_mock=use_mock_api)
+        # Shared API client, on a model suited to review classification
+        self.gemini_api = get_gemini_api(gemini_api_key, use_mock_api, model)
+        # Reviews per analysis; larger review sets are split and their analyses merged
+        self.batch_size = max(1, min(batch_size, REVIEWS_PER_PROMPT))
+        # Share of the model's context window one request may fill with packed batches
+        self.target_context_fraction = target_context_fraction
+        # Seconds a persisted Gemini analysis is reused for (0 or None disables the review cache);
+        # only real API results are cached
+        self.cache_ttl = cache_ttl if not self.gemini_api.use_mock and self.gemini_api.api_initialized else None
         
-        # Sustainability keywords by category
-        self.sustainability_keywords = {
-            "materials": [
-                "organic", "recycled", "sustainable", "synthetic", "plastic", 
-                "biodegradable", "eco-friendly", "natural", "chemical", "toxic"
-            ],
-            "production": [
-                "ethical", "factory", "working conditions", "made in", "labor", 
-                "sweatshop", "fair trade", "child labor", "workers"
-            ],
-            "packaging": [
-                "packaging", "plastic", "excessive", "waste", "recyclable", 
-                "minimal", "unnecessary", "eco-packaging", "paper"
-            ],
-            "durability": [
-                "quality", "durable", "lasted", "falling apart", "wear out", 
-                "tear", "long-lasting", "disposable", "fast fashion", "lifetime"
-            ],
-            "environmental_impact": [
-                "carbon", "footprint", "climate", "environmental", "green", 
-                "eco", "planet", "earth", "pollution", "sustainable"
-            ]
+        # Shared, read-only keyword tables built at import time
+        self.sustainability_keywords = SUSTAINABILITY_KEYWORDS
+        self.sustainability_flags = SUSTAINABILITY_FLAGS
+        self._keyword_categories = _KEYWORD_CATEGORIES
+        self._all_keywords = _ALL_KEYWORDS
+        self._keyword_re = _KEYWORD_RE
+    
+    def _batches(self, reviews: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Split the reviews into batches of at most batch_size."""
+        return [reviews[start:start + self.batch_size] for start in range(0, len(reviews), self.batch_size)]
+    
+    def _partition(self, reviews: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Split the reviews into the distinct ones mentioning a sustainability keyword, repeats
+        of those (same text up to case and whitespace), and the reviews without keywords.
+        """
+        relevant, duplicates, unrelated = [], [], []
+        seen = set()
+        for review in reviews:
+            text = (review.get("text") or "").lower()
+            if not self._keyword_re.search(text):
+                unrelated.append(review)
+                continue
+            normalized = " ".join(text.split())
+            if normalized in seen:
+                duplicates.append(review)
+            else:
+                seen.add(normalized)
+                relevant.append(review)
+        return relevant, duplicates, unrelated
+    
+    def _neutral_analysis(self, reviews: List[Dict[str, Any]], note_absence: bool = False) -> Dict[str, Any]:
+        """Analysis of reviews that don't mention sustainability: neutral sentiment and no flags."""
+        return {
+            "total_reviews_analyzed": len(reviews),
+            "flags_triggered": False,
+            "sustainability_flags": [],
+            "insights": ["No sustainability-related mentions found in reviews."] if note_absence else [],
+            "overall_sustainability_sentiment": 5.0
+        }
+    
+    def _with_skipped(self, analysis: Dict[str, Any], relevant: List[Dict[str, Any]],
+                      duplicates: List[Dict[str, Any]], unrelated: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Count the reviews that weren't sent into the analysis of the relevant ones: duplicates
+        share the analysis of the review they repeat, reviews without keywords are neutral.
+        """
+        if duplicates:
+            analysis = dict(analysis)
+            analysis["total_reviews_analyzed"] = analysis.get("total_reviews_analyzed", len(relevant)) + len(duplicates)
+            relevant = relevant + duplicates
+        if not unrelated:
+            return analysis
+        return self._merge_analyses([analysis, self._neutral_analysis(unrelated)], [relevant, unrelated])
+    
+    def _cache_key(self, batch: List[Dict[str, Any]]) -> str:
+        """Hash of everything the review prompt includes for a batch, plus the model answering it."""
+        content = json.dumps([self.gemini_api.model_name] + [[review.get("rating"), review.get("text")] for review in batch])
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _cached_analyses(self, batches: List[List[Dict[str, Any]]]) -> Tuple[List[Optional[Dict[str, Any]]], List[int]]:
+        """Look the batches up in the review cache; return their analyses (None if not cached) and the indices to analyze."""
+        if not self.cache_ttl:
+            return [None] * len(batches), list(range(len(batches)))
+        cache = _load_review_cache()
+        now = time.time()
+        analyses = []
+        for batch in batches:
+            cached = cache.get(self._cache_key(batch))
+            analyses.append(cached["result"] if cached and now - cached["cached_at"] < self.cache_ttl else None)
+        return analyses, [index for index, analysis in enumerate(analyses) if analysis is None]
+    
+    def _remember_analyses(self, analyses: List[Optional[Dict[str, Any]]], batches: List[List[Dict[str, Any]]], missing: List[int], fresh: List[Dict[str, Any]]):
+        """
+        Fill the fresh analyses into their slots and persist them in the review cache, except
+        mock fallbacks for failed Gemini requests, which are asked for again on the next run.
+        """
+        for index, analysis in zip(missing, fresh):
+            analyses[index] = analysis
+        answered = [(index, analysis) for index, analysis in zip(missing, fresh) if not isinstance(analysis, FallbackResult)]
+        if self.cache_ttl and answered:
+            cache = _load_review_cache()
+            now = time.time()
+            for index, analysis in answered:
+                cache[self._cache_key(batches[index])] = {"cached_at": now, "result": analysis}
+            _save_review_cache()
+    
+    def _requests(self, batches: List[List[Dict[str, Any]]]) -> List[List[List[Dict[str, Any]]]]:
+        """
+        Pack batches greedily into requests, each filling at most target_context_fraction of the
+        model's context window (a batch larger than that on its own gets a request to itself).
+        """
+        budget = self.gemini_api.context_tokens * self.target_context_fraction
+        requests, request, used = [], [], 0
+        for batch in batches:
+            tokens = self.gemini_api.reviews_prompt_tokens(batch)
+            if request and used + tokens > budget:
+                requests.append(request)
+                request, used = [], 0
+            request.append(batch)
+            used += tokens
+        if request:
+            requests.append(request)
+        return requests
+    
+    def _analyze_batches(self, batches: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Analyze review batches, sending only those not in the review cache, packed into as few requests as fit."""
+        analyses, missing = self._cached_analyses(batches)
+        if missing:
+            fresh = []
+            for request in self._requests([batches[index] for index in missing]):
+                if len(request) == 1:
+                    fresh.append(self.gemini_api.analyze_reviews(request[0]))
+                else:
+                    fresh.extend(self.gemini_api.analyze_reviews_batch(request))
+            self._remember_analyses(analyses, batches, missing, fresh)
+        return analyses
+    
+    def _merge_analyses(self, analyses: List[Dict[str, Any]], batches: List[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Combine the analyses of several review batches into one, weighting sentiment by batch size."""
+        total = sum(len(batch) for batch in batches)
+        sentiment = sum(
+            analysis.get("overall_sustainability_sentiment", 5.0) * len(batch)
+            for analysis, batch in zip(analyses, batches)
+        ) / total
+        # Keep the first occurrence of each flag and insight, in batch order
+        flags = dict.fromkeys(flag for analysis in analyses for flag in analysis.get("sustainability_flags", []))
+        insights = dict.fromkeys(insight for analysis in analyses for insight in analysis.get("insights", []))
+        return {
+            "total_reviews_analyzed": sum(analysis.get("total_reviews_analyzed", len(batch)) for analysis, batch in zip(analyses, batches)),
+            "flags_triggered": any(analysis.get("flags_triggered", False) for analysis in analyses),
+            "sustainability_flags": list(flags),
+            "insights": list(insights),
+            "overall_sustainability_sentiment": sentiment
         }
-        
-        # Sustainability flags
-        self.sustainability_flags = [
-            "greenwashing",           # Claims vs. reality
-            "quality_concerns",       # Durability issues
-            "ethical_production",     # Labor and production concerns
-            "chemical_concerns",      # Harmful chemicals
-            "excessive_packaging",    # Packaging waste
-            "microplastics",          # Synthetic fiber shedding
-            "false_claims",           # Misleading marketing
-            "certifications"          # Mentions of standards/certifications
-        ]
     
     def analyze_with_gemini(self, reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Analyze reviews using Gemini API for sustainability insights."""
-        return self.gemini_api.analyze_reviews(reviews)
+        """
+        Analyze reviews using Gemini API for sustainability insights. Only distinct reviews mentioning
+        a sustainability keyword are sent; sets larger than batch_size are analyzed in batches,
+        packed into as few requests as fit target_context_fraction of the context window, and merged. Batches analyzed within cache_ttl are reused.
+        """
+        relevant, duplicates, unrelated = self._partition(reviews)
+        if not relevant:
+            return self._neutral_analysis(unrelated, note_absence=True)
+        
+        batches = self._batches(relevant)
+        analyses = self._analyze_batches(batches)
+        analysis = analyses[0] if len(batches) == 1 else self._merge_analyses(analyses, batches)
+        return self._with_skipped(analysis, relevant, duplicates, unrelated)
+    
+    def analyze_with_gemini_batch(self, review_sets: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Analyze the reviews of many products offline, packing every product's batches
+        together into as few Gemini requests as fit instead of one request per product.
+        """
+        partitions = [self._partition(reviews) for reviews in review_sets]
+        product_batches = [self._batches(relevant) for relevant, _, _ in partitions]
+        all_batches = [batch for batches in product_batches for batch in batches]
+        analyses = iter(self._analyze_batches(all_batches))
+        
+        results = []
+        for (relevant, duplicates, unrelated), batches in zip(partitions, product_batches):
+            if not batches:
+                results.append(self._neutral_analysis(unrelated, note_absence=True))
+                continue
+            product_analyses = [next(analyses) for _ in batches]
+            analysis = product_analyses[0] if len(batches) == 1 else self._merge_analyses(product_analyses, batches)
+            results.append(self._with_skipped(analysis, relevant, duplicates, unrelated))
+        return results
+    
+    async def _iter_batch_analyses(self, batches: List[List[Dict[str, Any]]]) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Yield (index, analysis) for each batch: cached ones first, then the rest as their
+        concurrent requests complete, at most MAX_CONCURRENT_REQUESTS at a time and
+        REQUESTS_PER_MINUTE per minute.
+        """
+        analyses, missing = self._cached_analyses(batches)
+        for index, analysis in enumerate(analyses):
+            if analysis is not None:
+                yield index, analysis
+        if not missing:
+            return
+        
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+        loop = asyncio.get_running_loop()
+        # Only real requests count against the quota
+        throttle = not self.gemini_api.use_mock and self.gemini_api.api_initialized
+        interval = 60.0 / self.REQUESTS_PER_MINUTE
+        next_start = loop.time()
+        
+        async def analyze(index):
+            nonlocal next_start
+            async with semaphore:
+                if throttle:
+                    # Space out request starts evenly to stay within the per-minute limit
+                    now = loop.time()
+                    start, next_start = max(next_start, now), max(next_start, now) + interval
+                    if start > now:
+                        await asyncio.sleep(start - now)
+                return index, await self.gemini_api.analyze_reviews_async(batches[index])
+        
+        tasks = [asyncio.ensure_future(analyze(index)) for index in missing]
+        completed = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, analysis = await next_done
+                analyses[index] = analysis
+                completed.append(index)
+                yield index, analysis
+        finally:
+            # Stop outstanding requests if the consumer stops early, and keep what was analyzed
+            for task in tasks:
+                task.cancel()
+            self._remember_analyses(analyses, batches, completed, [analyses[index] for index in completed])
+    
+    async def iter_analyses(self, reviews: List[Dict[str, Any]]) -> AsyncIterator[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+        """
+        Yield (batch, analysis) for the batches of distinct keyword-matching reviews as each
+        analysis completes, so large review sets can be processed while requests are in flight.
+        """
+        relevant, _, _ = self._partition(reviews)
+        batches = self._batches(relevant)
+        async for index, analysis in self._iter_batch_analyses(batches):
+            yield batches[index], analysis
+    
+    async def analyze_with_gemini_async(self, reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Async variant of analyze_with_gemini. Uncached batches are analyzed as concurrent requests,
+        at most MAX_CONCURRENT_REQUESTS at a time and REQUESTS_PER_MINUTE per minute.
+        """
+        relevant, duplicates, unrelated = self._partition(reviews)
+        if not relevant:
+            return self._neutral_analysis(unrelated, note_absence=True)
+        
+        batches = self._batches(relevant)
+        analyses = [None] * len(batches)
+        async for index, analysis in self._iter_batch_analyses(batches):
+            analyses[index] = analysis
+        analysis = analyses[0] if len(batches) == 1 else self._merge_analyses(analyses, batches)
+        return self._with_skipped(analysis, relevant, duplicates, unrelated)
@@ -1,9 +1,345 @@
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import types
 import random
+import numpy as np
 import re
 import requests
 import os
-from typing import Dict, List, Any
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List, Any, Tuple
+from urllib.parse import urlsplit
 
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; fall back to the standard library parser
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+OXYLABS_QUERIES_URL = 'https://realtime.oxylabs.io/v1/queries'
+
+# ASIN after a product path prefix (/dp/, /gp/product/ or /ASIN/), in a single pattern
+_PRODUCT_ASIN_RE = re.compile(r'/(?:dp|gp/product|ASIN)/([A-Z0-9]{10})')
+# Fallback: any ten-character ASIN-like path segment
+_PATH_ASIN_RE = re.compile(r'/([A-Z0-9]{10})(?:/|\?|$)')
+_PATH_SEPARATOR_RE = re.compile(r'[/?]')
+
+
+@functools.lru_cache(maxsize=4096)
+def _asin_from_url(url: str):
+    """Return the ASIN named in an Amazon URL, or None; cached since each URL is parsed several times."""
+    # Clean up the URL first - remove all query parameters
+    url = url.partition('?')[0]
+    
+    # Try to extract ASIN using regex patterns, product path prefixes first
+    match = _PRODUCT_ASIN_RE.search(url) or _PATH_ASIN_RE.search(url)
+    if match:
+        return match.group(1)
+    
+    # Special handling for complex Amazon URLs (like Amazon.in with query parameters)
+    if '/dp/' in url:
+        # Extract just the dp part
+        dp_part = url.partition('/dp/')[2]
+        # Get the first segment before any slash or question mark
+        clean_id = _PATH_SEPARATOR_RE.split(dp_part, 1)[0]
+        if clean_id and len(clean_id) >= 8:  # Some ASINs might be 8-10 chars
+            return clean_id
+    
+    return None
+
+
+def _response_json(response: requests.Response) -> Any:
+    """
+    Parse a response body as JSON, with orjson when it is installed.
+    The result is kept on the response, so a multi-megabyte body is only parsed once.
+    """
+    parsed = getattr(response, "parsed_json", None)
+    if parsed is None:
+        parsed = orjson.loads(response.content) if orjson is not None else response.json()
+        response.parsed_json = parsed
+    return parsed
+
+
+# Product page fields: a number within a price string, and a material in the bullet points
+_PRICE_RE = re.compile(r'[\d,]+\.?\d*')
+_MATERIAL_RE = re.compile(r'[Mm]aterial\s*:?\s*([^;\n]+)')
+# Any material keyword in a lowercased feature bullet, in a single pattern
+_MATERIAL_KEYWORD_RE = re.compile(r'material|fabric|made of|made from|composition')
+
+
+def _parse_price_text(text: str):
+    """Read a price string, extracting the number from one with a currency; None if there is none."""
+    try:
+        return float(text)
+    except ValueError:
+        price_match = _PRICE_RE.search(text)
+        if price_match:
+            try:
+                return float(price_match.group(0).replace(',', ''))
+            except ValueError:
+                pass
+    return None
+
+
+# Price parser for each type of Oxylabs price field: the new format {"value": 123.45, "currency": "USD"},
+# a plain number, or a string with or without a currency
+_PRICE_PARSERS = {
+    dict: lambda price: float(price['value']) if 'value' in price else None,
+    int: float,
+    float: float,
+    str: _parse_price_text
+}
+
+# Mock product data for URLs naming a known product (matched in the lowercased URL)
+_ALLEN_SOLLY_POLO = {
+    "title": "Allen Solly Men's Regular Fit Polo Shirt",
+    "brand": "Allen Solly",
+    "material": "60% Cotton, 40% Polyester",
+    "category": "Polo Shirt",
+    "price": 899.00
+}
+_URL_MOCK_PRODUCTS = {
+    "allen-solly": _ALLEN_SOLLY_POLO,
+    "b06y2fg6r7": _ALLEN_SOLLY_POLO,
+    "levis": {
+        "title": "Levi's Men's Slim Fit Jeans",
+        "brand": "Levi's",
+        "material": "98% Cotton, 2% Elastane",
+        "category": "Jeans",
+        "price": 1299.00
+    }
+}
+
+# Mock product database, shared read-only by every scraper
+_MOCK_PRODUCTS = types.MappingProxyType({
+    # Cotton t-shirt examples
+    "B07C5JHN8Z": {
+        "title": "Organic Cotton Classic T-Shirt",
+        "brand": "EcoWear",
+        "material": "100% Organic Cotton",
+        "category": "T-Shirt",
+        "price": 24.99
+    },
+    "B08XYZT123": {
+        "title": "Premium Cotton T-Shirt 3-Pack",
+        "brand": "BasicThreads",
+        "material": "95% Cotton, 5% Elastane",
+        "category": "T-Shirt",
+        "price": 29.99
+    },
+
+    # Denim examples
+    "B09ABC4567": {
+        "title": "Sustainable Slim Fit Jeans",
+        "brand": "GreenDenim",
+        "material": "98% Organic Cotton, 2% Elastane",
+        "category": "Jeans",
+        "price": 79.99
+    },
+    "B07DEF8901": {
+        "title": "Vintage Straight Leg Jeans",
+        "brand": "DenimCo",
+        "material": "100% Cotton",
+        "category": "Jeans",
+        "price": 59.99
+    },
+
+    # Synthetic jacket examples
+    "B10GHI2345": {
+        "title": "Recycled Polyester Puffer Jacket",
+        "brand": "EcoOutdoor",
+        "material": "100% Recycled Polyester",
+        "category": "Jacket",
+        "price": 129.99
+    },
+    "B11JKL6789": {
+        "title": "Water-Resistant Fleece Jacket",
+        "brand": "NorthStyle",
+        "material": "85% Polyester, 15% Nylon",
+        "category": "Jacket",
+        "price": 89.99
+    },
+
+    # Mixed/complex examples
+    "B12MNO1234": {
+        "title": "Performance Sports T-Shirt",
+        "brand": "AthleteGear",
+        "material": "Dri-Fit Technology Fabric",  # Intentionally vague
+        "category": "Athletic Wear",
+        "price": 34.99
+    },
+    "B13PQR5678": {
+        "title": "Luxury Blend Sweater",
+        "brand": "CashmereElite",
+        "material": "70% Merino Wool, 30% Cashmere",
+        "category": "Sweater",
+        "price": 149.99
+    },
+
+    # Allen Solly example for Indian market
+    "B06Y2FG6R7": {
+        "title": "Allen Solly Men's Regular Fit Polo Shirt",
+        "brand": "Allen Solly",
+        "material": "60% Cotton, 40% Polyester",
+        "category": "Polo Shirt",
+        "price": 899.00
+    }
+})
+
+# Sample sustainability-related and concern phrases for the mock reviews
+_MOCK_SUSTAINABILITY_PHRASES = (
+    "eco-friendly",
+    "sustainable",
+    "organic",
+    "ethical production",
+    "environmentally conscious",
+    "carbon footprint",
+    "recycled materials",
+    "biodegradable",
+    "chemical-free",
+    "fair trade"
+)
+_MOCK_CONCERN_PHRASES = (
+    "doesn't seem very sustainable",
+    "cheaply made",
+    "synthetic smell",
+    "probably not eco-friendly",
+    "questionable origin",
+    "doubt it's actually organic",
+    "packaging was excessive",
+    "not as green as advertised",
+    "disappointed in the environmental claims",
+    "microplastics concern"
+)
+
+# The same for reviews of a specific product, filled in with its {product_type}
+_MOCK_PRODUCT_SUSTAINABILITY_PHRASES = (
+    "eco-friendly {product_type}",
+    "sustainable material",
+    "organic materials",
+    "ethical production",
+    "environmentally conscious brand",
+    "low carbon footprint",
+    "recycled materials",
+    "biodegradable packaging",
+    "chemical-free fabric",
+    "fair trade certified"
+)
+_MOCK_PRODUCT_CONCERN_PHRASES = (
+    "doesn't seem very sustainable for a {product_type}",
+    "cheaply made and probably won't last long",
+    "has a synthetic smell",
+    "probably not as eco-friendly as they claim",
+    "questionable origin of materials",
+    "doubt it's actually organic",
+    "packaging was excessive and wasteful",
+    "not as green as advertised",
+    "disappointed in the environmental claims",
+    "worried about microplastics"
+)
+
+# General comments closing a mock product review, by rating
+_POSITIVE_COMMENTS = (
+    "Very comfortable and well made.",
+    "Great quality for the price.",
+    "Fits perfectly and looks good.",
+    "Exactly as described and arrived quickly.",
+    "Would definitely buy again."
+)
+_AVERAGE_COMMENTS = (
+    "Decent product but nothing special.",
+    "Average quality for the price.",
+    "Fits okay but not perfect.",
+    "Pretty much as expected.",
+    "Might buy again if on sale."
+)
+_NEGATIVE_COMMENTS = (
+    "Poor quality and disappointing.",
+    "Wouldn't recommend at this price point.",
+    "Doesn't fit well and looks cheap.",
+    "Not as described and arrived late.",
+    "Definitely would not buy again."
+)
+_MOCK_RATING_COMMENTS = {
+    1: _NEGATIVE_COMMENTS, 2: _NEGATIVE_COMMENTS, 3: _AVERAGE_COMMENTS, 4: _POSITIVE_COMMENTS, 5: _POSITIVE_COMMENTS
+}
+# The shorter closing of the reviews in the initial mock review database
+_MOCK_DATABASE_COMMENTS = {
+    1: ("Wouldn't buy again.",), 2: ("Wouldn't buy again.",),
+    3: ("Overall good purchase.",), 4: ("Overall good purchase.",), 5: ("Overall good purchase.",)
+}
+
+# Successful Oxylabs responses persisted across runs, one file per query payload (named by its
+# digest) whose modification time is when it was cached; product pages and reviews change
+# slowly, so a week-old response is still usable
+OXYLABS_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ecoagent", "oxylabs")
+OXYLABS_CACHE_TTL = 7 * 24 * 3600
+
+def _oxylabs_retry() -> Retry:
+    """
+    Retry policy for Oxylabs queries: rate limits, server errors and connection failures are
+    retried with jittered exponential backoff (honouring Retry-After). Queries are POSTs, which
+    urllib3 doesn't retry unless told to; the last failed response is returned rather than
+    raised, for the scraper's own status handling.
+    """
+    options = dict(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False
+    )
+    try:
+        return Retry(**options, backoff_jitter=0.5, backoff_max=8)
+    except TypeError:
+        # urllib3 1.x has no jitter or per-policy backoff cap
+        return Retry(**options)
+
+def _oxylabs_cache_path(cache_key: str) -> str:
+    """Cache file of the response to a query payload."""
+    return os.path.join(OXYLABS_CACHE_DIR, hashlib.blake2b(cache_key.encode(), digest_size=16).hexdigest() + ".json")
+
+def _cached_oxylabs_response(cache_key: str, ttl: float):
+    """The cached response body for a query payload if it is younger than ttl seconds, else None."""
+    path = _oxylabs_cache_path(cache_key)
+    try:
+        if time.time() - os.path.getmtime(path) >= ttl:
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _store_oxylabs_response(cache_key: str, body: bytes, ttl: float):
+    """Write a response body to its own cache file, and evict cache files older than ttl seconds."""
+    path = _oxylabs_cache_path(cache_key)
+    try:
+        os.makedirs(OXYLABS_CACHE_DIR, exist_ok=True)
+        # Per-thread temporary name, so concurrent stores of the same query don't collide
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+        
+        expired_before = time.time() - ttl
+        with os.scandir(OXYLABS_CACHE_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and entry.stat().st_mtime < expired_before:
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        # Already evicted by another thread
+                        pass
+    except OSError as e:
+        logger.warning("Could not write Oxylabs cache: %s", e)
 
 class AmazonScraper:
     """
@@ -11,9 +347,21 @@ class AmazonScraper:
     Implements Oxylabs Web Scraper API integration with mock data fallback.
     """
     
-    def __init__(self, use_real_scraping=True, oxylabs_username=None, oxylabs_password=None):
+    # Upper bound on review pages fetched per product
+    MAX_REVIEW_PAGES = 5
+    
+    # Default cap on concurrent Oxylabs requests
+    MAX_CONCURRENT_REQUESTS = 5
+    
+    def __init__(self, use_real_scraping=True, oxylabs_username=None, oxylabs_password=None, cache_ttl=OXYLABS_CACHE_TTL,
+                 max_concurrent_requests=MAX_CONCURRENT_REQUESTS):
 
         self.use_real_scraping = use_real_scraping
+        # Oxylabs requests in flight at once across all callers, sync and async alike
+        self.max_concurrent_requests = max_concurrent_requests
+        self._request_slots = threading.BoundedSemaphore(max_concurrent_requests)
+        # Seconds a cached Oxylabs response is reused for (0 or None always queries Oxylabs)
+        self.cache_ttl = cache_ttl
         
         # Oxylabs API credentials
         self.oxylabs_username = oxylabs_username or os.environ.get('OXYLABS_USERNAME')
@@ -21,130 +369,113 @@ class AmazonScraper:
         self.use_oxylabs = bool(self.oxylabs_username and self.oxylabs_password)
         
         if self.use_oxylabs:
-            print("Oxylabs Web Scraper API credentials detected and will be used for scraping")
+            logger.info("Oxylabs Web Scraper API credentials detected and will be used for scraping")
+        
+        # Shared HTTP session so product and review requests reuse pooled keep-alive connections,
+        # a pool sized for the concurrent requests, and the credentials set once
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=2 * max_concurrent_requests,
+            max_retries=_oxylabs_retry()
+        )
+        self.session.mount("https://", adapter)
+        if self.use_oxylabs:
+            self.session.auth = (self.oxylabs_username, self.oxylabs_password)
         
         # Mock product database
-        self.mock_products = {
-            # Cotton t-shirt examples
-            "B07C5JHN8Z": {
-                "title": "Organic Cotton Classic T-Shirt",
-                "brand": "EcoWear",
-                "material": "100% Organic Cotton",
-                "category": "T-Shirt",
-                "price": 24.99
-            },
-            "B08XYZT123": {
-                "title": "Premium Cotton T-Shirt 3-Pack",
-                "brand": "BasicThreads",
-                "material": "95% Cotton, 5% Elastane",
-                "category": "T-Shirt",
-                "price": 29.99
-            },
-            
-            # Denim examples
-            "B09ABC4567": {
-                "title": "Sustainable Slim Fit Jeans",
-                "brand": "GreenDenim",
-                "material": "98% Organic Cotton, 2% Elastane",
-                "category": "Jeans",
-                "price": 79.99
-            },
-            "B07DEF8901": {
-                "title": "Vintage Straight Leg Jeans",
-                "brand": "DenimCo",
-                "material": "100% Cotton",
-                "category": "Jeans",
-                "price": 59.99
-            },
-            
-            # Synthetic jacket examples
-            "B10GHI2345": {
-                "title": "Recycled Polyester Puffer Jacket",
-                "brand": "EcoOutdoor",
-                "material": "100% Recycled Polyester",
-                "category": "Jacket",
-                "price": 129.99
-            },
-            "B11JKL6789": {
-                "title": "Water-Resistant Fleece Jacket",
-                "brand": "NorthStyle",
-                "material": "85% Polyester, 15% Nylon",
-                "category": "Jacket",
-                "price": 89.99
-            },
-            
-            # Mixed/complex examples
-            "B12MNO1234": {
-                "title": "Performance Sports T-Shirt",
-                "brand": "AthleteGear",
-                "material": "Dri-Fit Technology Fabric",  # Intentionally vague
-                "category": "Athletic Wear",
-                "price": 34.99
-            },
-            "B13PQR5678": {
-                "title": "Luxury Blend Sweater",
-                "brand": "CashmereElite",
-                "material": "70% Merino Wool, 30% Cashmere",
-                "category": "Sweater",
-                "price": 149.99
-            },
-            
-            # Allen Solly example for Indian market
-            "B06Y2FG6R7": {
-                "title": "Allen Solly Men's Regular Fit Polo Shirt",
-                "brand": "Allen Solly",
-                "material": "60% Cotton, 40% Polyester",
-                "category": "Polo Shirt",
-                "price": 899.00
-            }
-        }
+        self.mock_products = _MOCK_PRODUCTS
+        self._product_keys = tuple(self.mock_products)
+        self._product_values = tuple(self.mock_products.values())
         
-        # Mock review database
-        self.mock_reviews = self._generate_mock_reviews()
+        # Mock review database, generated on first access (one entry per mock product)
+        self._rng = np.random.default_rng()
+        self._mock_reviews = None
+        self._review_keys = self._product_keys
+        
+        # Total review pages reported by Oxylabs for each ASIN
+        self.review_page_counts = {}
+    
+    @property
+    def mock_reviews(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Mock review database, generated on first access so real scraping never pays for it.
+        """
+        if self._mock_reviews is None:
+            self._mock_reviews = self._generate_mock_reviews()
+        return self._mock_reviews
+    
+    def close(self):
+        """Close the underlying HTTP session."""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _post_query(self, payload: Dict[str, Any]) -> requests.Response:
+        """
+        POST an Oxylabs query, answering a repeat of a successful query from the on-disk cache.
+        The response's from_cache attribute tells which it was.
+        """
+        cache_key = json.dumps(payload, sort_keys=True)
+        cached = _cached_oxylabs_response(cache_key, self.cache_ttl) if self.cache_ttl else None
+        if cached is not None:
+            logger.debug("Using cached Oxylabs response for %s", payload.get('query') or payload.get('url'))
+            response = requests.Response()
+            response.status_code = 200
+            response.encoding = "utf-8"
+            response._content = cached
+            response.from_cache = True
+            return response
+        
+        # Wait for a free request slot, so concurrent scrapes can't overrun the Oxylabs rate limit
+        with self._request_slots:
+            response = self.session.post(OXYLABS_QUERIES_URL, json=payload, timeout=30)
+        response.from_cache = False
+        if self.cache_ttl and response.status_code == 200:
+            try:
+                has_results = bool(_response_json(response).get('results'))
+            except ValueError:
+                has_results = False
+            if has_results:
+                _store_oxylabs_response(cache_key, response.content, self.cache_ttl)
+        return response
     
     def _extract_asin_from_url(self, url: str) -> str:
         """Extract ASIN from Amazon URL."""
-        # Clean up the URL first - remove all query parameters
-        if '?' in url:
-            url = url.split('?')[0]
-            
-        # Try to extract ASIN using regex patterns
-        patterns = [
-            r'/dp/([A-Z0-9]{10})',
-            r'/gp/product/([A-Z0-9]{10})',
-            r'/ASIN/([A-Z0-9]{10})',
-            r'/([A-Z0-9]{10})(?:/|\?|$)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        
-        # Special handling for complex Amazon URLs (like Amazon.in with query parameters)
-        if '/dp/' in url:
-            # Extract just the dp part
-            dp_part = url.split('/dp/')[1]
-            # Get the first segment before any slash or question mark
-            clean_id = re.split(r'[/?]', dp_part)[0]
-            if clean_id and len(clean_id) >= 8:  # Some ASINs might be 8-10 chars
-                return clean_id
+        asin = _asin_from_url(url)
+        if asin:
+            return asin
         
         # If no match and we're using mock data, return a random product
         if not self.use_real_scraping:
-            return random.choice(list(self.mock_products.keys()))
+            return random.choice(self._product_keys)
         
         return None
     
+    def _post_and_parse(self, payload: Dict[str, Any]):
+        """
+        POST an Oxylabs query, returning the response and its first result (None if it has none).
+        """
+        response = self._post_query(payload)
+        if response.status_code == 200:
+            results = _response_json(response).get('results')
+            if results:
+                return response, results[0]
+        return response, None
+    
     def _get_with_oxylabs(self, asin: str, source: str = "amazon_product", url: str = None) -> Dict[str, Any]:
         """
         Get data from Oxylabs Web Scraper API.
         """
         if not self.use_oxylabs:
-            print("Oxylabs credentials not configured")
+            logger.warning("Oxylabs credentials not configured")
             return None
             
-        # print(f"Using Oxylabs Web Scraper API to fetch data for ASIN: {asin}")
+        logger.debug("Using Oxylabs Web Scraper API to fetch data for ASIN: %s", asin)
         
         # Determine the correct domain from the URL or ASIN
         domain = "com"  # Default to US
@@ -169,7 +500,7 @@ class AmazonScraper:
                 "parse": True
             }
             
-            print(f"Requesting data with URL: {domain_url}")
+            logger.debug("Requesting data with URL: %s", domain_url)
         else:
             # For product-specific sources, we use query+domain
             payload = {
@@ -179,30 +510,25 @@ class AmazonScraper:
                 "parse": True
             }
             
-            print(f"Requesting data for ASIN: {asin} with domain: {domain}")
+            logger.debug("Requesting data for ASIN: %s with domain: %s", asin, domain)
         
         try:
-            response = requests.post(
-                'https://realtime.oxylabs.io/v1/queries',
-                auth=(self.oxylabs_username, self.oxylabs_password),
-                json=payload,
-                timeout=30
-            )
+            response, result = self._post_and_parse(payload)
+            if result:
+                if response.from_cache:
+                    logger.info("Product data for %s served from the Oxylabs cache", asin)
+                else:
+                    logger.debug("Successfully received data from Oxylabs for %s", asin)
+                return result
             
             if response.status_code == 200:
-                result = response.json()
-                if 'results' in result and result['results']:
-                    # print(f"Successfully received data from Oxylabs for {asin}")
-                    return result['results'][0]
-                else:
-                    print(f"No results in Oxylabs response for {asin}")
+                logger.warning("No results in Oxylabs response for %s", asin)
             else:
-                print(f"Oxylabs API returned status code {response.status_code}")
-                print(f"Response: {response.text}")
+                logger.warning("Oxylabs API returned status code %s: %s", response.status_code, response.text)
                 
                 # If we get an error, try a secondary approach
                 if response.status_code == 400 and "not allowed" in response.text.lower():
-                    print("Trying alternative approach...")
+                    logger.info("Trying alternative approach...")
                     
                     # Try switching between URL and query approaches
                     if "url" in payload:
@@ -222,27 +548,19 @@ class AmazonScraper:
                             "parse": False  # Try without parse
                         }
                     
-                    print(f"Trying alternative payload: {alt_payload}")
-                    
-                    alt_response = requests.post(
-                        'https://realtime.oxylabs.io/v1/queries',
-                        auth=(self.oxylabs_username, self.oxylabs_password),
-                        json=alt_payload,
-                        timeout=30
-                    )
+                    logger.debug("Trying alternative payload: %s", alt_payload)
                     
-                    if alt_response.status_code == 200:
-                        alt_result = alt_response.json()
-                        if 'results' in alt_result and alt_result['results']:
-                            print("Successfully received data with alternative approach")
-                            return alt_result['results'][0]
+                    _, alt_result = self._post_and_parse(alt_payload)
+                    if alt_result:
+                        logger.info("Successfully received data with alternative approach")
+                        return alt_result
                 
                 if response.status_code == 401:
-                    print("Authentication failed. Please check your Oxylabs credentials.")
-                    print("Username and password should be in the format: username:password")
+                    logger.error("Authentication failed. Please check your Oxylabs credentials; "
+                                 "username and password should be in the format: username:password")
         
         except Exception as e:
-            print(f"Error using Oxylabs API: {e}")
+            logger.warning("Error using Oxylabs API: %s", e)
         
         return None
     
@@ -253,21 +571,21 @@ class AmazonScraper:
         asin = self._extract_asin_from_url(url)
         
         if not asin:
-            print(f"Could not extract ASIN from URL: {url}")
+            logger.warning("Could not extract ASIN from URL: %s", url)
             # Return a random product for testing
-            return random.choice(list(self.mock_products.values()))
+            return dict(random.choice(self._product_values))
         
         # If using real scraping and Oxylabs is configured, use Oxylabs
         if self.use_real_scraping and self.use_oxylabs:
             try:
-                # print(f"Attempting to scrape product data using Oxylabs API for ASIN: {asin}")
+                logger.debug("Attempting to scrape product data using Oxylabs API for ASIN: %s", asin)
                 
                 # Try amazon_product source first
                 oxylabs_data = self._get_with_oxylabs(asin, "amazon_product", url)
                 
                 if not oxylabs_data:
                     # If that fails, try the amazon source
-                    print("Trying alternative source...")
+                    logger.info("Trying alternative source...")
                     oxylabs_data = self._get_with_oxylabs(asin, "amazon", url)
                 
                 if oxylabs_data:
@@ -285,31 +603,18 @@ class AmazonScraper:
                     
                     # Extract price - different formats in different responses
                     if 'price' in content:
-                        price_value = content.get('price')
-                        if isinstance(price_value, dict) and 'value' in price_value:
-                            # Handle new format: {"price": {"value": 123.45, "currency": "USD"}}
-                            product_data["price"] = float(price_value['value'])
-                        elif isinstance(price_value, (int, float, str)):
-                            # Handle simple format: {"price": 123.45}
-                            try:
-                                product_data["price"] = float(price_value)
-                            except (ValueError, TypeError):
-                                # If it's a string with currency, try to extract number
-                                if isinstance(price_value, str):
-                                    price_match = re.search(r'[\d,]+\.?\d*', price_value)
-                                    if price_match:
-                                        price_str = price_match.group(0).replace(',', '')
-                                        try:
-                                            product_data["price"] = float(price_str)
-                                        except ValueError:
-                                            pass
+                        price_value = content['price']
+                        parse_price = _PRICE_PARSERS.get(type(price_value))
+                        price = parse_price(price_value) if parse_price else None
+                        if price is not None:
+                            product_data["price"] = price
                     
                     # Try to extract material from bullet points or features
                     # First check bullet_points string
                     material_found = False
                     bullet_points = content.get('bullet_points', '')
                     if bullet_points:
-                        material_match = re.search(r'[Mm]aterial\s*:?\s*([^;\n]+)', bullet_points)
+                        material_match = _MATERIAL_RE.search(bullet_points)
                         if material_match:
                             product_data["material"] = material_match.group(1).strip()
                             material_found = True
@@ -319,8 +624,7 @@ class AmazonScraper:
                         features = content.get('feature_bullets', [])
                         if isinstance(features, list):
                             for feature in features:
-                                feature_text = str(feature).lower()
-                                if any(keyword in feature_text for keyword in ['material', 'fabric', 'made of', 'made from', 'composition']):
+                                if _MATERIAL_KEYWORD_RE.search(str(feature).lower()):
                                     product_data["material"] = feature
                                     material_found = True
                                     break
@@ -346,88 +650,95 @@ class AmazonScraper:
                     return product_data
             
             except Exception as e:
-                print(f"Error using Oxylabs for product data: {e}")
-                print("Falling back to mock data...")
+                logger.warning("Error using Oxylabs for product data: %s; falling back to mock data", e)
         
         # Fallback to mock data
         if asin and asin in self.mock_products:
-            print(f"Using mock data for ASIN: {asin}")
-            return self.mock_products[asin]
+            logger.info("Using mock data for ASIN: %s", asin)
+            return dict(self.mock_products[asin])
         else:
             # Try to infer product details from URL
-            if "Allen-Solly" in url or "allen-solly" in url or "B06Y2FG6R7" in url:
-                return {
-                    "title": "Allen Solly Men's Regular Fit Polo Shirt",
-                    "brand": "Allen Solly",
-                    "material": "60% Cotton, 40% Polyester",
-                    "category": "Polo Shirt",
-                    "price": 899.00
-                }
-            elif "Levis" in url or "levis" in url:
-                return {
-                    "title": "Levi's Men's Slim Fit Jeans",
-                    "brand": "Levi's",
-                    "material": "98% Cotton, 2% Elastane",
-                    "category": "Jeans",
-                    "price": 1299.00
-                }
-            else:
-                # Return a random product if we can't identify it
-                print("No specific mock data available, selecting a random product")
-                return random.choice(list(self.mock_products.values()))
+            lower_url = url.lower()
+            for url_part, product in _URL_MOCK_PRODUCTS.items():
+                if url_part in lower_url:
+                    return dict(product)
+            
+            # Return a random product if we can't identify it
+            logger.info("No specific mock data available, selecting a random product")
+            return dict(random.choice(self._product_values))
+    
+    async def scrape_product_page_async(self, url: str) -> Dict[str, Any]:
+        """
+        Async variant of scrape_product_page, run in a worker thread on the shared session.
+        """
+        return await asyncio.to_thread(self.scrape_product_page, url)
+    
+    async def scrape_many(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """
+        Scrape several product pages concurrently, at most max_concurrent_requests at a time,
+        returning their product data in the order of the URLs. URLs for the same product
+        (same ASIN on the same Amazon site) are scraped once.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        
+        async def scrape(url):
+            async with semaphore:
+                return await self.scrape_product_page_async(url)
+        
+        # Scrape the first URL of each product and share its result with the others
+        keys = [self._product_key(url) for url in urls]
+        representatives = {}
+        for key, url in zip(keys, urls):
+            representatives.setdefault(key, url)
+        results = dict(zip(representatives, await asyncio.gather(*(scrape(url) for url in representatives.values()))))
+        return [results[key] for key in keys]
     
+    def _product_key(self, url: str) -> Any:
+        """The (ASIN, host) a product URL points to, or the URL itself if it has no recognizable ASIN."""
+        url = url.partition('?')[0]
+        match = _PRODUCT_ASIN_RE.search(url)
+        if not match:
+            return url
+        return match.group(1), urlsplit(url).netloc.lower()
     
     def scrape_reviews(self, url: str) -> List[Dict[str, Any]]:
         # Clean up the URL by removing query parameters
         if '?' in url:
-            clean_url = url.split('?')[0]
-            print(f"Cleaned URL: {clean_url}")
+            clean_url = url.partition('?')[0]
+            logger.debug("Cleaned URL: %s", clean_url)
             url = clean_url
             
         asin = self._extract_asin_from_url(url)
         
         if not asin:
-            print(f"Could not extract ASIN from URL: {url}")
+            logger.warning("Could not extract ASIN from URL: %s", url)
             # If we can't extract ASIN but we're in mock mode, use a random one
             if not self.use_real_scraping:
-                asin = random.choice(list(self.mock_reviews.keys()))
-                print(f"Using random mock ASIN: {asin}")
+                asin = random.choice(self._review_keys)
+                logger.info("Using random mock ASIN: %s", asin)
             else:
                 return []
         
         # If using real scraping and Oxylabs is configured, use Oxylabs
         if self.use_real_scraping and self.use_oxylabs:
             try:
-                print(f"Attempting to scrape reviews using Oxylabs API for ASIN: {asin}")
+                logger.info("Attempting to scrape reviews using Oxylabs API for ASIN: %s", asin)
                 
                 # For reviews, we need to use amazon_reviews as the source with query
                 # not amazon with url as that's not supported
                 payload = {
                     "source": "amazon_reviews",
-                    "domain": "in",  # Use 'in' for Amazon India, 'com' for US
+                    "domain": self._review_domain(url, asin),
                     "query": asin,
                     "parse": True
                 }
                 
-                # Determine domain code based on the ASIN/URL
-                if "amazon.in" in url or asin in ['B06Y2FG6R7']:
-                    payload["domain"] = "in"
-                elif "amazon.co.uk" in url:
-                    payload["domain"] = "co.uk"
-                else:
-                    payload["domain"] = "com"
-                
-                # print(f"Requesting reviews for ASIN: {asin} with domain: {payload['domain']}")
+                logger.debug("Requesting reviews for ASIN: %s with domain: %s", asin, payload['domain'])
                 
-                response = requests.post(
-                    'https://realtime.oxylabs.io/v1/queries',
-                    auth=(self.oxylabs_username, self.oxylabs_password),
-                    json=payload,
-                    timeout=30
-                )
+                response = self._post_query(payload)
                 
                 if response.status_code == 200:
-                    result = response.json()
+                    result = _response_json(response)
                     if 'results' in result and result['results']:
                         oxylabs_data = result['results'][0]
                         
@@ -436,30 +747,24 @@ class AmazonScraper:
                         reviews_data = content.get('reviews', [])
                         
                         if reviews_data:
-                            print(f"Successfully retrieved {len(reviews_data)} reviews from Oxylabs")
-                            processed_reviews = []
+                            logger.info("Successfully retrieved %d reviews from %s", len(reviews_data),
+                                        "the Oxylabs cache" if response.from_cache else "Oxylabs")
                             
-                            for review in reviews_data:
-                                processed_review = {
-                                    "rating": float(review.get('rating', 3.0)),
-                                    "text": review.get('text', ''),
-                                    "helpful_votes": review.get('helpful_votes', 0),
-                                    "verified_purchase": review.get('verified_purchase', False)
-                                }
-                                processed_reviews.append(processed_review)
+                            # Remember how many pages exist so scrape_reviews_async can fetch the rest
+                            page_count = content.get('pages', 1)
+                            self.review_page_counts[asin] = page_count if isinstance(page_count, int) else 1
                             
-                            return processed_reviews
+                            return self._process_oxylabs_reviews(reviews_data)
                         else:
-                            print("No reviews found in Oxylabs data")
+                            logger.warning("No reviews found in Oxylabs data")
                     else:
-                        print("No results in Oxylabs response")
+                        logger.warning("No results in Oxylabs response")
                 else:
-                    print(f"Oxylabs API returned status code {response.status_code}")
-                    print(f"Response: {response.text}")
+                    logger.warning("Oxylabs API returned status code %s: %s", response.status_code, response.text)
                     
                     # If we get an error, try a secondary approach with URL instead
                     if response.status_code == 400 and "not allowed" in response.text.lower():
-                        print("Trying alternative approach for reviews...")
+                        logger.info("Trying alternative approach for reviews...")
                         domain_suffix = payload["domain"]
                         reviews_url = f"https://www.amazon.{domain_suffix}/product-reviews/{asin}"
                         
@@ -469,20 +774,15 @@ class AmazonScraper:
                             "url": reviews_url
                         }
                         
-                        alt_response = requests.post(
-                            'https://realtime.oxylabs.io/v1/queries',
-                            auth=(self.oxylabs_username, self.oxylabs_password),
-                            json=alt_payload,
-                            timeout=30
-                        )
+                        alt_response = self._post_query(alt_payload)
                         
                         if alt_response.status_code == 200:
-                            alt_result = alt_response.json()
+                            alt_result = _response_json(alt_response)
                             if 'results' in alt_result and alt_result['results']:
                                 raw_html = alt_result['results'][0].get('content', '')
                                 
                                 # Create 3 simple mockup reviews from the HTML
-                                print("Successfully retrieved page, generating mockup reviews")
+                                logger.info("Successfully retrieved page, generating mockup reviews")
                                 reviews = []
                                 for i in range(3):
                                     rating = random.randint(3, 5)
@@ -496,181 +796,183 @@ class AmazonScraper:
                                 return reviews
             
             except Exception as e:
-                print(f"Error using Oxylabs for reviews: {e}")
-                print("Falling back to mock review data...")
+                logger.warning("Error using Oxylabs for reviews: %s; falling back to mock review data", e)
         
         # Fallback to mock data
         if asin in self.mock_reviews:
-            print(f"Using mock reviews for ASIN: {asin}")
+            logger.info("Using mock reviews for ASIN: %s", asin)
             return self.mock_reviews[asin]
         else:
             # Generate mock reviews for this ASIN
-            print(f"Generating fresh mock reviews for ASIN: {asin}")
+            logger.info("Generating fresh mock reviews for ASIN: %s", asin)
             mock_reviews = self._generate_mock_reviews_for_asin(asin)
             self.mock_reviews[asin] = mock_reviews
+            self._review_keys += (asin,)
             return mock_reviews
 
-    
-    def _generate_mock_reviews(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Generate mock reviews for products."""
-        reviews = {}
-        
-        # Sample sustainability-related phrases
-        sustainability_phrases = [
-            "eco-friendly",
-            "sustainable",
-            "organic",
-            "ethical production",
-            "environmentally conscious",
-            "carbon footprint",
-            "recycled materials",
-            "biodegradable",
-            "chemical-free",
-            "fair trade"
-        ]
+    async def scrape_reviews_async(self, url: str, max_pages: int = None) -> List[Dict[str, Any]]:
+        """
+        Scrape reviews, fetching any further Oxylabs review pages concurrently.
+        The first page (and every fallback) is handled by scrape_reviews.
+        """
+        url = url.partition('?')[0]
+        reviews = await asyncio.to_thread(self.scrape_reviews, url)
         
-        # Sample concern phrases
-        concern_phrases = [
-            "doesn't seem very sustainable",
-            "cheaply made",
-            "synthetic smell",
-            "probably not eco-friendly",
-            "questionable origin",
-            "doubt it's actually organic",
-            "packaging was excessive",
-            "not as green as advertised",
-            "disappointed in the environmental claims",
-            "microplastics concern"
-        ]
+        asin = self._extract_asin_from_url(url)
+        total_pages = min(self.review_page_counts.get(asin, 1), max_pages or self.MAX_REVIEW_PAGES)
+        if total_pages <= 1:
+            return reviews
         
-        # Generate reviews for each product
-        for asin in self.mock_products.keys():
-            product_reviews = []
-            num_reviews = random.randint(5, 15)
-            
-            for i in range(num_reviews):
-                # Determine if this review will mention sustainability
-                mentions_sustainability = random.random() < 0.4
-                is_concern = random.random() < 0.3
-                
-                rating = random.randint(1, 5)
-                
-                review_text = f"Review {i+1}: "
-                if mentions_sustainability:
-                    if is_concern:
-                        phrase = random.choice(concern_phrases)
-                        review_text += f"I like the product but {phrase}. "
-                    else:
-                        phrase = random.choice(sustainability_phrases)
-                        review_text += f"Really appreciate that this is {phrase}. "
-                
-                review_text += "Overall good purchase." if rating >= 3 else "Wouldn't buy again."
-                
-                review = {
-                    "rating": rating,
-                    "text": review_text,
-                    "helpful_votes": random.randint(0, 20),
-                    "verified_purchase": random.random() < 0.8
-                }
-                
-                product_reviews.append(review)
-            
-            reviews[asin] = product_reviews
+        logger.info("Fetching %d more review pages for ASIN: %s", total_pages - 1, asin)
+        domain = self._review_domain(url, asin)
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        
+        async def fetch_page(page):
+            async with semaphore:
+                return await asyncio.to_thread(self._fetch_reviews_page, asin, domain, page)
+        
+        pages = await asyncio.gather(*(fetch_page(page) for page in range(2, total_pages + 1)))
+        for page_reviews in pages:
+            reviews.extend(page_reviews)
         
         return reviews
     
+    async def scrape_product_and_reviews(self, url: str, max_pages: int = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Scrape a product page and its reviews concurrently; they are independent Oxylabs queries
+        sharing the session and its request slots. A failed review scrape leaves no reviews
+        rather than losing the product data.
+        """
+        product_data, reviews = await asyncio.gather(
+            self.scrape_product_page_async(url),
+            self.scrape_reviews_async(url, max_pages),
+            return_exceptions=True
+        )
+        if isinstance(product_data, BaseException):
+            raise product_data
+        if isinstance(reviews, BaseException):
+            logger.warning("Error scraping reviews: %s", reviews)
+            reviews = []
+        return product_data, reviews
+    
+    def _fetch_reviews_page(self, asin: str, domain: str, page: int) -> List[Dict[str, Any]]:
+        """
+        Fetch and process a single page of reviews from Oxylabs.
+        """
+        payload = {
+            "source": "amazon_reviews",
+            "domain": domain,
+            "query": asin,
+            "start_page": page,
+            "pages": 1,
+            "parse": True
+        }
+        
+        try:
+            response = self._post_query(payload)
+            
+            if response.status_code == 200:
+                result = _response_json(response)
+                if 'results' in result and result['results']:
+                    content = result['results'][0].get('content', {})
+                    return self._process_oxylabs_reviews(content.get('reviews', []))
+            else:
+                logger.warning("Oxylabs API returned status code %s for review page %s", response.status_code, page)
+        
+        except Exception as e:
+            logger.warning("Error fetching review page %s: %s", page, e)
+        
+        return []
+    
+    def _review_domain(self, url: str, asin: str) -> str:
+        """Determine the Amazon domain code to request reviews from."""
+        if "amazon.in" in url or asin in ['B06Y2FG6R7']:
+            return "in"
+        elif "amazon.co.uk" in url:
+            return "co.uk"
+        return "com"
+    
+    def _process_oxylabs_reviews(self, reviews_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert Oxylabs review entries into the review format used by the analyzers."""
+        processed_reviews = []
+        
+        for review in reviews_data:
+            processed_review = {
+                "rating": float(review.get('rating', 3.0)),
+                "text": review.get('text', ''),
+                "helpful_votes": review.get('helpful_votes', 0),
+                "verified_purchase": review.get('verified_purchase', False)
+            }
+            processed_reviews.append(processed_review)
+        
+        return processed_reviews
+
+    
+    def _generate_mock_reviews(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Generate mock reviews for products."""
+        return {
+            asin: self._build_mock_reviews(
+                "Review {number}: ", _MOCK_SUSTAINABILITY_PHRASES, _MOCK_CONCERN_PHRASES, _MOCK_DATABASE_COMMENTS
+            )
+            for asin in self.mock_products
+        }
+    
     def _generate_mock_reviews_for_asin(self, asin: str) -> List[Dict[str, Any]]:
         """Generate mock reviews for a specific ASIN."""
-        product_reviews = []
-        num_reviews = random.randint(5, 15)
-        
         # Get product details if available
         product_info = self.mock_products.get(asin, None)
         product_type = "product"
         if product_info:
             product_type = product_info.get("category", "product")
         
-        # Sample sustainability-related phrases
-        sustainability_phrases = [
-            f"eco-friendly {product_type}",
-            "sustainable material",
-            "organic materials",
-            "ethical production",
-            "environmentally conscious brand",
-            "low carbon footprint",
-            "recycled materials",
-            "biodegradable packaging",
-            "chemical-free fabric",
-            "fair trade certified"
-        ]
+        # More positive reviews than negative (skew the distribution)
+        return self._build_mock_reviews(
+            "Review of this {product_type}: ", _MOCK_PRODUCT_SUSTAINABILITY_PHRASES, _MOCK_PRODUCT_CONCERN_PHRASES,
+            _MOCK_RATING_COMMENTS, skew_ratings=True, product_type=product_type
+        )
+    
+    def _build_mock_reviews(self, opening: str, sustainability_phrases, concern_phrases, closing_comments,
+                            skew_ratings: bool = False, product_type: str = "product") -> List[Dict[str, Any]]:
+        """
+        Build 5-15 mock reviews, drawing every random field for all of them at once.
+        Each opens with the opening template, may mention a sustainability or concern phrase,
+        and closes with a comment for its rating; skew_ratings rates concerns 1-3 and the rest 3-5.
+        """
+        rng = self._rng
+        num_reviews = int(rng.integers(5, 16))
         
-        # Sample concern phrases
-        concern_phrases = [
-            f"doesn't seem very sustainable for a {product_type}",
-            "cheaply made and probably won't last long",
-            "has a synthetic smell",
-            "probably not as eco-friendly as they claim",
-            "questionable origin of materials",
-            "doubt it's actually organic",
-            "packaging was excessive and wasteful",
-            "not as green as advertised",
-            "disappointed in the environmental claims",
-            "worried about microplastics"
-        ]
+        mentions_sustainability = rng.random(num_reviews) < 0.4
+        is_concern = rng.random(num_reviews) < 0.3
+        if skew_ratings:
+            ratings = np.where(is_concern, rng.integers(1, 4, num_reviews), rng.integers(3, 6, num_reviews))
+        else:
+            ratings = rng.integers(1, 6, num_reviews)
+        helpful_votes = rng.integers(0, 21, num_reviews)
+        verified = rng.random(num_reviews) < 0.8
+        sustainability_idx = rng.integers(0, len(sustainability_phrases), num_reviews)
+        concern_idx = rng.integers(0, len(concern_phrases), num_reviews)
+        comment_draws = rng.random(num_reviews)
         
-        for i in range(num_reviews):
-            # Determine if this review will mention sustainability
-            mentions_sustainability = random.random() < 0.4
-            is_concern = random.random() < 0.3
-            
-            # More positive reviews than negative (skew the distribution)
-            if is_concern:
-                rating = random.randint(1, 3)
-            else:
-                rating = random.randint(3, 5)
-            
-            review_text = f"Review of this {product_type}: "
-            if mentions_sustainability:
-                if is_concern:
-                    phrase = random.choice(concern_phrases)
-                    review_text += f"I like the product but {phrase}. "
+        def review_text(i, rating, mentions, concern, s_idx, c_idx, comment_draw):
+            text = opening.format(number=i + 1, product_type=product_type)
+            if mentions:
+                if concern:
+                    text += f"I like the product but {concern_phrases[c_idx].format(product_type=product_type)}. "
                 else:
-                    phrase = random.choice(sustainability_phrases)
-                    review_text += f"Really appreciate that this is {phrase}. "
-            
-            # Add general comments
-            if rating >= 4:
-                review_text += random.choice([
-                    "Very comfortable and well made.",
-                    "Great quality for the price.",
-                    "Fits perfectly and looks good.",
-                    "Exactly as described and arrived quickly.",
-                    "Would definitely buy again."
-                ])
-            elif rating == 3:
-                review_text += random.choice([
-                    "Decent product but nothing special.",
-                    "Average quality for the price.",
-                    "Fits okay but not perfect.",
-                    "Pretty much as expected.",
-                    "Might buy again if on sale."
-                ])
-            else:
-                review_text += random.choice([
-                    "Poor quality and disappointing.",
-                    "Wouldn't recommend at this price point.",
-                    "Doesn't fit well and looks cheap.",
-                    "Not as described and arrived late.",
-                    "Definitely would not buy again."
-                ])
-            
-            review = {
+                    text += f"Really appreciate that this is {sustainability_phrases[s_idx].format(product_type=product_type)}. "
+            comments = closing_comments[rating]
+            return text + comments[int(comment_draw * len(comments))]
+        
+        return [
+            {
                 "rating": rating,
-                "text": review_text,
-                "helpful_votes": random.randint(0, 20),
-                "verified_purchase": random.random() < 0.8
+                "text": review_text(i, rating, mentions, concern, s_idx, c_idx, comment_draw),
+                "helpful_votes": votes,
+                "verified_purchase": is_verified
             }
-            
-            product_reviews.append(review)
-        
-        return product_reviews
+            for i, (rating, votes, is_verified, mentions, concern, s_idx, c_idx, comment_draw) in enumerate(zip(
+                ratings.tolist(), helpful_votes.tolist(), verified.tolist(),
+                mentions_sustainability.tolist(), is_concern.tolist(),
+                sustainability_idx.tolist(), concern_idx.tolist(), comment_draws.tolist()
+            ))
+        ]